@@ -0,0 +1,266 @@
+import io
+import struct
+import time
+import tracemalloc
+import unittest
+from array import array
+from typing import Any, BinaryIO, Iterator, Optional
+
+from linked_lists import DoublyLinkedList, SinglyLinkedList
+
+
+# Struct-of-arrays linked list
+# Each Node object in linked_lists.py is a full Python object: header + 3 pointer slots + a boxed int for the data,
+# ~100 bytes per element. Here the list lives in three parallel typed arrays instead:
+#   data[i] - the element in slot i
+#   next[i] - slot index of the next element (-1 = None)
+#   prev[i] - slot index of the previous element (-1 = None)
+# A node is just a slot index, so an element costs 8 (data) + 4 + 4 (links) bytes.
+# Deleted slots go on a free-list (chained through next[]) and are reused by the next insert.
+# compact() rewrites the arrays in traversal order, after which data[] IS the list and can be written out in one go.
+
+_NONE = -1
+_HEADER = struct.Struct("<4sqq")  # magic, length, typecode (as ord)
+_MAGIC = b"ALL1"
+
+
+class ArrayLinkedList:
+    """ Doubly linked list of typed values stored in parallel arrays, same insert/search/delete API as linked_lists """
+
+    def __init__(self, typecode: str = "q", capacity: int = 16):
+        self.typecode = typecode
+        self._data = array(typecode, [0]) * capacity
+        self._next = array("i", [_NONE]) * capacity
+        self._prev = array("i", [_NONE]) * capacity
+        self.head = _NONE
+        self.tail = _NONE
+        self._size = 0
+        self._used = 0  # Slots [0, _used) have been handed out at least once
+        self._free = _NONE  # Head of the free-list of deleted slots
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __str__(self) -> str:
+        return "".join(f"{item}->" for item in self) + "None"
+
+    def __iter__(self) -> Iterator[Any]:
+        data, nxt = self._data, self._next
+        slot = self.head
+        while slot != _NONE:
+            yield data[slot]
+            slot = nxt[slot]
+
+    def _grow(self) -> None:
+        """ Double the capacity of all three arrays """
+        capacity = max(1, len(self._data))
+        self._data.extend(array(self.typecode, [0]) * capacity)
+        self._next.extend(array("i", [_NONE]) * capacity)
+        self._prev.extend(array("i", [_NONE]) * capacity)
+
+    def _allocate(self) -> int:
+        if self._free != _NONE:
+            slot = self._free
+            self._free = self._next[slot]
+            return slot
+        if self._used == len(self._data):
+            self._grow()
+        slot = self._used
+        self._used += 1
+        return slot
+
+    # O(1) amortized
+    def insert(self, item: Any) -> int:
+        """ Insert at the head of the list, return the slot it was stored in """
+        slot = self._allocate()
+        self._data[slot] = item
+        self._prev[slot] = _NONE
+        self._next[slot] = self.head
+        if self.head != _NONE:
+            self._prev[self.head] = slot
+        else:
+            self.tail = slot
+        self.head = slot
+        self._size += 1
+        return slot
+
+    # O(1) amortized
+    def append(self, item: Any) -> int:
+        """ Insert at the tail of the list, return the slot it was stored in """
+        slot = self._allocate()
+        self._data[slot] = item
+        self._next[slot] = _NONE
+        self._prev[slot] = self.tail
+        if self.tail != _NONE:
+            self._next[self.tail] = slot
+        else:
+            self.head = slot
+        self.tail = slot
+        self._size += 1
+        return slot
+
+    # O(N)
+    def search(self, item: Any) -> Optional[int]:
+        """ Slot of the first element equal to item, None if it isn't in the list """
+        data, nxt = self._data, self._next
+        slot = self.head
+        while slot != _NONE and data[slot] != item:
+            slot = nxt[slot]
+        return None if slot == _NONE else slot
+
+    def get(self, slot: int) -> Any:
+        return self._data[slot]
+
+    # O(1)
+    def delete_slot(self, slot: int) -> None:
+        """ Unlink the element in slot and put the slot on the free-list """
+        prev, nxt = self._prev[slot], self._next[slot]
+        if prev != _NONE:
+            self._next[prev] = nxt
+        else:
+            self.head = nxt
+        if nxt != _NONE:
+            self._prev[nxt] = prev
+        else:
+            self.tail = prev
+
+        self._prev[slot] = _NONE
+        self._next[slot] = self._free
+        self._free = slot
+        self._size -= 1
+
+    # O(N)
+    def delete(self, item: Any) -> None:
+        """ Delete the first element equal to item """
+        slot = self.search(item)
+        if slot is not None:
+            self.delete_slot(slot)
+
+    def is_empty(self) -> bool:
+        return self.head == _NONE
+
+    # O(N)
+    def compact(self) -> None:
+        """
+        Rewrite the arrays so slot i holds the i'th element in traversal order. Frees the unused capacity and the
+        free-list, and makes traversal a sequential scan of memory. Slots returned earlier are no longer valid.
+        """
+        self._data = array(self.typecode, self)
+        self._link_in_order()
+
+    def _link_in_order(self) -> None:
+        """ Link slots 0..size-1 into a list in slot order, with no free slots """
+        n = self._size
+        self._next = array("i", range(1, n + 1))
+        self._prev = array("i", range(-1, n - 1))
+        if n:
+            self._next[n - 1] = _NONE
+        self.head = 0 if n else _NONE
+        self.tail = n - 1 if n else _NONE
+        self._used = n
+        self._free = _NONE
+
+    def write(self, f: BinaryIO) -> None:
+        """ Serialize the list: compact it, then a fixed header and the data array in a single buffer write """
+        self.compact()
+        f.write(_HEADER.pack(_MAGIC, self._size, ord(self.typecode)))
+        f.write(memoryview(self._data))
+
+    @classmethod
+    def read(cls, f: BinaryIO) -> "ArrayLinkedList":
+        magic, n, typecode = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != _MAGIC:
+            raise ValueError("not an ArrayLinkedList stream")
+        ll = cls(typecode=chr(typecode), capacity=0)
+        ll._data = array(ll.typecode)
+        ll._data.frombytes(f.read(n * ll._data.itemsize))
+        ll._size = n
+        ll._link_in_order()  # The data was written in traversal order
+        return ll
+
+
+def benchmark(n: int = 200_000) -> dict:
+    """ Bytes/element (tracemalloc) and build + traversal time vs SinglyLinkedList and DoublyLinkedList """
+    values = range(10 ** 9, 10 ** 9 + n)  # Outside the small int cache, the Node lists pay for real int objects
+    results = {}
+    for name, factory in (("ArrayLinkedList", ArrayLinkedList), ("SinglyLinkedList", SinglyLinkedList),
+                          ("DoublyLinkedList", DoublyLinkedList)):
+        tracemalloc.start()
+        before, _ = tracemalloc.get_traced_memory()
+        start = time.perf_counter()
+        ll = factory()
+        for v in values:
+            ll.insert(v)
+        build_secs = time.perf_counter() - start
+        after, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        start = time.perf_counter()
+        ll.search(-1)  # Full traversal
+        results[name] = {"bytes/element": (after - before) / n, "build secs": build_secs,
+                         "search miss secs": time.perf_counter() - start}
+
+    ll = ArrayLinkedList()
+    for v in values:
+        ll.insert(v)
+    buffer = io.BytesIO()
+    start = time.perf_counter()
+    ll.write(buffer)
+    results["ArrayLinkedList"]["serialize secs"] = time.perf_counter() - start
+    return results
+
+
+class Test(unittest.TestCase):
+    def test_insert_search_delete(self):
+        ll = ArrayLinkedList()
+        for i in range(1, 10):
+            ll.insert(i)
+        self.assertEqual(str(ll), "9->8->7->6->5->4->3->2->1->None")
+
+        ll.delete(9)
+        self.assertEqual(str(ll), "8->7->6->5->4->3->2->1->None")
+        ll.delete(1)
+        self.assertEqual(str(ll), "8->7->6->5->4->3->2->None")
+        ll.delete(5)
+        self.assertEqual(str(ll), "8->7->6->4->3->2->None")
+        self.assertIsNone(ll.search(5))
+        self.assertEqual(ll.get(ll.search(4)), 4)
+        self.assertEqual(len(ll), 6)
+
+    def test_free_list_reuses_slots(self):
+        ll = ArrayLinkedList(capacity=4)
+        slots = [ll.append(i) for i in range(4)]
+        ll.delete_slot(slots[1])
+        ll.delete_slot(slots[2])
+        self.assertEqual(ll.append(10), slots[2])
+        self.assertEqual(ll.insert(20), slots[1])
+        self.assertEqual(list(ll), [20, 0, 3, 10])
+
+        while not ll.is_empty():
+            ll.delete_slot(ll.head)
+        self.assertEqual(list(ll), [])
+
+    def test_compact_and_serialize(self):
+        ll = ArrayLinkedList(typecode="d")
+        for i in range(10):
+            ll.insert(float(i))
+        for i in range(0, 10, 3):
+            ll.delete(float(i))
+        expected = list(ll)
+
+        ll.compact()
+        self.assertEqual(list(ll), expected)
+        self.assertEqual(ll._data.tolist(), expected)
+
+        buffer = io.BytesIO()
+        ll.write(buffer)
+        buffer.seek(0)
+        restored = ArrayLinkedList.read(buffer)
+        self.assertEqual(list(restored), expected)
+        restored.append(100.0)
+        restored.delete(expected[0])
+        self.assertEqual(list(restored), expected[1:] + [100.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,313 @@
+import asyncio
+import time
+import unittest
+from collections import deque
+from typing import Any, Callable, Optional
+
+from queues import QueueLL
+
+
+# QueueLL raises on an empty dequeue, so a consumer has to poll it. This wraps the linked-list queue for asyncio:
+# - put() suspends while the queue is at capacity (backpressure), get() suspends while it's empty.
+# - Waiters are futures kept in FIFO order, a waiter is only woken when there's an item (or a free slot) for it.
+# - If a waiting task is cancelled, its wakeup is handed to the next waiter so no item/slot is lost.
+# - High/low water marks give producers a flow control signal before the hard capacity is hit.
+class AsyncQueueLL:
+    def __init__(self, maxsize: int = 0, high_water: Optional[int] = None, low_water: Optional[int] = None,
+                 on_high_water: Optional[Callable[[], None]] = None,
+                 on_low_water: Optional[Callable[[], None]] = None):
+        """
+        :param maxsize: Max number of items in the queue, 0 means unbounded
+        :param high_water: on_high_water() is called when the size rises to this mark
+        :param low_water: on_low_water() is called when the size drops back to this mark (after hitting high water)
+        """
+        if high_water is not None and high_water < 1:
+            raise ValueError("high_water must be at least 1")
+        if high_water is not None and low_water is not None and low_water > high_water:
+            raise ValueError("low_water must be <= high_water")
+
+        self._queue = QueueLL()
+        self._maxsize = maxsize
+        self._getters = deque()
+        self._putters = deque()
+
+        self._high_water = high_water
+        self._low_water = low_water if low_water is not None else (high_water // 2 if high_water is not None else None)
+        self._on_high_water = on_high_water
+        self._on_low_water = on_low_water
+        self._paused = False
+
+    @property
+    def size(self) -> int:
+        return self._queue.size
+
+    @property
+    def maxsize(self) -> int:
+        return self._maxsize
+
+    @property
+    def paused(self) -> bool:
+        """ True between crossing the high water mark and draining back to the low water mark """
+        return self._paused
+
+    def is_empty(self) -> bool:
+        return self._queue.is_empty()
+
+    def is_full(self) -> bool:
+        return 0 < self._maxsize <= self._queue.size
+
+    @staticmethod
+    def _wakeup_next(waiters: deque) -> None:
+        """ Wake the first waiter that's still waiting (cancelled futures are skipped) """
+        while waiters:
+            waiter = waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                break
+
+    def _check_high_water(self) -> None:
+        if self._high_water is not None and not self._paused and self._queue.size >= self._high_water:
+            self._paused = True
+            if self._on_high_water is not None:
+                self._on_high_water()
+
+    def _check_low_water(self) -> None:
+        if self._paused and self._queue.size <= self._low_water:
+            self._paused = False
+            if self._on_low_water is not None:
+                self._on_low_water()
+
+    # O(1)
+    def put_nowait(self, item: Any) -> None:
+        if self.is_full():
+            raise Exception("Queue Overflow")
+
+        self._queue.enqueue(item)
+        self._check_high_water()
+        self._wakeup_next(self._getters)
+
+    # O(1)
+    def get_nowait(self) -> Any:
+        if self._queue.is_empty():
+            raise Exception("Queue Underflows")
+
+        item = self._queue.dequeue()
+        self._check_low_water()
+        self._wakeup_next(self._putters)
+        return item
+
+    # O(k) - Where k is the number of items returned
+    def get_nowait_many(self, max_items: int) -> list:
+        """ Dequeue up to max_items without waiting, returns an empty list if the queue is empty """
+        items = []
+        while len(items) < max_items and not self._queue.is_empty():
+            items.append(self._queue.dequeue())
+
+        if items:
+            self._check_low_water()
+            # Each item freed a slot, so wake up to that many blocked producers
+            for _ in range(len(items)):
+                if not self._putters:
+                    break
+                self._wakeup_next(self._putters)
+        return items
+
+    async def put(self, item: Any) -> None:
+        """ Enqueue the item, suspending while the queue is full """
+        while self.is_full():
+            putter = asyncio.get_running_loop().create_future()
+            self._putters.append(putter)
+            try:
+                await putter
+            except BaseException:
+                putter.cancel()
+                try:
+                    self._putters.remove(putter)
+                except ValueError:
+                    pass
+                # We were woken up for a free slot but cancelled before using it, pass it on to the next producer
+                if not self.is_full() and not putter.cancelled():
+                    self._wakeup_next(self._putters)
+                raise
+        self.put_nowait(item)
+
+    async def get(self) -> Any:
+        """ Dequeue an item, suspending while the queue is empty """
+        while self._queue.is_empty():
+            getter = asyncio.get_running_loop().create_future()
+            self._getters.append(getter)
+            try:
+                await getter
+            except BaseException:
+                getter.cancel()
+                try:
+                    self._getters.remove(getter)
+                except ValueError:
+                    pass
+                # We were woken up for an item but cancelled before taking it, pass it on to the next consumer
+                if not self._queue.is_empty() and not getter.cancelled():
+                    self._wakeup_next(self._getters)
+                raise
+        return self.get_nowait()
+
+    async def get_many(self, max_items: int) -> list:
+        """ Wait for at least one item, then drain up to max_items """
+        items = [await self.get()]
+        items.extend(self.get_nowait_many(max_items - 1))
+        return items
+
+
+def benchmark(n: int = 100_000, maxsize: int = 1024, batch_size: int = 64) -> dict:
+    """
+    Producer/consumer throughput of AsyncQueueLL vs asyncio.Queue, single-item and batched consumers.
+    Returns items/sec for each run.
+    """
+
+    async def run_single(queue) -> None:
+        async def producer():
+            for i in range(n):
+                await queue.put(i)
+
+        async def consumer():
+            for _ in range(n):
+                await queue.get()
+
+        await asyncio.gather(producer(), consumer())
+
+    async def run_batched_ll(queue: AsyncQueueLL) -> None:
+        async def producer():
+            for i in range(n):
+                await queue.put(i)
+
+        async def consumer():
+            received = 0
+            while received < n:
+                received += len(await queue.get_many(batch_size))
+
+        await asyncio.gather(producer(), consumer())
+
+    async def run_batched_asyncio(queue: asyncio.Queue) -> None:
+        # asyncio.Queue has no batch get, drain it with get_nowait() after the first await
+        async def producer():
+            for i in range(n):
+                await queue.put(i)
+
+        async def consumer():
+            received = 0
+            while received < n:
+                await queue.get()
+                received += 1
+                taken = 1
+                while taken < batch_size and not queue.empty():
+                    queue.get_nowait()
+                    taken += 1
+                    received += 1
+
+        await asyncio.gather(producer(), consumer())
+
+    def timed(coro_factory) -> float:
+        start = time.perf_counter()
+        asyncio.run(coro_factory())
+        return n / (time.perf_counter() - start)
+
+    return {
+        "AsyncQueueLL single": timed(lambda: run_single(AsyncQueueLL(maxsize=maxsize))),
+        "asyncio.Queue single": timed(lambda: run_single(asyncio.Queue(maxsize=maxsize))),
+        "AsyncQueueLL batched": timed(lambda: run_batched_ll(AsyncQueueLL(maxsize=maxsize))),
+        "asyncio.Queue batched": timed(lambda: run_batched_asyncio(asyncio.Queue(maxsize=maxsize))),
+    }
+
+
+class Test(unittest.IsolatedAsyncioTestCase):
+    async def test_fifo(self):
+        q = AsyncQueueLL()
+        for i in range(3):
+            await q.put(i)
+        self.assertEqual([await q.get(), await q.get(), await q.get()], [0, 1, 2])
+        self.assertTrue(q.is_empty())
+
+        with self.assertRaises(Exception):
+            q.get_nowait()
+
+    async def test_get_waits_for_put(self):
+        q = AsyncQueueLL()
+        getter = asyncio.create_task(q.get())
+        await asyncio.sleep(0)
+        self.assertFalse(getter.done())
+        await q.put("job")
+        self.assertEqual(await getter, "job")
+
+    async def test_put_backpressure(self):
+        q = AsyncQueueLL(maxsize=2)
+        await q.put(1)
+        await q.put(2)
+        self.assertTrue(q.is_full())
+
+        putter = asyncio.create_task(q.put(3))
+        await asyncio.sleep(0)
+        self.assertFalse(putter.done())
+
+        self.assertEqual(await q.get(), 1)
+        await putter
+        self.assertEqual(q.get_nowait_many(10), [2, 3])
+        self.assertEqual(q.get_nowait_many(10), [])
+
+    async def test_cancelled_getter_passes_item_on(self):
+        q = AsyncQueueLL()
+        g1 = asyncio.create_task(q.get())
+        g2 = asyncio.create_task(q.get())
+        await asyncio.sleep(0)
+
+        q.put_nowait("a")  # Wakes g1
+        g1.cancel()
+        self.assertEqual(await g2, "a")
+        with self.assertRaises(asyncio.CancelledError):
+            await g1
+
+    async def test_cancelled_putter(self):
+        q = AsyncQueueLL(maxsize=1)
+        await q.put(1)
+        p1 = asyncio.create_task(q.put(2))
+        p2 = asyncio.create_task(q.put(3))
+        await asyncio.sleep(0)
+
+        q.get_nowait()  # Frees a slot and wakes p1
+        p1.cancel()
+        await p2
+        self.assertEqual(q.get_nowait_many(5), [3])
+
+    async def test_watermarks(self):
+        events = []
+        q = AsyncQueueLL(high_water=3, low_water=1, on_high_water=lambda: events.append("high"),
+                         on_low_water=lambda: events.append("low"))
+        for i in range(4):
+            q.put_nowait(i)
+        self.assertEqual(events, ["high"])
+        self.assertTrue(q.paused)
+
+        q.get_nowait()
+        q.get_nowait()
+        self.assertEqual(events, ["high"])
+        q.get_nowait()
+        self.assertEqual(events, ["high", "low"])
+        self.assertFalse(q.paused)
+
+        # high_water=1 defaults low_water to 0
+        q = AsyncQueueLL(high_water=1, on_low_water=lambda: events.append("low 0"))
+        q.put_nowait(1)
+        self.assertTrue(q.paused)
+        q.get_nowait()
+        self.assertEqual(events[-1], "low 0")
+        with self.assertRaises(ValueError):
+            AsyncQueueLL(high_water=0)
+
+    async def test_get_many(self):
+        q = AsyncQueueLL()
+        for i in range(5):
+            q.put_nowait(i)
+        self.assertEqual(await q.get_many(3), [0, 1, 2])
+        self.assertEqual(await q.get_many(10), [3, 4])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,303 @@
+import threading
+import time
+import unittest
+from typing import Any, Callable, Optional
+
+from queues import QueueLL
+
+
+# QueueArr/QueueLL/QueueTwoStacks hand out one item per dequeue(). Sinks like database bulk writes are only efficient
+# in batches, so a consumer wants "up to N items, or whatever arrived within a deadline" in a single call.
+# The batch is bounded both ways:
+# - max_items caps the batch size (and the per-batch sink cost)
+# - max_wait caps the latency added to the first item of the batch while we wait for more to arrive
+class BatchQueue:
+    """ Thread-safe FIFO queue (QueueLL underneath) with a micro-batching consumer API """
+
+    def __init__(self, maxsize: int = 0):
+        self._queue = QueueLL()
+        self._maxsize = maxsize
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+
+    @property
+    def size(self) -> int:
+        with self._lock:
+            return self._queue.size
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            return self._queue.is_empty()
+
+    # O(1)
+    def enqueue(self, item: Any, timeout: Optional[float] = None) -> None:
+        """ Enqueue an item, blocking while the queue is full (up to timeout seconds) """
+        with self._not_full:
+            if self._maxsize > 0:
+                deadline = None if timeout is None else time.monotonic() + timeout
+                while self._queue.size >= self._maxsize:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise Exception("Queue Overflow")
+                    self._not_full.wait(remaining)
+            self._queue.enqueue(item)
+            self._not_empty.notify()
+
+    # O(1)
+    def dequeue(self, timeout: Optional[float] = None) -> Any:
+        """ Dequeue a single item, blocking while the queue is empty (up to timeout seconds) """
+        batch = self.dequeue_batch(max_items=1, max_wait=timeout)
+        if not batch:
+            raise Exception("Queue Underflows")
+        return batch[0]
+
+    # O(k) - Where k is the number of items returned
+    def dequeue_batch(self, max_items: int, max_wait: Optional[float] = None) -> list:
+        """
+        Return up to max_items items in FIFO order.
+
+        Blocks until the first item arrives, then keeps collecting until either max_items are taken or max_wait seconds
+        have passed since the call started. With max_wait=0 it never blocks and drains whatever is there. With
+        max_wait=None it blocks until the batch is full.
+        Returns an empty list if nothing arrived before the deadline.
+        """
+        if max_items < 1:
+            raise ValueError("max_items must be >= 1")
+
+        deadline = None if max_wait is None else time.monotonic() + max_wait
+        batch = []
+
+        with self._not_empty:
+            while len(batch) < max_items:
+                # Take everything that's available in one go while holding the lock
+                taken = 0
+                while len(batch) < max_items and not self._queue.is_empty():
+                    batch.append(self._queue.dequeue())
+                    taken += 1
+                # Free the slots now, not when the batch is done: on a bounded queue the rest of the batch can only
+                # arrive from producers that are blocked on a full queue
+                if taken:
+                    self._not_full.notify(taken)
+
+                if len(batch) == max_items:
+                    break
+
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._not_empty.wait(remaining)
+
+        return batch
+
+
+# Adaptive batching: the best batch size depends on the sink. Per-batch overhead (round trips, commits) favours big
+# batches, but the sink latency grows with the batch size and that latency is added to every item in the batch.
+# We use AIMD (additive increase / multiplicative decrease, like TCP congestion control):
+# - If the sink finished the batch within the target latency, grow the batch size by a constant step
+# - If it went over the target, cut the batch size in half
+# The batch size converges to the largest size the sink can handle within the latency budget.
+class AdaptiveBatcher:
+    def __init__(self, queue: BatchQueue, target_latency: float, min_batch: int = 1, max_batch: int = 10_000,
+                 increase_step: Optional[int] = None, decrease_factor: float = 0.5, max_wait: float = 0.01):
+        """
+        :param queue: Queue to consume from
+        :param target_latency: Sink latency (seconds) we aim to stay under per batch
+        :param increase_step: Additive increase per fast batch (defaults to min_batch)
+        :param decrease_factor: Multiplicative decrease per slow batch
+        :param max_wait: Max seconds to wait while filling a batch
+        """
+        if not 0 < decrease_factor < 1:
+            raise ValueError("decrease_factor must be between 0 and 1")
+
+        self.queue = queue
+        self.target_latency = target_latency
+        self.min_batch = min_batch
+        self.max_batch = max_batch
+        self.increase_step = increase_step or min_batch
+        self.decrease_factor = decrease_factor
+        self.max_wait = max_wait
+        self.batch_size = min_batch
+
+    def record_latency(self, latency: float) -> None:
+        """ Feed back the observed sink latency for the last batch and adjust the batch size """
+        if latency <= self.target_latency:
+            self.batch_size = min(self.max_batch, self.batch_size + self.increase_step)
+        else:
+            self.batch_size = max(self.min_batch, int(self.batch_size * self.decrease_factor))
+
+    def next_batch(self) -> list:
+        return self.queue.dequeue_batch(max_items=self.batch_size, max_wait=self.max_wait)
+
+    def consume(self, sink: Callable[[list], Any]) -> int:
+        """ Pull one batch, hand it to the sink, and tune the batch size from how long the sink took """
+        batch = self.next_batch()
+        if not batch:
+            return 0
+
+        start = time.perf_counter()
+        sink(batch)
+        self.record_latency(time.perf_counter() - start)
+        return len(batch)
+
+
+def benchmark(n: int = 50_000, per_call_cost: float = 0.0005, per_item_cost: float = 0.000001,
+              batch_size: int = 256) -> dict:
+    """
+    Simulated sink with a fixed per-call overhead plus a per-item cost (like a DB round trip + row writes).
+    Compares a one-item-per-call consumer against fixed and adaptive batching, returns items/sec.
+    """
+
+    def sink(batch: list) -> None:
+        time.sleep(per_call_cost + per_item_cost * len(batch))
+
+    def run(consume: Callable[[BatchQueue], int], items: int) -> float:
+        q = BatchQueue()
+        for i in range(items):
+            q.enqueue(i)
+        start = time.perf_counter()
+        done = 0
+        while done < items:
+            done += consume(q)
+        return items / (time.perf_counter() - start)
+
+    def single(q: BatchQueue) -> int:
+        sink([q.dequeue()])
+        return 1
+
+    def fixed(q: BatchQueue) -> int:
+        batch = q.dequeue_batch(max_items=batch_size, max_wait=0)
+        sink(batch)
+        return len(batch)
+
+    batcher = None
+
+    def adaptive(q: BatchQueue) -> int:
+        nonlocal batcher
+        if batcher is None:
+            batcher = AdaptiveBatcher(q, target_latency=per_call_cost * 4, max_wait=0)
+        return batcher.consume(sink)
+
+    # The unbatched consumer is slow, so it only gets a slice of the workload
+    return {
+        "single": run(single, min(n, 1000)),
+        f"fixed({batch_size})": run(fixed, n),
+        "adaptive": run(adaptive, n),
+    }
+
+
+class Test(unittest.TestCase):
+    def test_dequeue_batch(self):
+        q = BatchQueue()
+        for i in range(10):
+            q.enqueue(i)
+
+        self.assertEqual(q.dequeue_batch(max_items=4, max_wait=0), [0, 1, 2, 3])
+        self.assertEqual(q.dequeue_batch(max_items=100, max_wait=0), [4, 5, 6, 7, 8, 9])
+        self.assertEqual(q.dequeue_batch(max_items=100, max_wait=0), [])
+        self.assertTrue(q.is_empty())
+
+    def test_dequeue_batch_deadline(self):
+        q = BatchQueue()
+        q.enqueue(1)
+        start = time.monotonic()
+        self.assertEqual(q.dequeue_batch(max_items=10, max_wait=0.05), [1])
+        self.assertGreaterEqual(time.monotonic() - start, 0.04)
+
+        with self.assertRaises(Exception):
+            q.dequeue(timeout=0)
+
+    def test_dequeue_batch_waits_for_producer(self):
+        q = BatchQueue()
+
+        def producer():
+            for i in range(5):
+                time.sleep(0.001)
+                q.enqueue(i)
+
+        t = threading.Thread(target=producer)
+        t.start()
+        self.assertEqual(q.dequeue_batch(max_items=5, max_wait=None), [0, 1, 2, 3, 4])
+        t.join()
+
+    def test_bounded_enqueue(self):
+        q = BatchQueue(maxsize=2)
+        q.enqueue(1)
+        q.enqueue(2)
+        with self.assertRaises(Exception):
+            q.enqueue(3, timeout=0.01)
+
+        t = threading.Thread(target=lambda: q.enqueue(3))
+        t.start()
+        self.assertEqual(q.dequeue(), 1)
+        t.join(timeout=1)
+        self.assertEqual(q.dequeue_batch(max_items=5, max_wait=0), [2, 3])
+
+    def test_bounded_batch_wakes_blocked_producers(self):
+        # A batch bigger than the queue: it can only fill up if draining the queue wakes the blocked producers
+        q = BatchQueue(maxsize=2)
+        producers = [threading.Thread(target=q.enqueue, args=(i,)) for i in range(5)]
+        for t in producers:
+            t.start()
+
+        start = time.monotonic()
+        self.assertEqual(sorted(q.dequeue_batch(max_items=5, max_wait=2)), [0, 1, 2, 3, 4])
+        self.assertLess(time.monotonic() - start, 1)
+        for t in producers:
+            t.join(timeout=1)
+            self.assertFalse(t.is_alive())
+
+        results = []
+        consumer = threading.Thread(target=lambda: results.extend(q.dequeue_batch(max_items=5, max_wait=None)))
+        consumer.start()
+        for i in range(5):
+            q.enqueue(i, timeout=1)
+        consumer.join(timeout=2)
+        self.assertFalse(consumer.is_alive())
+        self.assertEqual(results, [0, 1, 2, 3, 4])
+
+    def test_threaded_consumers(self):
+        q = BatchQueue(maxsize=64)
+        n = 2000
+        results = []
+        results_lock = threading.Lock()
+
+        def consumer():
+            while True:
+                batch = q.dequeue_batch(max_items=32, max_wait=0.05)
+                if not batch:
+                    return
+                with results_lock:
+                    results.extend(batch)
+
+        consumers = [threading.Thread(target=consumer) for _ in range(4)]
+        for c in consumers:
+            c.start()
+        for i in range(n):
+            q.enqueue(i)
+        for c in consumers:
+            c.join()
+        self.assertEqual(sorted(results), list(range(n)))
+
+    def test_adaptive_batcher(self):
+        q = BatchQueue()
+        batcher = AdaptiveBatcher(q, target_latency=1.0, min_batch=2, max_batch=8)
+        batcher.record_latency(0.5)
+        self.assertEqual(batcher.batch_size, 4)
+        for _ in range(10):
+            batcher.record_latency(0.5)
+        self.assertEqual(batcher.batch_size, 8)
+        batcher.record_latency(2.0)
+        self.assertEqual(batcher.batch_size, 4)
+
+        for i in range(10):
+            q.enqueue(i)
+        received = []
+        batcher.max_wait = 0
+        while not q.is_empty():
+            batcher.consume(received.extend)
+        self.assertEqual(received, list(range(10)))
+
+
+if __name__ == "__main__":
+    unittest.main()
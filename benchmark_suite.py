@@ -0,0 +1,490 @@
+import argparse
+import json
+import math
+import platform
+import random
+import statistics
+import sys
+import time
+import unittest
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional
+
+import hash_table
+import heaps
+import insertion_sort
+import linked_lists
+import matrix_multiplication
+import maximum_subarray
+import merge_sort
+import priority_queue
+import queues
+import quick_sort
+import radix_sort
+import sliding_window
+import stacks
+
+
+# One benchmark harness for the whole repo, instead of a benchmark() per module with its own inputs and timing.
+#
+#     python benchmark_suite.py run --out baseline.json           (full run, under a minute)
+#     python benchmark_suite.py run --quick --filter sorts/ --out current.json
+#     python benchmark_suite.py compare baseline.json current.json --threshold 0.10
+#
+# - A case is a setup (not timed, e.g. copy the input so every repetition sorts the same unsorted list) and a run
+#   (timed). Each case runs on every input generator it accepts, at every size.
+# - Every measurement does `warmup` untimed runs, then `repeat` timed samples, and records seconds per run as
+#   min/median/mean/stdev and the min's standard error. A sample times enough back to back runs (`loops`) to last
+#   MIN_SAMPLE_SECS: a single run of a sub-millisecond case is mostly timer resolution and scheduler noise.
+# - compare() matches results by (case, input, n) and compares the mins: noise only ever adds time, so the fastest
+#   sample is the most repeatable statistic. A case is flagged only if its min got slower than the baseline's by more
+#   than `threshold` (10% by default) AND by more than NOISE_SIGMAS standard errors of the difference of the mins
+#   (each min's standard error bootstrapped from its samples), so a difference the runs can't resolve isn't reported.
+#   The command exits with status 1 if anything regressed, so it can gate CI.
+# Quadratic cases (insertion sort, quick_sort on sorted input, StackQ, linked list search) are capped at max_n,
+# otherwise they'd be most of the run time.
+
+SIZES = (1_000, 10_000)
+QUICK_SIZES = (200, 1_000)
+QUADRATIC_MAX_N = 2_000
+MIN_SAMPLE_SECS = 0.001
+REPEAT = 15
+NOISE_SIGMAS = 3
+
+
+# === Input generators ===
+# Every generator returns n ints, generator(n, rng). Values are in [0, n) unless noted.
+
+def random_input(n: int, rng: random.Random) -> List[int]:
+    return [rng.randrange(n) for _ in range(n)]
+
+
+def sorted_input(n: int, rng: random.Random) -> List[int]:
+    return list(range(n))
+
+
+def reversed_input(n: int, rng: random.Random) -> List[int]:
+    return list(range(n - 1, -1, -1))
+
+
+def few_unique_input(n: int, rng: random.Random, unique: int = 10) -> List[int]:
+    return [rng.randrange(unique) for _ in range(n)]
+
+
+def adversarial_input(n: int, rng: random.Random) -> List[int]:
+    """
+    Musser's median-of-3 killer: a permutation of 1..n on which a median-of-three pivot is always near the smallest
+    key, so median-of-three quicksort is O(n^2) (introsort switches to heap sort on it).
+    The repo's quick_sort picks the last key as the pivot, for that sorted_input and reversed_input are already the
+    worst case.
+    """
+    k = n // 4 * 2  # The construction needs an even half, the last n % 4 keys go on the end in order
+    A = [0] * (2 * k)
+    for i in range(1, k + 1):
+        if i % 2 == 1:
+            A[i - 1] = i
+            A[i] = k + i
+        A[k + i - 1] = 2 * i
+    return A + list(range(2 * k + 1, n + 1))
+
+
+def zipf_input(n: int, rng: random.Random, s: float = 1.1) -> List[int]:
+    """ Values 1..n, value k drawn with probability proportional to 1/k^s: a few very hot keys and a long tail """
+    weights = [1 / k ** s for k in range(1, n + 1)]
+    return rng.choices(range(1, n + 1), weights=weights, k=n)
+
+
+GENERATORS: Dict[str, Callable[[int, random.Random], List[int]]] = {
+    "random": random_input,
+    "sorted": sorted_input,
+    "reversed": reversed_input,
+    "few_unique": few_unique_input,
+    "adversarial": adversarial_input,
+    "zipf": zipf_input,
+}
+ALL_INPUTS = tuple(GENERATORS)
+
+
+# === Cases ===
+
+class Case:
+    def __init__(self, name: str, run: Callable, setup: Callable = list, inputs: Iterable[str] = ALL_INPUTS,
+                 max_n: Optional[int] = None):
+        """
+        name: "group/name", e.g. "sorts/heap_sort"
+        run: the timed function, called with setup(data)
+        setup: untimed, turns the generated data into run's argument. Runs before every repetition
+        inputs: names of the generators to run on
+        max_n: skip sizes above this
+        """
+        self.name = name
+        self.run = run
+        self.setup = setup
+        self.inputs = tuple(inputs)
+        self.max_n = max_n
+
+
+def _fill_and_drain(new: Callable, add: str, remove: str) -> Callable[[list], None]:
+    """ A run that adds every key to new(n) with `add`, then removes them all with `remove` """
+    def run(data: list) -> None:
+        container = new(len(data))
+        add_item = getattr(container, add)
+        for x in data:
+            add_item(x)
+        remove_item = getattr(container, remove)
+        for _ in range(len(data)):
+            remove_item()
+    return run
+
+
+def _priority_queue(data: list) -> None:
+    pq = priority_queue.MaxPriorityQueue()
+    for x in data:
+        pq.insert(x)
+    for _ in range(len(data)):
+        pq.extract_max()
+
+
+def _hash_table(table_type: type, load: float) -> Callable[[list], None]:
+    """ put every key (repeated keys update), get every key, get n missing keys, delete every key """
+    def run(data: list) -> None:
+        n = len(data)
+        table = table_type(hash_function=hash_table.hash_division_method, size=max(1, int(n / load)))
+        for x in data:
+            table.put(x, x)
+        for x in data:
+            table.get(x)
+        for x in range(-n, 0):
+            table.get(x)
+        for x in data:
+            table.delete(x)
+    return run
+
+
+def _linked_list(list_type: type, ops: int = 100) -> Callable[[list], None]:
+    """ Insert every key, then search for and delete `ops` of them """
+    def run(data: list) -> None:
+        ll = list_type()
+        for x in data:
+            ll.insert(x)
+        for x in data[:ops]:
+            ll.search(x)
+            ll.delete(x)
+    return run
+
+
+def _to_text(data: list) -> str:
+    return "".join(chr(ord("a") + x % 26) for x in data)
+
+
+def _centered(data: list) -> list:
+    """ Shift the keys so about half are negative, otherwise the maximum subarray is just the whole array """
+    mid = (max(data) + min(data)) // 2
+    return [x - mid for x in data]
+
+
+def _matrices(data: list):
+    """ Two n x n matrices, n the biggest power of 2 with n^2 <= len(data) (the recursive versions assume one) """
+    n = 1 << (max(1, int(len(data) ** 0.5)).bit_length() - 1)
+    A = [data[i * n:(i + 1) * n] for i in range(n)]
+    B = [row[::-1] for row in reversed(A)]
+    return A, B, n
+
+
+def _sort_cases() -> List[Case]:
+    return [
+        Case("sorts/insertion_sort", insertion_sort.insertion_sort_clrs, max_n=QUADRATIC_MAX_N),
+        Case("sorts/binary_insertion_sort", insertion_sort.binary_insertion_sort, max_n=QUADRATIC_MAX_N),
+        Case("sorts/merge_sort", lambda A: merge_sort.merge_sort(A, 0, len(A) - 1)),
+        Case("sorts/merge_sort_adaptive", merge_sort.merge_sort_adaptive),
+        # Iterative, so the O(N) deep partitions on sorted input can't overflow the recursion limit
+        Case("sorts/quick_sort", lambda A: quick_sort.quick_sort_iterative(A, 0, len(A) - 1), max_n=QUADRATIC_MAX_N),
+        Case("sorts/introsort", quick_sort.introsort),
+        Case("sorts/heap_sort", lambda A: heaps.heap_sort(A, len(A) - 1)),
+        Case("sorts/counting_sort", radix_sort.counting_sort),
+        Case("sorts/lsd_radix_sort", radix_sort.lsd_radix_sort),
+        Case("sorts/sorted", lambda A: A.sort()),  # Reference point
+    ]
+
+
+def _cases() -> List[Case]:
+    structures = ("random", "zipf")
+    return _sort_cases() + [
+        Case("heaps/build_max_heap", lambda A: heaps.build_max_heap(A, len(A) - 1)),
+        Case("priority_queue/insert_extract", _priority_queue),
+        Case("hash_table/chaining", _hash_table(hash_table.HashTableChaining, load=1.0), inputs=structures),
+        Case("hash_table/probing", _hash_table(hash_table.HashTableProbing, load=0.5), inputs=structures),
+        Case("stacks/StackArr", _fill_and_drain(lambda n: stacks.StackArr(), "push", "pop"), inputs=("random",)),
+        Case("stacks/StackLL", _fill_and_drain(lambda n: stacks.StackLL(), "push", "pop"), inputs=("random",)),
+        Case("stacks/StackQ", _fill_and_drain(stacks.StackQ, "push", "pop"), inputs=("random",),
+             max_n=QUADRATIC_MAX_N),
+        Case("queues/QueueArr", _fill_and_drain(queues.QueueArr, "enqueue", "dequeue"), inputs=("random",)),
+        Case("queues/QueueLL", _fill_and_drain(lambda n: queues.QueueLL(), "enqueue", "dequeue"), inputs=("random",)),
+        Case("queues/QueueTwoStacks", _fill_and_drain(queues.QueueTwoStacks, "enqueue", "dequeue"),
+             inputs=("random",)),
+        Case("linked_lists/SinglyLinkedList", _linked_list(linked_lists.SinglyLinkedList), inputs=structures,
+             max_n=QUADRATIC_MAX_N * 5),
+        Case("linked_lists/DoublyLinkedList", _linked_list(linked_lists.DoublyLinkedList), inputs=structures,
+             max_n=QUADRATIC_MAX_N * 5),
+        Case("sliding_window/max_sum_subarray", lambda A: sliding_window.max_sum_subarray(A, 10)),
+        Case("sliding_window/smallest_sub_array", lambda A: sliding_window.smallest_sub_array(A, 10 * len(A))),
+        Case("sliding_window/longest_substring_distinct_chars",
+             lambda s: sliding_window.longest_substring_distinct_chars(s, 3), setup=_to_text),
+        Case("maximum_subarray/divide_and_conquer",
+             lambda A: maximum_subarray.find_maximum_subarray(A, 0, len(A) - 1), setup=_centered),
+        Case("maximum_subarray/sliding_window", maximum_subarray.find_max_subarray_sliding_window, setup=_centered),
+        Case("matrix_multiplication/iterative",
+             lambda args: matrix_multiplication.matrix_multiplication_iterative(*args), setup=_matrices,
+             inputs=("random",)),
+        Case("matrix_multiplication/explicit_stack",
+             lambda args: matrix_multiplication.matrix_multiplication_explicit_stack(*args), setup=_matrices,
+             inputs=("random",)),
+    ]
+
+
+# === Running ===
+
+def _sample(case: Case, data: list, loops: int) -> float:
+    """ Seconds per run of `loops` back to back runs. The setups are done first, untimed """
+    args = [case.setup(data) for _ in range(loops)]
+    start = time.perf_counter()
+    for arg in args:
+        case.run(arg)
+    return (time.perf_counter() - start) / loops
+
+
+def _calibrate(case: Case, data: list, warmup: int, min_sample_secs: float) -> int:
+    """ Do the warmup runs, then return how many runs a sample needs to last min_sample_secs """
+    for _ in range(warmup):
+        case.run(case.setup(data))
+    single = _sample(case, data, 1)
+    return 1 if single >= min_sample_secs else int(min_sample_secs / max(single, 1e-7)) + 1
+
+
+def _min_stderr(times: List[float], resamples: int = 200) -> float:
+    """
+    Standard error of min(times), bootstrapped: the stdev of the min over resamples of the samples (with replacement).
+    Small when several samples agree on the fastest time, large when only one sample got that fast
+    """
+    if len(times) < 2:
+        return 0.0
+    rng = random.Random(0)
+    return statistics.stdev(min(rng.choices(times, k=len(times))) for _ in range(resamples))
+
+
+def _stats(times: List[float], loops: int) -> dict:
+    return {
+        "min": min(times),
+        "min_stderr": _min_stderr(times),
+        "median": statistics.median(times),
+        "mean": statistics.mean(times),
+        "stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+        "repeat": len(times),
+        "loops": loops,
+    }
+
+
+def measure(case: Case, data: list, warmup: int = 1, repeat: int = REPEAT,
+            min_sample_secs: float = MIN_SAMPLE_SECS) -> dict:
+    """
+    Time case.run on data: warmup untimed runs, then repeat timed samples of `loops` runs each, enough runs for a
+    sample to last min_sample_secs. Seconds per run
+    """
+    loops = _calibrate(case, data, warmup, min_sample_secs)
+    return _stats([_sample(case, data, loops) for _ in range(repeat)], loops)
+
+
+def run(sizes: Iterable[int] = SIZES, filter: str = "", warmup: int = 1, repeat: int = REPEAT, seed: int = 0,
+        verbose: bool = False) -> dict:
+    """
+    Run every case whose name contains `filter`. Returns the report compare() takes.
+    The samples are taken in `repeat` rounds, each round timing every case once, rather than all of a case's samples
+    back to back: if the machine slows down for a few seconds (frequency scaling, a noisy neighbour), that costs every
+    case one slow sample instead of costing a few cases all of theirs.
+    """
+    measurements = []
+    for case in _cases():
+        if filter not in case.name:
+            continue
+        for input_name in case.inputs:
+            for n in sizes:
+                if case.max_n is not None and n > case.max_n:
+                    continue
+                data = GENERATORS[input_name](n, random.Random(seed))
+                measurements.append((case, input_name, n, data, _calibrate(case, data, warmup, MIN_SAMPLE_SECS)))
+
+    times: List[List[float]] = [[] for _ in measurements]
+    for _ in range(repeat):
+        for (case, _, _, data, loops), samples in zip(measurements, times):
+            samples.append(_sample(case, data, loops))
+
+    results = []
+    for (case, input_name, n, _, loops), samples in zip(measurements, times):
+        result = {"case": case.name, "input": input_name, "n": n, **_stats(samples, loops)}
+        results.append(result)
+        if verbose:
+            print(f"{case.name:50} {input_name:12} n={n:<8} min {result['min']:.6f}s", file=sys.stderr)
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "sizes": list(sizes),
+            "warmup": warmup,
+            "repeat": repeat,
+            "min_sample_secs": MIN_SAMPLE_SECS,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def _key(result: dict) -> str:
+    return f"{result['case']} [{result['input']}, n={result['n']}]"
+
+
+# Time Complexity: O(R) for R results
+def compare(baseline: dict, current: dict, threshold: float = 0.10, sigmas: float = NOISE_SIGMAS) -> dict:
+    """
+    Compare the mins of two run() reports. A result is a regression if its min is more than threshold
+    (a fraction, 0.10 = 10%) slower than the baseline's, an improvement if it's that much faster, and either way only
+    if the difference is also more than `sigmas` standard errors of the difference, sqrt(se_old^2 + se_new^2) with
+    se the "min_stderr" of each result; otherwise it's within the noise.
+    Results only in one of the reports are listed under "missing" / "new".
+    """
+    before = {_key(result): result for result in baseline["results"]}
+    after = {_key(result): result for result in current["results"]}
+
+    report = {"threshold": threshold, "regressions": [], "improvements": [], "unchanged": [],
+              "missing": sorted(before.keys() - after.keys()), "new": sorted(after.keys() - before.keys())}
+    for key in sorted(before.keys() & after.keys()):
+        old, new = before[key]["min"], after[key]["min"]
+        noise = sigmas * math.hypot(before[key]["min_stderr"], after[key]["min_stderr"])
+        ratio = new / old if old > 0 else float("inf")
+        entry = {"key": key, "baseline": old, "current": new, "ratio": ratio}
+        if ratio > 1 + threshold and new - old > noise:
+            report["regressions"].append(entry)
+        elif ratio < 1 - threshold and old - new > noise:
+            report["improvements"].append(entry)
+        else:
+            report["unchanged"].append(entry)
+    return report
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(prog="benchmark_suite.py", description="Benchmark the repo's algorithms")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks, write a JSON report")
+    run_parser.add_argument("--out", help="report path (default: stdout)")
+    run_parser.add_argument("--sizes", type=lambda s: [int(n) for n in s.split(",")], help="e.g. 1000,10000")
+    run_parser.add_argument("--quick", action="store_true", help=f"sizes {QUICK_SIZES}")
+    run_parser.add_argument("--filter", default="", help="only cases whose name contains this, e.g. sorts/")
+    run_parser.add_argument("--warmup", type=int, default=1)
+    run_parser.add_argument("--repeat", type=int)
+    run_parser.add_argument("--seed", type=int, default=0)
+
+    compare_parser = commands.add_parser("compare", help="flag regressions against a baseline report")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="0.10 = flag >10%% slower mins")
+    compare_parser.add_argument("--sigmas", type=float, default=NOISE_SIGMAS,
+                                help="standard errors a difference must exceed to be flagged (default %(default)s)")
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        sizes = args.sizes or (QUICK_SIZES if args.quick else SIZES)
+        repeat = args.repeat or REPEAT
+        report = run(sizes, args.filter, args.warmup, repeat, args.seed, verbose=True)
+        text = json.dumps(report, indent=2)
+        if args.out:
+            with open(args.out, "w") as f:
+                f.write(text + "\n")
+        else:
+            print(text)
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    report = compare(baseline, current, args.threshold, args.sigmas)
+    for label in ("regressions", "improvements"):
+        for entry in report[label]:
+            print(f"{label[:-1].upper():12} {entry['key']:70} {entry['baseline']:.6f}s -> {entry['current']:.6f}s "
+                  f"({entry['ratio']:.2f}x)")
+    for label in ("missing", "new"):
+        for key in report[label]:
+            print(f"{label.upper():12} {key}")
+    print(f"{len(report['regressions'])} regressions, {len(report['improvements'])} improvements, "
+          f"{len(report['unchanged'])} unchanged (threshold {args.threshold:.0%})")
+    return 1 if report["regressions"] else 0
+
+
+class Test(unittest.TestCase):
+    def test_generators(self):
+        rng = random.Random(1)
+        for name, generator in GENERATORS.items():
+            for n in (1, 2, 7, 100):
+                data = generator(n, rng)
+                self.assertEqual(len(data), n, name)
+                self.assertTrue(all(isinstance(x, int) for x in data), name)
+
+        self.assertEqual(sorted_input(5, rng), [0, 1, 2, 3, 4])
+        self.assertEqual(reversed_input(5, rng), [4, 3, 2, 1, 0])
+        self.assertLessEqual(len(set(few_unique_input(1000, rng))), 10)
+        for n in (10, 11, 1000):
+            self.assertEqual(sorted(adversarial_input(n, rng)), list(range(1, n + 1)))
+        # Zipf: the most common key is 1, and it's far more common than in a uniform draw
+        zipf = zipf_input(1000, rng)
+        self.assertEqual(max(set(zipf), key=zipf.count), 1)
+        self.assertGreater(zipf.count(1), 50)
+
+    def test_cases_run(self):
+        # Every case on every input it accepts, with a size that exercises odd lengths. The sorts must sort
+        for case in _cases():
+            for input_name in case.inputs:
+                data = GENERATORS[input_name](37, random.Random(2))
+                arg = case.setup(data)
+                case.run(arg)
+                if case.name.startswith("sorts/"):
+                    self.assertEqual(arg, sorted(data), case.name)
+
+    def test_run_and_compare(self):
+        report = run(sizes=(50,), filter="sorts/heap_sort", warmup=0, repeat=2)
+        self.assertEqual(len(report["results"]), len(ALL_INPUTS))
+        result = report["results"][0]
+        self.assertLessEqual(result["min"], result["median"])
+        # A heap sort of 50 items is far below MIN_SAMPLE_SECS, so every sample times many runs
+        self.assertGreater(result["loops"], 1)
+        self.assertGreaterEqual(result["min"] * result["loops"], MIN_SAMPLE_SECS / 2)
+        # The min's standard error is small when most samples agree on it, large when one sample is far faster
+        self.assertLess(_min_stderr([1.0] * 10 + [1.5] * 5), 0.01)
+        self.assertGreater(_min_stderr([0.5] + [1.0] * 14), 0.1)
+        json.dumps(report)
+
+        def results(*cases):
+            return {"results": [{"case": case, "input": "random", "n": 10, "min": secs, "min_stderr": stderr}
+                                for case, secs, stderr in cases]}
+
+        baseline = results(("a", 1.0, 0.01), ("b", 1.0, 0.01), ("c", 1.0, 0.01), ("d", 1.0, 0.01), ("f", 1.0, 0.1))
+        current = results(("a", 1.25, 0.01), ("b", 1.05, 0.01), ("c", 0.5, 0.01), ("e", 1.0, 0.01), ("f", 1.25, 0.1))
+        report = compare(baseline, current, threshold=0.10)
+        self.assertEqual([entry["key"] for entry in report["regressions"]], ["a [random, n=10]"])
+        self.assertEqual([entry["key"] for entry in report["improvements"]], ["c [random, n=10]"])
+        # b is within the threshold. f is 25% slower, but under 3 standard errors of the difference (0.1 * sqrt(2))
+        self.assertEqual([entry["key"] for entry in report["unchanged"]], ["b [random, n=10]", "f [random, n=10]"])
+        self.assertEqual(report["missing"], ["d [random, n=10]"])
+        self.assertEqual(report["new"], ["e [random, n=10]"])
+        # 0.25 is 1.8 standard errors: flagged with a lower tolerance
+        report = compare(baseline, current, threshold=0.10, sigmas=1.5)
+        self.assertEqual([entry["key"] for entry in report["regressions"]], ["a [random, n=10]", "f [random, n=10]"])
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] in (["run"], ["compare"]):
+        sys.exit(main(sys.argv[1:]))
+    else:
+        unittest.main()
@@ -0,0 +1,352 @@
+import argparse
+import inspect
+import math
+import random
+import re
+import sys
+import time
+import unittest
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import hash_table
+import heaps
+import insertion_sort
+import linked_lists
+import matrix_multiplication
+import maximum_subarray
+import merge_sort
+import priority_queue
+import quick_sort
+from benchmark_suite import adversarial_input, random_input, reversed_input, sorted_input
+from instrumentation import count_operations, counters
+
+
+# Check the "Time Complexity: O(...)" comments against what the code actually does.
+#
+#     python complexity_fit.py check [--filter quick_sort] [--strict]
+#
+# Each subject is run at a geometric range of sizes n (128, 256, ..., 2048 by default) and its cost at every size is
+# fitted to each candidate class c * f(n). Cost is an operation count from instrumentation.counters() where the code
+# can be instrumented (comparisons + swaps + moves, slot probes, element reads), which is exact and machine
+# independent, and the best of a few timings otherwise.
+# The fit is done on log2 scale: log2(cost) = log2(c) + log2(f(n)). The best c is the mean of
+# log2(cost) - log2(f(n)) and the residual is how far the points are from that line, in doublings. The class with the
+# smallest residual wins. This weighs every size equally, a least squares fit on the raw costs would only see the
+# biggest n.
+# The claimed class is read from the comment block right above the function's def (the repo's convention).
+# A subject is a MISMATCH if the best fit isn't the claim, unless the claim fits within `tolerance` doublings of it.
+
+CLASSES: Dict[str, Callable[[int], float]] = {
+    "O(1)": lambda n: 1.0,
+    "O(logn)": lambda n: math.log2(n),
+    "O(N)": lambda n: float(n),
+    "O(nlogn)": lambda n: n * math.log2(n),
+    "O(n^2)": lambda n: float(n) ** 2,
+    "O(n^3)": lambda n: float(n) ** 3,
+}
+# Spellings used in the comments -> class. Spaces, '*' and case are ignored
+_ALIASES = {"1": "O(1)", "logn": "O(logn)", "lgn": "O(logn)", "n": "O(N)", "nlogn": "O(nlogn)", "nlgn": "O(nlogn)",
+            "n^2": "O(n^2)", "n2": "O(n^2)", "n²": "O(n^2)", "n^3": "O(n^3)", "n3": "O(n^3)", "n³": "O(n^3)"}
+
+SIZES = (128, 256, 512, 1024, 2048)
+TOLERANCE = 0.05
+
+
+# === Claims ===
+
+def parse_claim(text: str) -> Optional[str]:
+    """
+    The complexity class a comment claims, e.g. "# Time Complexity: O(nlogn) | Space: O(N)" -> "O(nlogn)".
+    Prefers what follows "Time Complexity", otherwise the first O(...). None if there's none we know (e.g. O(n + k))
+    """
+    match = re.search(r"time complexity:?\s*O?\(([^)]*)\)", text, re.IGNORECASE)
+    if match is None:
+        match = re.search(r"\bO\(([^)]*)\)", text)
+    if match is None:
+        return None
+    return _ALIASES.get(re.sub(r"[\s*]", "", match.group(1)).lower())
+
+
+# Time Complexity: O(L) for L lines above the def
+def claimed_complexity(func: Callable) -> Optional[str]:
+    """ The class claimed by the comment block directly above func's def (or decorators) """
+    lines, start = inspect.getsourcelines(func)
+    source = inspect.getsourcefile(func)
+    with open(source, encoding="utf-8") as f:
+        above = f.read().splitlines()[:start - 1]
+
+    comments = []
+    for line in reversed(above):
+        stripped = line.strip()
+        if not stripped.startswith("#"):
+            break
+        comments.append(stripped)
+    return parse_claim("\n".join(reversed(comments))) if comments else None
+
+
+# === Fitting ===
+
+def fit(sizes: Iterable[int], costs: Iterable[float]) -> List[Tuple[str, float]]:
+    """ (class, residual) for every class in CLASSES, best fit first. Residual: RMS distance from c*f(n) in doublings """
+    points = [(n, max(cost, 1e-12)) for n, cost in zip(sizes, costs)]
+    if len(points) < 3:
+        raise ValueError("fitting needs at least 3 sizes")
+
+    results = []
+    for name, f in CLASSES.items():
+        diffs = [math.log2(cost) - math.log2(f(n)) for n, cost in points]
+        log_c = sum(diffs) / len(diffs)
+        results.append((name, math.sqrt(sum((d - log_c) ** 2 for d in diffs) / len(diffs))))
+    return sorted(results, key=lambda result: result[1])
+
+
+# === Subjects ===
+
+class Subject:
+    def __init__(self, name: str, func: Callable, cost: Callable[[int], float], unit: str,
+                 sizes: Iterable[int] = SIZES, claimed: Optional[str] = None):
+        """
+        name: what's measured, e.g. "quick_sort (sorted input)"
+        func: the function whose comment holds the claim
+        cost: cost(n), the operation count or seconds at size n
+        unit: what cost counts, for the report
+        claimed: the claim, for functions without a complexity comment
+        """
+        self.name = name
+        self.func = func
+        self.cost = cost
+        self.unit = unit
+        self.sizes = tuple(sizes)
+        self.claimed = claimed
+
+
+def _sort_ops(sort: Callable[[list], None], generator: Callable) -> Callable[[int], float]:
+    def cost(n: int) -> float:
+        ops = count_operations(sort, generator(n, random.Random(n)))
+        return ops["comparisons"] + ops["swaps"] + ops["moves"]
+    return cost
+
+
+def _reads(run: Callable[[list], None]) -> Callable[[int], float]:
+    """ Element reads of run on a tracked list of n random keys in [-n/2, n/2) """
+    def cost(n: int) -> float:
+        data = [x - n // 2 for x in random_input(n, random.Random(n))]
+        with counters() as c:
+            run(c.track(data))
+        return c.reads
+    return cost
+
+
+def _probing_get_miss(n: int) -> float:
+    """ Probes of one get() of a missing key, in a half full table (keys 0..n-1, capacity 2n) """
+    table = hash_table.HashTableProbing(hash_function=hash_table.hash_division_method, size=2 * n)
+    for key in range(n):
+        table.put(key, key)
+    with counters() as c:
+        c.track_table(table)
+        table.get(2 * n)  # Hashes to slot 0, which is taken
+    return c.probes
+
+
+def _chaining_get_seconds(n: int, gets: int = 2_000, repeat: int = 5) -> float:
+    """ Seconds for `gets` hits, load factor 1 """
+    table = hash_table.HashTableChaining(hash_function=hash_table.hash_division_method, size=n)
+    keys = random_input(n, random.Random(n))
+    for key in keys:
+        table.put(key, key)
+    lookups = [keys[i % n] for i in range(gets)]
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for key in lookups:
+            table.get(key)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _priority_queue_ops(operation: str) -> Callable[[int], float]:
+    """ Comparisons + swaps of one insert of a new maximum / one extract_max on a heap of n keys (both worst cases) """
+    def cost(n: int) -> float:
+        pq = priority_queue.MaxPriorityQueue()
+        with counters() as c:
+            pq.A = c.track(c.wrap(range(n - 1, -1, -1)))  # Descending is a valid max-heap
+            before = c.comparisons + c.swaps
+            if operation == "insert":
+                pq.insert(n)
+            else:
+                pq.extract_max()
+        return c.comparisons + c.swaps - before
+    return cost
+
+
+def _linked_list_search_miss(n: int) -> float:
+    ll = linked_lists.SinglyLinkedList()
+    with counters() as c:
+        for item in c.wrap(range(n)):
+            ll.insert(item)
+        ll.search(-1)
+    return c.comparisons
+
+
+def _matrix_seconds(n: int, repeat: int = 3) -> float:
+    rng = random.Random(n)
+    A = [[rng.randrange(100) for _ in range(n)] for _ in range(n)]
+    B = [[rng.randrange(100) for _ in range(n)] for _ in range(n)]
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        matrix_multiplication.matrix_multiplication_iterative(A, B, n)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def subjects() -> List[Subject]:
+    ops = "comparisons + swaps + moves"
+    return [
+        Subject("quick_sort (random input)", quick_sort.quick_sort,
+                _sort_ops(lambda A: quick_sort.quick_sort(A, 0, len(A) - 1), random_input), ops),
+        Subject("quick_sort (sorted input)", quick_sort.quick_sort,
+                _sort_ops(lambda A: quick_sort.quick_sort(A, 0, len(A) - 1), sorted_input), ops),
+        Subject("introsort (median-of-3 killer)", quick_sort.introsort,
+                _sort_ops(quick_sort.introsort, adversarial_input), ops, claimed="O(nlogn)"),
+        Subject("merge_sort (random input)", merge_sort.merge_sort,
+                _sort_ops(lambda A: merge_sort.merge_sort(A, 0, len(A) - 1), random_input), ops),
+        Subject("heap_sort (random input)", heaps.heap_sort,
+                _sort_ops(lambda A: heaps.heap_sort(A, len(A) - 1), random_input), ops),
+        Subject("build_max_heap (random input)", heaps.build_max_heap,
+                _sort_ops(lambda A: heaps.build_max_heap(A, len(A) - 1), random_input), "comparisons + swaps"),
+        Subject("insertion_sort (reversed input)", insertion_sort.insertion_sort,
+                _sort_ops(insertion_sort.insertion_sort, reversed_input), ops),
+        Subject("MaxPriorityQueue.insert (new maximum)", priority_queue.MaxPriorityQueue.insert,
+                _priority_queue_ops("insert"), "comparisons + swaps", sizes=(2 ** 8, 2 ** 10, 2 ** 12, 2 ** 14)),
+        Subject("MaxPriorityQueue.extract_max", priority_queue.MaxPriorityQueue.extract_max,
+                _priority_queue_ops("extract_max"), "comparisons + swaps", sizes=(2 ** 8, 2 ** 10, 2 ** 12, 2 ** 14)),
+        Subject("HashTableChaining.get (hit, load factor 1)", hash_table.HashTableChaining.get,
+                _chaining_get_seconds, "seconds per 2000 gets", sizes=(2 ** 8, 2 ** 10, 2 ** 12, 2 ** 14)),
+        Subject("HashTableProbing.get (miss, half full)", hash_table.HashTableProbing.get, _probing_get_miss,
+                "probes", claimed="O(1)"),
+        Subject("SinglyLinkedList.search (miss)", linked_lists.SinglyLinkedList.search, _linked_list_search_miss,
+                "comparisons"),
+        Subject("find_maximum_subarray", maximum_subarray.find_maximum_subarray,
+                _reads(lambda A: maximum_subarray.find_maximum_subarray(A, 0, len(A) - 1)), "reads"),
+        Subject("find_max_subarray_sliding_window", maximum_subarray.find_max_subarray_sliding_window,
+                _reads(maximum_subarray.find_max_subarray_sliding_window), "reads"),
+        Subject("matrix_multiplication_iterative", matrix_multiplication.matrix_multiplication_iterative,
+                _matrix_seconds, "seconds", sizes=(16, 32, 64, 128)),
+    ]
+
+
+# === Checking ===
+
+def check_subject(subject: Subject, tolerance: float = TOLERANCE) -> dict:
+    claimed = subject.claimed or claimed_complexity(subject.func)
+    costs = [subject.cost(n) for n in subject.sizes]
+    ranking = fit(subject.sizes, costs)
+    best, best_residual = ranking[0]
+    residuals = dict(ranking)
+
+    if claimed is None:
+        status = "NO CLAIM"
+    elif claimed == best or residuals[claimed] <= best_residual + tolerance:
+        status = "ok"
+    else:
+        status = "MISMATCH"
+    return {
+        "name": subject.name,
+        "claimed": claimed,
+        "claim source": "stated" if subject.claimed else "comment",
+        "fitted": best,
+        "status": status,
+        "residuals": residuals,
+        "unit": subject.unit,
+        "sizes": list(subject.sizes),
+        "costs": costs,
+    }
+
+
+def check(filter: str = "", tolerance: float = TOLERANCE) -> List[dict]:
+    """ Fit every subject whose name contains `filter` """
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(limit, 10_000))  # quick_sort recurses n deep on sorted input
+    try:
+        return [check_subject(subject, tolerance) for subject in subjects() if filter in subject.name]
+    finally:
+        sys.setrecursionlimit(limit)
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(prog="complexity_fit.py", description="Check the documented Big-O claims")
+    commands = parser.add_subparsers(dest="command", required=True)
+    check_parser = commands.add_parser("check", help="fit every subject, report mismatches with the claims")
+    check_parser.add_argument("--filter", default="", help="only subjects whose name contains this")
+    check_parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="in doublings")
+    check_parser.add_argument("--strict", action="store_true", help="exit with status 1 on a mismatch")
+    args = parser.parse_args(argv)
+
+    results = check(args.filter, args.tolerance)
+    print(f"{'subject':45} {'claimed':10} {'fitted':10} {'residual':>8}  status")
+    for result in results:
+        residual = result["residuals"][result["fitted"]]
+        print(f"{result['name']:45} {result['claimed'] or '-':10} {result['fitted']:10} {residual:8.3f}  "
+              f"{result['status']}")
+    mismatches = [result for result in results if result["status"] == "MISMATCH"]
+    print(f"{len(mismatches)} mismatches out of {len(results)} subjects")
+    return 1 if args.strict and mismatches else 0
+
+
+class Test(unittest.TestCase):
+    def test_parse_claim(self):
+        self.assertEqual(parse_claim("# Time Complexity: O(nlogn) | Space O(logn)"), "O(nlogn)")
+        self.assertEqual(parse_claim("# Time complexity: (nlogn) | Space: O(1)"), "O(nlogn)")
+        self.assertEqual(parse_claim("# Time Complexity: O(N^2) moves, O(nlogn) comparisons"), "O(n^2)")
+        self.assertEqual(parse_claim("# Space O(1) | Time Complexity: O(N)"), "O(N)")
+        self.assertEqual(parse_claim("# O(1) Avg case | O(N) when high hash collisions"), "O(1)")
+        self.assertEqual(parse_claim("# O(n log n)"), "O(nlogn)")
+        self.assertIsNone(parse_claim("# Time Complexity: O(n + k)"))
+        self.assertIsNone(parse_claim("# no claim here"))
+
+    def test_claimed_complexity(self):
+        self.assertEqual(claimed_complexity(quick_sort.quick_sort), "O(nlogn)")
+        self.assertEqual(claimed_complexity(heaps.build_max_heap), "O(nlogn)")
+        self.assertEqual(claimed_complexity(linked_lists.SinglyLinkedList.search), "O(N)")
+        self.assertEqual(claimed_complexity(priority_queue.MaxPriorityQueue.insert), "O(logn)")
+        self.assertIsNone(claimed_complexity(quick_sort.introsort))
+
+    def test_fit(self):
+        sizes = [2 ** k for k in range(6, 14)]
+        for name, f in CLASSES.items():
+            # Exact curves, with a constant factor and a lower order term
+            costs = [3 * f(n) + (5 if name in ("O(1)", "O(logn)") else n ** 0.5) for n in sizes]
+            self.assertEqual(fit(sizes, costs)[0][0], name)
+        with self.assertRaises(ValueError):
+            fit([1, 2], [1, 2])
+
+    def test_known_mismatches(self):
+        sizes = (64, 128, 256, 512)
+        results = {subject.name: subject for subject in subjects()}
+
+        # quick_sort is O(nlogn) on random input but O(n^2) on sorted input
+        subject = results["quick_sort (random input)"]
+        subject.sizes = sizes
+        self.assertEqual(check_subject(subject)["status"], "ok")
+        subject = results["quick_sort (sorted input)"]
+        subject.sizes = sizes
+        result = check_subject(subject)
+        self.assertEqual((result["fitted"], result["status"]), ("O(n^2)", "MISMATCH"))
+
+        # A miss in a half full HashTableProbing scans the whole table
+        subject = results["HashTableProbing.get (miss, half full)"]
+        result = check_subject(subject)
+        self.assertEqual((result["fitted"], result["status"]), ("O(N)", "MISMATCH"))
+        self.assertEqual(result["costs"], [2 * n for n in subject.sizes])  # Every slot, from the home slot on
+
+        # build_max_heap is O(N), not the O(nlogn) its comment says
+        subject = results["build_max_heap (random input)"]
+        self.assertEqual(check_subject(subject)["fitted"], "O(N)")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["check"]:
+        sys.exit(main(sys.argv[1:]))
+    else:
+        unittest.main()
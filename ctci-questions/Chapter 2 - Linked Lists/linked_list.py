@@ -4,6 +4,8 @@ from typing import Any
 class Node:
     """ Used for singly-linked-list practice problems """
 
+    __slots__ = ("item", "next")
+
     def __init__(self, item: Any):
         self.item: Any = item
         self.next: Node = None
@@ -0,0 +1,155 @@
+import random
+import sys
+import time
+import unittest
+from typing import Callable, Tuple
+
+import heaps
+import matrix_multiplication
+import maximum_subarray
+import merge_sort
+import quick_sort
+from stacks import StackArr
+
+
+# Compares the recursive algorithms against their explicit work stack versions:
+# - wall time
+# - Python function calls made (every recursive call is a frame allocation + argument binding)
+# - peak depth: call-stack depth for the recursive version, peak StackArr size for the explicit stack version
+
+
+def profile_calls(fn: Callable, *args) -> Tuple[int, int]:
+    """ Run fn(*args) and return (python function calls, peak call depth) measured with sys.setprofile """
+    calls = depth = peak = 0
+
+    def profiler(frame, event, arg):
+        nonlocal calls, depth, peak
+        if event == "call":
+            calls += 1
+            depth += 1
+            peak = max(peak, depth)
+        elif event == "return":
+            depth -= 1
+
+    sys.setprofile(profiler)
+    try:
+        fn(*args)
+    finally:
+        sys.setprofile(None)
+    return calls, peak
+
+
+class _TrackingStack(StackArr):
+    """ StackArr that remembers the largest size it reached """
+    peak = 0
+
+    def __init__(self):
+        super().__init__()
+        self._len = 0
+
+    def push(self, item) -> None:
+        super().push(item)
+        self._len += 1
+        _TrackingStack.peak = max(_TrackingStack.peak, self._len)
+
+    def pop(self):
+        item = super().pop()
+        self._len -= 1
+        return item
+
+
+def peak_explicit_stack(module, fn: Callable, *args) -> int:
+    """ Run fn(*args) with module.StackArr swapped for a _TrackingStack, return the peak stack size """
+    original = module.StackArr
+    module.StackArr = _TrackingStack
+    _TrackingStack.peak = 0
+    try:
+        fn(*args)
+    finally:
+        module.StackArr = original
+    return _TrackingStack.peak
+
+
+def _timed(fn: Callable, *args) -> float:
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def benchmark(n: int = 20_000, matrix_n: int = 32, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    data = [rng.randint(-1000, 1000) for _ in range(n)]
+    matrix_a = [[rng.randint(0, 9) for _ in range(matrix_n)] for _ in range(matrix_n)]
+    matrix_b = [[rng.randint(0, 9) for _ in range(matrix_n)] for _ in range(matrix_n)]
+
+    def heapify_all(heapify):
+        # build_max_heap's loop, with the heapify function swapped in
+        def run(A):
+            for i in range(len(A) // 2, -1, -1):
+                heapify(A, i, len(A) - 1)
+        return run
+
+    # name: (module of the explicit stack version, recursive fn, explicit stack fn, args factory)
+    cases = {
+        "merge_sort": (merge_sort, merge_sort.merge_sort, merge_sort.merge_sort_iterative,
+                       lambda: (list(data), 0, n - 1)),
+        "quick_sort": (quick_sort, quick_sort.quick_sort, quick_sort.quick_sort_iterative,
+                       lambda: (list(data), 0, n - 1)),
+        # max_heapify is tail recursive, its loop version needs no stack at all (module None -> peak size 0)
+        "max_heapify (build heap)": (None, heapify_all(heaps.max_heapify), heapify_all(heaps.max_heapify_iterative),
+                                     lambda: (list(data),)),
+        "find_maximum_subarray": (maximum_subarray, maximum_subarray.find_maximum_subarray,
+                                  maximum_subarray.find_maximum_subarray_iterative, lambda: (data, 0, n - 1)),
+        "matrix_multiplication": (matrix_multiplication, matrix_multiplication.matrix_multiplication_recursive,
+                                  matrix_multiplication.matrix_multiplication_explicit_stack,
+                                  lambda: (matrix_a, matrix_b, matrix_n)),
+    }
+
+    results = {}
+    for name, (module, recursive, explicit, args) in cases.items():
+        recursive_calls, recursive_depth = profile_calls(recursive, *args())
+        explicit_calls, _ = profile_calls(explicit, *args())
+        results[name] = {
+            "recursive secs": _timed(recursive, *args()),
+            "explicit stack secs": _timed(explicit, *args()),
+            "recursive calls": recursive_calls,
+            "explicit stack calls": explicit_calls,
+            "recursive peak depth": recursive_depth,
+            "explicit stack peak size": peak_explicit_stack(module, explicit, *args()) if module else 0,
+        }
+
+    # Sorted input: the recursive quick_sort goes n levels deep
+    sorted_n = 3 * sys.getrecursionlimit()
+    try:
+        quick_sort.quick_sort(list(range(sorted_n)), 0, sorted_n - 1)
+        recursive_outcome = "ok"
+    except RecursionError:
+        recursive_outcome = "RecursionError"
+    results[f"quick_sort sorted n={sorted_n}"] = {
+        "recursive": recursive_outcome,
+        "explicit stack peak size": peak_explicit_stack(quick_sort, quick_sort.quick_sort_iterative,
+                                                        list(range(sorted_n)), 0, sorted_n - 1),
+    }
+    return results
+
+
+class Test(unittest.TestCase):
+    def test_peak_explicit_stack(self):
+        # Smaller-side-first keeps the pending ranges logarithmic even on sorted input
+        n = 2048
+        self.assertLessEqual(peak_explicit_stack(quick_sort, quick_sort.quick_sort_iterative,
+                                                 list(range(n)), 0, n - 1), 12)
+        self.assertLessEqual(peak_explicit_stack(merge_sort, merge_sort.merge_sort_iterative,
+                                                 list(range(n, 0, -1)), 0, n - 1), 3 * 12)
+
+    def test_profile_calls(self):
+        def depth(k):
+            return 0 if k == 0 else depth(k - 1)
+
+        calls, peak = profile_calls(depth, 10)
+        self.assertEqual(calls, 11)
+        self.assertEqual(peak, 11)
+
+
+if __name__ == "__main__":
+    unittest.main()
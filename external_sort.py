@@ -0,0 +1,309 @@
+import heapq
+import os
+import random
+import shutil
+import struct
+import sys
+import tempfile
+import time
+import tracemalloc
+import unittest
+from contextlib import ExitStack
+from typing import BinaryIO, Callable, Iterator, List, Optional, Tuple
+
+from merge_sort import merge_sort_adaptive
+
+
+# merge_sort needs the whole array in memory. An external merge sort sorts a file that doesn't fit:
+# 1. Run formation: read records until the memory budget is used up, sort that chunk in memory (merge_sort_adaptive),
+#    write it out as a sorted "run" to a temp file. Repeat until the input is consumed.
+# 2. Merge: k-way merge the runs (a heap holding the next record of each run). The merge only keeps one record per
+#    run plus a read buffer per run in memory, no matter how big the runs are.
+#    With more runs than the fan-in (open files / buffers we're willing to have), merge fan_in runs at a time into
+#    longer runs and repeat: each pass divides the number of runs by fan_in.
+# Runs are merged in input order and heapq.merge takes from the earlier run on ties, so the sort is stable.
+
+# Peak memory: run formation holds at most memory_limit bytes of records (counted with sys.getsizeof, plus the list
+# slots, sort keys and the sort's buffer). A merge holds (fan_in + 1) read/write buffers of buffer_size bytes plus one
+# record per run, plus a few KB per open run for the file object and heap entry.
+# So peak ~ max(memory_limit, (fan_in + 1) * buffer_size + fan_in * (largest record + ~4KB)).
+# Time Complexity: O(nlogn) comparisons | I/O: every record is read and written 1 + ceil(log_fan_in(runs)) times
+
+_SLOT = 8  # Bytes for one pointer in a list
+_SORT_OVERHEAD = 2 * _SLOT  # Per record: the merge buffer in merge_sort_adaptive + the slot in the output order list
+_DECORATE_OVERHEAD = sys.getsizeof((0, 0)) + _SLOT + sys.getsizeof(2 ** 40)  # (key, index) tuple, its slot, index
+
+
+# === Record formats ===
+# Each format reads records from a binary file as bytes objects and writes them back in the same framing.
+
+class LineRecords:
+    """ Newline terminated records. A last line without a newline gets one """
+
+    def read(self, f: BinaryIO) -> Iterator[bytes]:
+        for line in f:
+            yield line if line.endswith(b"\n") else line + b"\n"
+
+    def write(self, f: BinaryIO, record: bytes) -> None:
+        f.write(record)
+
+
+class FixedWidthRecords:
+    """ Binary records of exactly `size` bytes """
+
+    def __init__(self, size: int):
+        if size < 1:
+            raise ValueError("size must be >= 1")
+        self.size = size
+
+    def read(self, f: BinaryIO) -> Iterator[bytes]:
+        while True:
+            record = f.read(self.size)
+            if not record:
+                return
+            if len(record) != self.size:
+                raise ValueError(f"truncated record: {len(record)} of {self.size} bytes")
+            yield record
+
+    def write(self, f: BinaryIO, record: bytes) -> None:
+        f.write(record)
+
+
+class LengthPrefixedRecords:
+    """ [length][payload] records, the length is packed with a struct format (little-endian uint32 by default) """
+
+    def __init__(self, header: str = "<I"):
+        self.header = struct.Struct(header)
+
+    def read(self, f: BinaryIO) -> Iterator[bytes]:
+        header = self.header
+        while True:
+            prefix = f.read(header.size)
+            if not prefix:
+                return
+            if len(prefix) != header.size:
+                raise ValueError("truncated length prefix")
+            (length,) = header.unpack(prefix)
+            payload = f.read(length)
+            if len(payload) != length:
+                raise ValueError(f"truncated record: {len(payload)} of {length} bytes")
+            yield payload
+
+    def write(self, f: BinaryIO, record: bytes) -> None:
+        f.write(self.header.pack(len(record)))
+        f.write(record)
+
+
+# === Sort ===
+
+def _write_run(path: str, records: list, order: Optional[list], fmt, buffer_size: int) -> None:
+    with open(path, "wb", buffering=buffer_size) as f:
+        for record in (records if order is None else (records[i] for i in order)):
+            fmt.write(f, record)
+
+
+def _form_runs(input_path: str, run_dir: str, fmt, key: Optional[Callable], memory_limit: int,
+               buffer_size: int) -> Tuple[List[str], int]:
+    """
+    Split the input into sorted runs of at most memory_limit bytes each.
+    Return the run paths in input order and the number of records.
+    """
+    runs, count = [], 0
+    records, keys, used = [], [], 0
+
+    def flush() -> None:
+        nonlocal records, keys, used
+        if key is None:
+            merge_sort_adaptive(records)
+            order = None
+        else:
+            # Sort (key, index) pairs, the same decoration merge_sort_adaptive(key=) does, but with the keys computed
+            # while reading so their size counts against the budget
+            decorated = [(k, i) for i, k in enumerate(keys)]
+            keys = []
+            merge_sort_adaptive(decorated)
+            order = [i for _, i in decorated]
+            del decorated
+        path = os.path.join(run_dir, f"run{len(runs):06d}")
+        _write_run(path, records, order, fmt, buffer_size)
+        runs.append(path)
+        records, keys, used = [], [], 0
+
+    with open(input_path, "rb", buffering=buffer_size) as f:
+        for record in fmt.read(f):
+            cost = sys.getsizeof(record) + _SLOT + _SORT_OVERHEAD
+            if key is not None:
+                k = key(record)
+                cost += sys.getsizeof(k) + _DECORATE_OVERHEAD
+            if records and used + cost > memory_limit:
+                flush()
+            records.append(record)
+            if key is not None:
+                keys.append(k)
+            used += cost
+            count += 1
+
+    if records:
+        flush()
+    return runs, count
+
+
+def _merge_runs(paths: List[str], output_path: str, fmt, key: Optional[Callable], buffer_size: int) -> None:
+    """ k-way merge the sorted run files into output_path """
+    with ExitStack() as stack:
+        readers = [fmt.read(stack.enter_context(open(path, "rb", buffering=buffer_size))) for path in paths]
+        out = stack.enter_context(open(output_path, "wb", buffering=buffer_size))
+        for record in heapq.merge(*readers, key=key):
+            fmt.write(out, record)
+
+
+def external_sort(input_path: str, output_path: str, fmt=None, key: Optional[Callable[[bytes], object]] = None,
+                  memory_limit: int = 64 * 1024 * 1024, fan_in: int = 64, buffer_size: int = 64 * 1024,
+                  tmp_dir: Optional[str] = None) -> dict:
+    """
+    Sort the records of input_path into output_path without loading the whole file.
+
+    :param fmt: LineRecords() (default), FixedWidthRecords(size) or LengthPrefixedRecords(header)
+    :param key: Sort by key(record bytes), like sorted(key=...). Records are compared as bytes by default
+    :param memory_limit: Bytes of records (+ keys and sort overhead) held in memory during run formation
+    :param fan_in: Most runs merged at once. More runs than this take extra merge passes
+    :param buffer_size: Read/write buffer per open file
+    :param tmp_dir: Where the runs go (default: the system temp dir)
+    :return: Stats: records, bytes, runs, merge passes and secs
+    """
+    if fan_in < 2:
+        raise ValueError("fan_in must be >= 2")
+    fmt = fmt if fmt is not None else LineRecords()
+    start = time.perf_counter()
+    run_dir = tempfile.mkdtemp(prefix="external_sort_", dir=tmp_dir)
+    try:
+        runs, count = _form_runs(input_path, run_dir, fmt, key, memory_limit, buffer_size)
+        stats = {"records": count, "runs": len(runs), "merge passes": 0}
+
+        generation = 0
+        while len(runs) > fan_in:
+            generation += 1
+            merged = []
+            for i in range(0, len(runs), fan_in):
+                group = runs[i:i + fan_in]
+                path = os.path.join(run_dir, f"pass{generation}_run{len(merged):06d}")
+                _merge_runs(group, path, fmt, key, buffer_size)
+                for run in group:
+                    os.remove(run)
+                merged.append(path)
+            runs = merged
+            stats["merge passes"] += 1
+
+        _merge_runs(runs, output_path, fmt, key, buffer_size)
+        stats["merge passes"] += 1 if len(runs) > 1 else 0
+    finally:
+        shutil.rmtree(run_dir, ignore_errors=True)
+
+    stats["bytes"] = os.path.getsize(output_path)
+    stats["secs"] = time.perf_counter() - start
+    return stats
+
+
+def benchmark(n: int = 500_000, record_bytes: int = 32, memory_limit: int = 8 * 1024 * 1024, fan_in: int = 16,
+              seed: int = 0) -> dict:
+    """
+    MB/s and records/s sorting n random line records with a memory budget far below the data size, plus the
+    tracemalloc peak against the budget.
+    """
+    rng = random.Random(seed)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, "input")
+        output_path = os.path.join(tmp, "output")
+        with open(input_path, "wb") as f:
+            for _ in range(n):
+                f.write(rng.randbytes(record_bytes // 2).hex().encode()[:record_bytes - 1] + b"\n")
+        size = os.path.getsize(input_path)
+
+        for name, key in (("bytes order", None), ("key=", lambda record: record[8:])):
+            stats = external_sort(input_path, output_path, key=key, memory_limit=memory_limit, fan_in=fan_in,
+                                  tmp_dir=tmp)
+            # tracemalloc slows allocation down a lot, measure the peak in a separate run
+            tracemalloc.start()
+            external_sort(input_path, output_path, key=key, memory_limit=memory_limit, fan_in=fan_in, tmp_dir=tmp)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            results[name] = {"MB/s": size / stats["secs"] / 1e6, "records/s": n / stats["secs"], "runs": stats["runs"],
+                             "merge passes": stats["merge passes"], "input MB": size / 1e6,
+                             "peak MB (tracemalloc)": peak / 1e6, "memory_limit MB": memory_limit / 1e6}
+    return results
+
+
+class Test(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.input_path = os.path.join(self.tmp, "input")
+        self.output_path = os.path.join(self.tmp, "output")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def _sort(self, records: List[bytes], fmt, **kwargs) -> List[bytes]:
+        with open(self.input_path, "wb") as f:
+            for record in records:
+                fmt.write(f, record)
+        self.stats = external_sort(self.input_path, self.output_path, fmt, tmp_dir=self.tmp, **kwargs)
+        with open(self.output_path, "rb") as f:
+            return list(fmt.read(f))
+
+    def test_line_records_multi_pass(self):
+        rng = random.Random(1)
+        records = [b"%d\n" % rng.randrange(10 ** 6) for _ in range(3000)]
+        result = self._sort(records, LineRecords(), memory_limit=4096, fan_in=3)
+        self.assertEqual(result, sorted(records))
+        self.assertGreater(self.stats["runs"], 9)
+        self.assertGreaterEqual(self.stats["merge passes"], 3)
+        self.assertEqual(self.stats["records"], 3000)
+        self.assertEqual(os.listdir(self.tmp), ["input", "output"])  # Temp runs are cleaned up
+
+    def test_fixed_width_with_key_is_stable(self):
+        # 4 byte records: 1 byte sort key + 3 byte sequence number
+        records = [bytes([i % 5]) + i.to_bytes(3, "big") for i in range(2000)]
+        result = self._sort(records, FixedWidthRecords(4), key=lambda record: record[0], memory_limit=8192)
+        self.assertEqual(result, sorted(records, key=lambda record: record[0]))
+        self.assertGreater(self.stats["runs"], 1)
+
+    def test_length_prefixed(self):
+        rng = random.Random(2)
+        records = [rng.randbytes(rng.randrange(0, 50)) for _ in range(1000)]
+        result = self._sort(records, LengthPrefixedRecords(), key=len, memory_limit=10_000, fan_in=4)
+        self.assertEqual(result, sorted(records, key=len))
+
+    def test_line_without_trailing_newline_and_empty_input(self):
+        with open(self.input_path, "wb") as f:
+            f.write(b"b\nc\na")
+        external_sort(self.input_path, self.output_path)
+        with open(self.output_path, "rb") as f:
+            self.assertEqual(f.read(), b"a\nb\nc\n")
+
+        self.assertEqual(self._sort([], LineRecords()), [])
+
+    def test_truncated_record(self):
+        with open(self.input_path, "wb") as f:
+            f.write(b"abcdefg")
+        with self.assertRaises(ValueError):
+            external_sort(self.input_path, self.output_path, FixedWidthRecords(4), tmp_dir=self.tmp)
+
+    def test_peak_memory(self):
+        rng = random.Random(3)
+        with open(self.input_path, "wb") as f:
+            for _ in range(20_000):  # ~820KB of records
+                f.write(rng.randbytes(20).hex().encode() + b"\n")
+        memory_limit, fan_in, buffer_size = 64 * 1024, 8, 4096
+
+        tracemalloc.start()
+        stats = external_sort(self.input_path, self.output_path, memory_limit=memory_limit, fan_in=fan_in,
+                              buffer_size=buffer_size, tmp_dir=self.tmp)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.assertGreater(stats["runs"], fan_in)
+        self.assertLess(peak, memory_limit + (fan_in + 1) * buffer_size + 16 * 1024)
+
+
+if __name__ == "__main__":
+    unittest.main()
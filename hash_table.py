@@ -1,7 +1,8 @@
-from typing import Any, Callable, Union, Optional
-from itertools import islice, cycle
+from typing import Any, Callable, Union, Optional, Tuple
 import unittest
 
+from node_pool import NodePool
+
 
 # Hash function is critical. A bad hash function could result in a lot of hash collisions yielding an O(N) search
 
@@ -13,10 +14,11 @@ import unittest
 class HashTableChaining:
     """ Hash table w/ separate chaining for hash collisions """
 
-    def __init__(self, hash_function: Callable, size: int):
+    def __init__(self, hash_function: Callable, size: int, pool: Optional[NodePool] = None):
         self.hash = hash_function
         self.data = [None] * size  # Resize array when it's 50% full.
         self._hash_collisions = 0
+        self._pool = pool  # Shared by the chains of every bucket
 
     # O(1) Avg case | O(N) when high hash collisions
     def get(self, key: Union[str, int]) -> Any:
@@ -32,7 +34,7 @@ class HashTableChaining:
         index = self.hash(k=key, m=len(self.data))
 
         if self.data[index] is None:
-            self.data[index] = LinkedList()
+            self.data[index] = LinkedList(pool=self._pool)
         else:
             self._hash_collisions += 1
             curr_node = self.data[index].head
@@ -80,64 +82,53 @@ class HashTableProbing:
             # Index out of bounds, circle around to index 0.
             if index == len(self.data):
                 index = 0
-            if self.data[index] is not None:
-                k, _ = self.data[index]
-                # Key already exists, so we return the index that will we overwrite
-                if k == key:
-                    return index
-            else:
+            item = self.data[index]
+            if item is None:
                 # Index is available
                 return index
+            # Key already exists, so we return the index that will we overwrite
+            if item[0] == key:
+                return index
             index += 1
             iterations += 1
         return None
 
-    def get(self, key: Union[str, int]) -> Any:
+    def _find(self, key: Union[str, int]) -> Optional[Tuple[int, Any]]:
+        """ Return (index, value) of the key, None if it isn't in the table. Each slot is read once """
         index = self.hash(k=key, m=len(self.data))
-
-        if self.data[index] is None:
-            return None
-
         iterations = 0
-        # NOTE: Itertools.cycle() is a neat way to iterate cyclically. Isslice starts the iterator at a given index
-        for item in islice(cycle(self.data), index, None):
-            if iterations == len(self.data):
-                break
-            if item is not None:
-                k, v = item
-                if k == key:
-                    return v
+        while iterations < len(self.data):
+            # Index out of bounds, circle around to index 0.
+            if index == len(self.data):
+                index = 0
+            item = self.data[index]
+            if item is None:
+                # Empty home slot: the key was never put. Past it, an empty slot can be a deleted key, so keep probing
+                if iterations == 0:
+                    return None
+            elif item[0] == key:
+                return index, item[1]
+            index += 1
             iterations += 1
         return None
 
-    def put(self, key: Union[str, int], value: Any) -> None:
-        index = self.hash(k=key, m=len(self.data))
+    def get(self, key: Union[str, int]) -> Any:
+        found = self._find(key)
+        return None if found is None else found[1]
 
-        if self.data[index] is None:
-            self.data[index] = (key, value)
-        else:
-            index = self._linear_probe(index=index, key=key)
-            self.data[index] = (key, value)
+    def put(self, key: Union[str, int], value: Any) -> None:
+        index = self._linear_probe(index=self.hash(k=key, m=len(self.data)), key=key)
+        self.data[index] = (key, value)
 
     def delete(self, key: Union[str, int]) -> None:
-        if self.get(key) is None:
-            return
-        index = self.hash(k=key, m=len(self.data))
-
-        iterations = 0
-        for item in islice(cycle(self.data), index, None):
-            if iterations == len(self.data):
-                break
-            if item is not None:
-                k, v = item
-                if k == key:
-                    self.data[index] = None
-                    return
-            iterations += 1
-            index += 1
+        found = self._find(key)
+        if found is not None:
+            self.data[found[0]] = None
 
 
 class _Node:
+    __slots__ = ("key", "value", "next")
+
     def __init__(self, key: Union[str, int], value: Any):
         self.key = key
         self.value = value
@@ -145,8 +136,9 @@ class _Node:
 
 
 class LinkedList:
-    def __init__(self):
+    def __init__(self, pool: Optional[NodePool] = None):
         self.head = None
+        self._pool = pool  # Optional free-list, deleted nodes are recycled on the next insert
 
     def search(self, key: Union[str, int]) -> Any:
         curr = self.head
@@ -157,7 +149,7 @@ class LinkedList:
         return None
 
     def insert(self, key: Union[str, int], value: Any) -> None:
-        new_node = _Node(key=key, value=value)
+        new_node = self._pool.acquire(key, value) if self._pool is not None else _Node(key=key, value=value)
         new_node.next = self.head
         self.head = new_node
 
@@ -178,6 +170,8 @@ class LinkedList:
                 prev.next = curr.next
             else:
                 self.head = self.head.next
+            if self._pool is not None:
+                self._pool.release(curr)
 
 
 # M represents the length of the underlying array.
@@ -217,6 +211,16 @@ class Test(unittest.TestCase):
         self._hash_table_test(hash_function=hash_division_method_two, hash_table=HashTableChaining)
         self._hash_table_test(hash_function=hash_division_method, hash_table=HashTableProbing)
 
+    def test_probing_wraps_around(self):
+        # Every key hashes to the last slot, so keys 1 and 2 probe past the end to slots 0 and 1
+        ht = HashTableProbing(hash_function=lambda k, m: m - 1, size=4)
+        for key in range(3):
+            ht.put(key, str(key))
+        self.assertEqual([ht.get(key) for key in range(3)], ["0", "1", "2"])
+        ht.delete(1)
+        self.assertEqual(ht.data, [None, (2, "2"), None, (0, "0")])
+        self.assertEqual(ht.get(2), "2")  # Found past the deleted slot
+
 
 if __name__ == "__main__":
     unittest.main()
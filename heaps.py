@@ -54,6 +54,28 @@ def max_heapify(A: list, i: int, n: int) -> None:
         max_heapify(A=A, i=largest, n=n)
 
 
+# The recursive call in max_heapify is the last thing it does (tail recursion), so it doesn't need a stack at all:
+# instead of calling max_heapify(A, largest, n), set i = largest and loop.
+# Time complexity: O(logn) | Space complexity: O(1) - No call-stack frames
+def max_heapify_iterative(A: list, i: int, n: int) -> None:
+    while True:
+        left_child = (2 * i) + 1
+        right_child = (2 * i) + 2
+
+        if left_child <= n and A[left_child] > A[i]:
+            largest = left_child
+        else:
+            largest = i
+
+        if right_child <= n and A[right_child] > A[largest]:
+            largest = right_child
+
+        if largest == i:
+            return
+        exchange(A=A, i=i, j=largest)
+        i = largest
+
+
 # T(n) = (n/2)*logn = n*logn (n/2 = n in terms of asymptotic bounds)
 # N number of times performing logn calculations = O(nlogn)
 # Time complexity: (nlogn) | Space: O(1)
@@ -119,6 +141,26 @@ def min_heapify(A: int, i: int, n: int) -> None:
         min_heapify(A=A, i=smallest, n=n)
 
 
+def min_heapify_iterative(A: list, i: int, n: int) -> None:
+    """ Loop version of min_heapify, same as max_heapify_iterative with the comparisons flipped """
+    while True:
+        left_child = (2 * i) + 1
+        right_child = (2 * i) + 2
+
+        if left_child <= n and A[left_child] < A[i]:
+            smallest = left_child
+        else:
+            smallest = i
+
+        if right_child <= n and A[right_child] < A[smallest]:
+            smallest = right_child
+
+        if smallest == i:
+            return
+        exchange(A=A, i=i, j=smallest)
+        i = smallest
+
+
 def build_min_heap(A: list, n: int) -> None:
     for i in range(n // 2, -1, -1):
         min_heapify(A=A, i=i, n=n)
@@ -156,6 +198,15 @@ class MaxHeapTest(unittest.TestCase):
         max_heapify(A=a3, i=2, n=len(a3) - 1)
         self.assertEqual(a3, a3_expected)
 
+    def test_max_heapify_iterative(self):
+        a1 = [16, 4, 10, 14, 7, 9, 3, 2, 8, 1]
+        max_heapify_iterative(A=a1, i=1, n=len(a1) - 1)
+        self.assertEqual(a1, [16, 14, 10, 8, 7, 9, 3, 2, 4, 1])
+
+        a2 = [16, 4, 10, 14, 7, 11, 3, 2, 8, 1]
+        max_heapify_iterative(A=a2, i=2, n=len(a2) - 1)
+        self.assertEqual(a2, [16, 4, 11, 14, 7, 10, 3, 2, 8, 1])
+
     def test_build_max_heap(self):
         a1 = [4, 1, 3, 2, 16, 9, 10, 14, 8, 7]
         a1_expected = [16, 14, 10, 8, 7, 9, 3, 2, 4, 1]
@@ -196,6 +247,11 @@ class MinHeapTest(unittest.TestCase):
         min_heapify(A=a3, i=2, n=len(a3) - 1)
         self.assertEqual(a3, a3_expected)
 
+    def test_min_heapify_iterative(self):
+        a1 = [16, 4, 10, 14, 7, 9, 3, 2, 8, 1]
+        min_heapify_iterative(A=a1, i=0, n=len(a1) - 1)
+        self.assertEqual(a1, [4, 7, 10, 14, 1, 9, 3, 2, 8, 16])
+
     def test_build_min_heap(self):
         a1 = [4, 1, 3, 2, 16, 9, 10, 14, 8, 7]
         a1_expected = [1, 2, 3, 4, 7, 9, 10, 14, 8, 16]
@@ -1,4 +1,5 @@
 import unittest
+from bisect import bisect_right
 
 
 # Swap a[i] with each larger entry to its left
@@ -37,12 +38,36 @@ def insertion_sort_clrs(arr: list) -> list:
     return arr
 
 
+# Binary insertion sort: insertion_sort_clrs, but the position of the key in the sorted prefix is found with a binary
+# search, O(logn) comparisons instead of O(N). The elements still have to shift over, that's done with one slice
+# assignment (a C-level memmove) instead of one Python-level move per element.
+# bisect_right puts the key after any equal elements, so the sort is stable.
+# Sorts arr[lo:hi] in place, assuming arr[lo:start] is already sorted.
+# Time Complexity: O(N^2) moves, O(nlogn) comparisons | Space: O(1)
+def binary_insertion_sort(arr: list, lo: int = 0, hi: int = None, start: int = None) -> list:
+    if hi is None:
+        hi = len(arr)
+    if start is None or start == lo:
+        start = lo + 1
+
+    for i in range(start, hi):
+        key = arr[i]
+        pos = bisect_right(arr, key, lo, i)
+        arr[pos + 1:i + 1] = arr[pos:i]  # Shift the bigger elements over by one index
+        arr[pos] = key
+
+    return arr
+
+
 class Test(unittest.TestCase):
     def test_insertion_sort(self):
         self.assertEqual(insertion_sort([8, 7, 1, 5]), [1, 5, 7, 8])
         self.assertEqual(insertion_sort([10, 9, 8, 7, 6, 5, 4, 3, 2, 1]), [1, 2, 3, 4, 5, 6, 7, 8, 9, 10])
         self.assertEqual(insertion_sort_clrs([8, 7, 1, 5]), [1, 5, 7, 8])
         self.assertEqual(insertion_sort_clrs([10, 9, 8, 7, 6, 5, 4, 3, 2, 1]), [1, 2, 3, 4, 5, 6, 7, 8, 9, 10])
+        self.assertEqual(binary_insertion_sort([8, 7, 1, 5]), [1, 5, 7, 8])
+        self.assertEqual(binary_insertion_sort([10, 9, 8, 7, 6, 5, 4, 3, 2, 1]), [1, 2, 3, 4, 5, 6, 7, 8, 9, 10])
+        self.assertEqual(binary_insertion_sort([9, 1, 2, 7, 3, 0], lo=1, hi=5, start=3), [9, 1, 2, 3, 7, 0])
 
 
 if __name__ == "__main__":
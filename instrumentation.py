@@ -0,0 +1,337 @@
+import importlib
+import random
+import time
+import unittest
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List
+
+
+# Opt-in operation counters, so a slowdown can be traced to what the algorithm did (more comparisons, more swaps,
+# longer probe sequences, more allocations) instead of guessed from wall time.
+#
+#     with counters() as c:
+#         A = c.track(c.wrap(data))
+#         quick_sort(A, 0, len(A) - 1)
+#     c.comparisons, c.swaps, c.moves, c.reads
+#
+# Nothing in the algorithms checks whether counting is on. Instead counters() patches the shared helpers while the
+# block runs and puts the originals back on exit, so with counting off the code that runs is exactly the original:
+# - swaps:       the exchange() helpers of the sorting/heap modules are replaced with counting versions. Code that
+#                swaps inline (A[i], A[j] = A[j], A[i], e.g. partition3) shows up as 2 moves instead
+# - allocations: the node classes of the stack/queue/list/hash table modules get a counting __init__
+#                (nodes recycled by a NodePool aren't new allocations, so they aren't counted)
+# The other counts come from the data, not the code:
+# - comparisons: c.wrap(items) wraps every item in a Tracked, whose rich comparisons (<, <=, ==, ...) count
+# - reads/moves: c.track(A) returns a list subclass that counts element reads and writes (a slice counts per element)
+# - probes:      c.track_table(table) tracks a hash table's slot array, every slot read (self.data[i]) is a probe.
+#                The tables read slots by index, each probe sequence reading a slot once
+# Nested counters() blocks all count. Counting isn't thread safe: don't share tracked data between threads.
+
+_SWAP_FUNCTIONS = [("quick_sort", "exchange"), ("heaps", "exchange"), ("priority_queue", "exchange"),
+                   ("selection", "exchange")]
+_NODE_CLASSES = [("stacks", "_Node"), ("queues", "_Node"), ("hash_table", "_Node"), ("linked_lists", "Node"),
+                 ("skip_list", "_SkipNode"), ("unrolled_linked_list", "_Chunk")]
+
+_active: List["Counters"] = []  # Counters of the counters() blocks currently running
+_restore: List[Callable[[], None]] = []  # Undo functions for the patches, while any block is running
+
+
+class Counters:
+    """ Operation counts for one counters() block """
+
+    FIELDS = ("comparisons", "swaps", "moves", "reads", "probes", "allocations")
+
+    def __init__(self):
+        self.comparisons = 0
+        self.swaps = 0
+        self.moves = 0
+        self.reads = 0
+        self.probes = 0
+        self.allocations = 0
+
+    def __repr__(self) -> str:
+        return "Counters(" + ", ".join(f"{name}={getattr(self, name)}" for name in self.FIELDS) + ")"
+
+    def as_dict(self) -> Dict[str, int]:
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    def wrap(self, items: Iterable) -> List["Tracked"]:
+        """ Wrap items so every comparison between them is counted """
+        return [Tracked(item, self) for item in items]
+
+    @staticmethod
+    def unwrap(items: Iterable) -> list:
+        return [item.value if type(item) is Tracked else item for item in items]
+
+    def track(self, items: Iterable) -> "TrackedList":
+        """ A list of items that counts element reads and writes (moves) """
+        return TrackedList(items, self, "reads")
+
+    def track_table(self, table: Any) -> Any:
+        """ Count the slots the hash table (HashTableProbing / HashTableChaining) looks at as probes """
+        table.data = TrackedList(table.data, self, "probes")
+        return table
+
+
+class Tracked:
+    """ An item whose comparisons are counted. Compares (and hashes) like the wrapped value """
+    __slots__ = ("value", "_counters")
+
+    def __init__(self, value: Any, counters: Counters):
+        self.value = value
+        self._counters = counters
+
+    def __repr__(self) -> str:
+        return f"Tracked({self.value!r})"
+
+    def __hash__(self) -> int:
+        return hash(self.value)
+
+    def _compare(self, other: Any, op: Callable[[Any, Any], bool]) -> bool:
+        self._counters.comparisons += 1
+        return op(self.value, other.value if type(other) is Tracked else other)
+
+    def __lt__(self, other):
+        return self._compare(other, lambda a, b: a < b)
+
+    def __le__(self, other):
+        return self._compare(other, lambda a, b: a <= b)
+
+    def __gt__(self, other):
+        return self._compare(other, lambda a, b: a > b)
+
+    def __ge__(self, other):
+        return self._compare(other, lambda a, b: a >= b)
+
+    def __eq__(self, other):
+        return self._compare(other, lambda a, b: a == b)
+
+    def __ne__(self, other):
+        return self._compare(other, lambda a, b: a != b)
+
+
+class TrackedList(list):
+    """ list that counts element reads (as `read_field`) and element writes (as moves) """
+
+    def __init__(self, items: Iterable, counters: Counters, read_field: str):
+        super().__init__(items)
+        self._counters = counters
+        self._read_field = read_field
+
+    def _count_reads(self, count: int) -> None:
+        setattr(self._counters, self._read_field, getattr(self._counters, self._read_field) + count)
+
+    def __getitem__(self, index):
+        item = super().__getitem__(index)
+        self._count_reads(len(item) if isinstance(index, slice) else 1)
+        return item
+
+    def __iter__(self) -> Iterator:
+        for item in super().__iter__():
+            self._count_reads(1)
+            yield item
+
+    def __setitem__(self, index, value) -> None:
+        if isinstance(index, slice):
+            value = list(value)
+            self._counters.moves += len(value)
+        else:
+            self._counters.moves += 1
+        super().__setitem__(index, value)
+
+
+# === Patching ===
+
+def _counting_exchange(original: Callable) -> Callable:
+    def exchange(A: list, i: int, j: int) -> None:
+        for c in _active:
+            c.swaps += 1
+        original(A, i, j)
+    return exchange
+
+
+def _patch_swaps(module: Any, name: str) -> Callable[[], None]:
+    original = getattr(module, name)
+    setattr(module, name, _counting_exchange(original))
+    return lambda: setattr(module, name, original)
+
+
+def _patch_allocations(cls: type) -> Callable[[], None]:
+    """ Count calls to cls.__init__. (Patching __new__ instead can't be undone: CPython keeps the slot it set up) """
+    original = cls.__dict__["__init__"]
+
+    def __init__(self, *args, **kwargs):
+        for c in _active:
+            c.allocations += 1
+        original(self, *args, **kwargs)
+
+    cls.__init__ = __init__
+    return lambda: setattr(cls, "__init__", original)
+
+
+def _patch_pool() -> Callable[[], None]:
+    """ NodePool.acquire re-runs __init__ on a recycled node, take that back off the allocation count """
+    from node_pool import NodePool
+    original = NodePool.acquire
+
+    def acquire(self, *args, **kwargs):
+        if self._free:
+            for c in _active:
+                c.allocations -= 1
+        return original(self, *args, **kwargs)
+
+    NodePool.acquire = acquire
+    return lambda: setattr(NodePool, "acquire", original)
+
+
+def _install() -> None:
+    for module_name, name in _SWAP_FUNCTIONS:
+        _restore.append(_patch_swaps(importlib.import_module(module_name), name))
+    for module_name, name in _NODE_CLASSES:
+        _restore.append(_patch_allocations(getattr(importlib.import_module(module_name), name)))
+    _restore.append(_patch_pool())
+
+
+def _uninstall() -> None:
+    while _restore:
+        _restore.pop()()
+
+
+@contextmanager
+def counters() -> Iterator[Counters]:
+    """ Count operations inside the block. The patches are only in place while at least one block is running """
+    c = Counters()
+    if not _active:
+        _install()
+    _active.append(c)
+    try:
+        yield c
+    finally:
+        _active.remove(c)
+        if not _active:
+            _uninstall()
+
+
+def count_operations(sort: Callable[[list], Any], data: Iterable) -> Dict[str, int]:
+    """ Run sort(A) on a tracked, wrapped copy of data and return the counts """
+    with counters() as c:
+        sort(c.track(c.wrap(data)))
+    return c.as_dict()
+
+
+def benchmark(n: int = 20_000, seed: int = 0) -> dict:
+    """
+    Cost of the instrumentation: quick_sort seconds before any counters() block, inside one with plain data (only the
+    swap patch active), with tracked/wrapped data, and again after the block (back to the original code).
+    Plus the operation counts of the repo's sorts on random and sorted input.
+    """
+    import heaps
+    import merge_sort
+    import quick_sort
+
+    rng = random.Random(seed)
+    data = [rng.random() for _ in range(n)]
+
+    def timed_quick_sort(A: list) -> float:
+        start = time.perf_counter()
+        quick_sort.quick_sort(A, 0, len(A) - 1)
+        return time.perf_counter() - start
+
+    results = {"quick_sort secs": {"before": timed_quick_sort(list(data))}}
+    with counters() as c:
+        results["quick_sort secs"]["counters() on, plain data"] = timed_quick_sort(list(data))
+        results["quick_sort secs"]["counters() on, tracked data"] = timed_quick_sort(c.track(c.wrap(data)))
+    results["quick_sort secs"]["after"] = timed_quick_sort(list(data))
+
+    sorts = {
+        "quick_sort": lambda A: quick_sort.quick_sort_iterative(A, 0, len(A) - 1),
+        "introsort": quick_sort.introsort,
+        "heap_sort": lambda A: heaps.heap_sort(A, len(A) - 1),
+        "merge_sort_adaptive": merge_sort.merge_sort_adaptive,
+    }
+    for input_name, input_data in (("random", data[:2000]), ("sorted", sorted(data[:2000]))):
+        results[input_name] = {name: count_operations(sort, input_data) for name, sort in sorts.items()}
+    return results
+
+
+class Test(unittest.TestCase):
+    def test_comparisons_and_moves(self):
+        from insertion_sort import insertion_sort_clrs
+
+        with counters() as c:
+            A = c.track(c.wrap(range(10, 0, -1)))
+            insertion_sort_clrs(A)
+        self.assertEqual(c.unwrap(A), list(range(1, 11)))
+        # Reversed input: every key is compared with (and shifted past) every key before it
+        self.assertEqual(c.comparisons, 45)
+        self.assertEqual(c.moves, 45 + 9)  # 45 shifts + the key written back, for j = 1..9
+
+    def test_swaps(self):
+        import heaps
+        import quick_sort
+
+        data = [5, 3, 8, 1, 9, 2]
+        with counters() as c:
+            A = list(data)
+            quick_sort.quick_sort(A, 0, len(A) - 1)
+            quick_sort_swaps = c.swaps
+            heaps.heap_sort(list(data), len(data) - 1)
+        self.assertGreater(quick_sort_swaps, 0)
+        self.assertGreater(c.swaps, quick_sort_swaps)
+        self.assertEqual(A, sorted(data))
+
+    def test_allocations_and_pool(self):
+        from node_pool import NodePool
+        from stacks import StackLL, _Node
+
+        with counters() as c:
+            stack = StackLL()
+            for i in range(10):
+                stack.push(i)
+        self.assertEqual(c.allocations, 10)
+
+        pooled = StackLL(pool=NodePool(_Node))
+        with counters() as c:
+            for _ in range(5):
+                pooled.push(1)
+                pooled.pop()
+        self.assertEqual(c.allocations, 1)  # The first push allocates, the rest reuse that node
+
+    def test_probes(self):
+        from hash_table import HashTableProbing
+
+        # Every key hashes to slot 6, so the i'th key probes i slots (wrapping around after slot 7) to find a free one
+        table = HashTableProbing(hash_function=lambda k, m: 6, size=8)
+        with counters() as c:
+            c.track_table(table)
+            for key in range(4):
+                table.put(key, key)
+            puts = c.probes
+            hit = table.get(0)
+            self.assertEqual(c.probes - puts, 1)  # Found in its home slot
+            table.get(3)
+            self.assertEqual(c.probes - puts, 1 + 4)  # Slots 6, 7, 0, 1
+            table.delete(2)
+            self.assertEqual(c.probes - puts, 1 + 4 + 3)
+        self.assertEqual(puts, 1 + 2 + 3 + 4)
+        self.assertEqual(hit, 0)
+
+    def test_nested_and_no_overhead_when_off(self):
+        import quick_sort
+        from stacks import _Node
+
+        original = quick_sort.exchange
+        with counters() as outer:
+            with counters() as inner:
+                quick_sort.exchange([1, 2], 0, 1)
+            quick_sort.exchange([1, 2], 0, 1)
+            self.assertIsNot(quick_sort.exchange, original)
+        self.assertEqual((outer.swaps, inner.swaps), (2, 1))
+
+        # The original code is back once the last block exits
+        self.assertIs(quick_sort.exchange, original)
+        self.assertEqual(_Node.__init__.__qualname__, "_Node.__init__")
+
+
+if __name__ == "__main__":
+    unittest.main()
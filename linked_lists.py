@@ -1,7 +1,12 @@
 import unittest
+from typing import Optional
+
+from node_pool import NodePool
 
 
 class Node:
+    __slots__ = ("data", "next", "prev")
+
     def __init__(self, data: int):
         self.data = data
         self.next = None
@@ -11,8 +16,9 @@ class Node:
 class SinglyLinkedList:
     """ In a singly linked list we only keep references to the next node """
 
-    def __init__(self):
+    def __init__(self, pool: Optional[NodePool] = None):
         self.head = None
+        self._pool = pool  # Optional free-list, deleted nodes are recycled on the next insert
 
     def __str__(self):
         s = ""
@@ -36,24 +42,27 @@ class SinglyLinkedList:
     # O(1)
     def insert(self, item: int) -> None:
         """ Insert at the head of the linked list """
-        new_node = Node(data=item)
+        new_node = self._pool.acquire(item) if self._pool is not None else Node(data=item)
         new_node.next = self.head
         self.head = new_node
 
     # O(N)
     def delete(self, item: int) -> None:
-        """ Delete the node """
-        current = self.head
+        """ Delete the first node holding item """
         prev = None
+        current = self.head
+        while current is not None and current.data != item:
+            prev = current
+            current = current.next
 
-        if item == self.head.data:
-            self.head = self.head.next
+        if current is None:
+            return
+        if prev is None:
+            self.head = current.next
         else:
-            while current is not None:
-                if current.data == item:
-                    prev.next = current.next
-                prev = current
-                current = current.next
+            prev.next = current.next
+        if self._pool is not None:
+            self._pool.release(current)
 
 
 class DoublyLinkedList:
@@ -62,11 +71,12 @@ class DoublyLinkedList:
     Search is the same as singly-linked-list. Insertion/Deletion will change due to the 'prev' pointer.
     """
 
-    def __init__(self):
+    def __init__(self, pool: Optional[NodePool] = None):
         self.head = None
+        self._pool = pool  # Optional free-list, deleted nodes are recycled on the next insert
 
     def insert(self, item: int) -> None:
-        new_node = Node(item)
+        new_node = self._pool.acquire(item) if self._pool is not None else Node(item)
         new_node.next = self.head
 
         if self.head is not None:
@@ -80,16 +90,184 @@ class DoublyLinkedList:
             curr = curr.next
         return curr
 
+    # O(N)
     def delete(self, item: int) -> None:
+        """ Delete the first node holding item """
+        if self.head is None:
+            return
+
         if item == self.head.data:
+            removed = self.head
             self.head = self.head.next
+            if self.head is not None:
+                self.head.prev = None
         else:
-            curr = self.head
-            while curr is not None:
-                if curr.data == item:
-                    if curr.next is not None:
-                        curr.next.prev = curr.prev
-                    curr.prev.next = curr.next
+            removed = self.head.next
+            while removed is not None and removed.data != item:
+                removed = removed.next
+            if removed is None:
+                return
+            if removed.next is not None:
+                removed.next.prev = removed.prev
+            removed.prev.next = removed.next
+
+        if self._pool is not None:
+            self._pool.release(removed)
+
+    def is_empty(self) -> bool:
+        return self.head is None
+
+
+# DoublyLinkedList.delete has to search for the node first, O(N). If we also keep a hash map of item -> node,
+# the node is found in O(1), and since it has a prev pointer it can be unlinked in O(1) too.
+# With a tail pointer as well, we get O(1) operations at both ends and anywhere in between:
+# - delete(item), move_to_front(item), move_to_back(item), pop_front(), pop_back()
+# This is the structure behind an LRU cache or any recency-ordered list (most recent at the front).
+# Items double as map keys, so they must be hashable and unique within the list.
+class IndexedDoublyLinkedList:
+    def __init__(self, iterable=()):
+        self.head = None
+        self.tail = None
+        self._index = {}  # item -> Node
+        for item in iterable:
+            self.append(item)
+
+    def __str__(self) -> str:
+        return "".join(f"{item}->" for item in self) + "None"
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, item) -> bool:
+        return item in self._index
+
+    def __iter__(self):
+        curr = self.head
+        while curr is not None:
+            yield curr.data
+            curr = curr.next
+
+    def _link_front(self, node: Node) -> None:
+        node.prev = None
+        node.next = self.head
+        if self.head is not None:
+            self.head.prev = node
+        else:
+            self.tail = node
+        self.head = node
+
+    def _link_back(self, node: Node) -> None:
+        node.next = None
+        node.prev = self.tail
+        if self.tail is not None:
+            self.tail.next = node
+        else:
+            self.head = node
+        self.tail = node
+
+    def _unlink(self, node: Node) -> None:
+        if node.prev is not None:
+            node.prev.next = node.next
+        else:
+            self.head = node.next
+        if node.next is not None:
+            node.next.prev = node.prev
+        else:
+            self.tail = node.prev
+        node.next = node.prev = None
+
+    # O(1)
+    def search(self, item) -> Optional[Node]:
+        return self._index.get(item)
+
+    # O(1)
+    def insert(self, item) -> None:
+        """ Insert at the head, an item that's already in the list is moved to the head """
+        node = self._index.get(item)
+        if node is not None:
+            self._unlink(node)
+        else:
+            node = self._index[item] = Node(item)
+        self._link_front(node)
+
+    # O(1)
+    def append(self, item) -> None:
+        """ Insert at the tail, an item that's already in the list is moved to the tail """
+        node = self._index.get(item)
+        if node is not None:
+            self._unlink(node)
+        else:
+            node = self._index[item] = Node(item)
+        self._link_back(node)
+
+    # O(1)
+    def delete(self, item) -> None:
+        node = self._index.pop(item, None)
+        if node is not None:
+            self._unlink(node)
+
+    # O(1)
+    def move_to_front(self, item) -> None:
+        node = self._index[item]
+        if node is not self.head:
+            self._unlink(node)
+            self._link_front(node)
+
+    # O(1)
+    def move_to_back(self, item) -> None:
+        node = self._index[item]
+        if node is not self.tail:
+            self._unlink(node)
+            self._link_back(node)
+
+    # O(1)
+    def pop_front(self):
+        if self.head is None:
+            raise Exception("List Underflow")
+        node = self.head
+        self._unlink(node)
+        del self._index[node.data]
+        return node.data
+
+    # O(1)
+    def pop_back(self):
+        if self.tail is None:
+            raise Exception("List Underflow")
+        node = self.tail
+        self._unlink(node)
+        del self._index[node.data]
+        return node.data
+
+    # O(1) relinking + O(k) index merge - Where k is the length of other
+    def splice(self, other: "IndexedDoublyLinkedList", after=None) -> None:
+        """
+        Move every node of other into this list, after the node holding `after` (at the tail if after is None).
+        The nodes are relinked, not copied. other is left empty.
+        """
+        if other is self:
+            raise ValueError("cannot splice a list into itself")
+        if other.head is None:
+            return
+        if self._index.keys() & other._index.keys():
+            raise ValueError("spliced lists share items")
+
+        prev = self.tail if after is None else self._index[after]
+        nxt = prev.next if prev is not None else self.head
+
+        other.head.prev = prev
+        other.tail.next = nxt
+        if prev is not None:
+            prev.next = other.head
+        else:
+            self.head = other.head
+        if nxt is not None:
+            nxt.prev = other.tail
+        else:
+            self.tail = other.tail
+
+        self._index.update(other._index)
+        other.head = other.tail = None
+        other._index = {}
 
     def is_empty(self) -> bool:
         return self.head is None
@@ -130,6 +308,38 @@ class CircularLinkedList:
             return curr
         return None
 
+    # O(1)
+    def insert_after(self, node: Node, item: int) -> Node:
+        """ Insert item right after node (which must be in the list), return the new node """
+        new_node = Node(item)
+        new_node.next = node.next
+        node.next = new_node
+        # 'first' is the node whose next pointer closes the circle, inserting after it makes the new node the last one
+        if node is self.first:
+            self.first = new_node
+        self.size += 1
+        return new_node
+
+    # O(1)
+    def remove_after(self, node: Node) -> Node:
+        """
+        Unlink and return node.next. In a singly linked circle we need the predecessor to remove a node in O(1),
+        so callers that want to remove a 'current' node keep a cursor on the node before it.
+        """
+        removed = node.next
+        self.size -= 1
+        if removed is node:
+            # It was the only node
+            self.head = self.first = None
+            return removed
+
+        node.next = removed.next
+        if removed is self.head:
+            self.head = removed.next
+        if removed is self.first:
+            self.first = node
+        return removed
+
 
 class Test(unittest.TestCase):
     def test_singly_linked_list(self):
@@ -145,6 +355,23 @@ class Test(unittest.TestCase):
         singly_linked_list.delete(5)
         self.assertEqual(str(singly_linked_list), "8->7->6->4->3->2->None")
 
+    def test_singly_linked_list_duplicates(self):
+        # Same result with and without a pool: only the first matching node goes
+        for pool in (None, NodePool(Node)):
+            singly_linked_list = SinglyLinkedList(pool=pool)
+            for i in (2, 5, 5, 1):
+                singly_linked_list.insert(i)
+            singly_linked_list.delete(5)
+            self.assertEqual(str(singly_linked_list), "1->5->2->None")
+            singly_linked_list.delete(5)
+            self.assertEqual(str(singly_linked_list), "1->2->None")
+            singly_linked_list.delete(1)
+            singly_linked_list.delete(7)
+            self.assertEqual(str(singly_linked_list), "2->None")
+            singly_linked_list.delete(2)
+            singly_linked_list.delete(2)
+            self.assertIsNone(singly_linked_list.head)
+
     def test_doubly_linked_list(self):
         doubly_linked_list = DoublyLinkedList()
 
@@ -157,6 +384,51 @@ class Test(unittest.TestCase):
         doubly_linked_list.delete(0)
         self.assertEqual(doubly_linked_list.is_empty(), True)
 
+        # Deleting a node past the head
+        for i in range(4):
+            doubly_linked_list.insert(i)
+        doubly_linked_list.delete(1)
+        doubly_linked_list.delete(0)
+        doubly_linked_list.delete(100)
+        self.assertIsNone(doubly_linked_list.search(1))
+        self.assertIs(doubly_linked_list.search(2).prev, doubly_linked_list.head)
+        self.assertIsNone(doubly_linked_list.search(2).next)
+
+    def test_indexed_doubly_linked_list(self):
+        ll = IndexedDoublyLinkedList([1, 2, 3])
+        ll.insert(0)
+        ll.append(4)
+        self.assertEqual(str(ll), "0->1->2->3->4->None")
+
+        ll.delete(2)
+        self.assertNotIn(2, ll)
+        ll.move_to_front(3)
+        ll.move_to_back(0)
+        self.assertEqual(list(ll), [3, 1, 4, 0])
+        self.assertIs(ll.search(4).prev, ll.search(1))
+
+        self.assertEqual(ll.pop_front(), 3)
+        self.assertEqual(ll.pop_back(), 0)
+        self.assertEqual(list(ll), [1, 4])
+
+        ll.insert(4)  # Already present, moved to the head
+        self.assertEqual(list(ll), [4, 1])
+        self.assertEqual(len(ll), 2)
+
+        ll.splice(IndexedDoublyLinkedList([7, 8]), after=4)
+        self.assertEqual(list(ll), [4, 7, 8, 1])
+        ll.splice(IndexedDoublyLinkedList([9]))
+        self.assertEqual(list(ll), [4, 7, 8, 1, 9])
+        self.assertEqual(ll.tail.data, 9)
+        self.assertIs(ll.search(8).next, ll.search(1))
+        with self.assertRaises(ValueError):
+            ll.splice(IndexedDoublyLinkedList([1]))
+
+        while not ll.is_empty():
+            ll.pop_back()
+        with self.assertRaises(Exception):
+            ll.pop_front()
+
     def test_circular_linked_list(self):
         c = CircularLinkedList()
         c.insert(1)
@@ -166,6 +438,25 @@ class Test(unittest.TestCase):
         c.insert(3)
         self.assertEqual(c.head.next.next.next, c.head)
         self.assertEqual(c.search(3).data, 3)
+
+    def test_circular_insert_remove_after(self):
+        c = CircularLinkedList()
+        c.insert(1)
+        c.insert(2)  # Order from head: 2 -> 1 -> (2)
+        c.insert_after(c.first, 3)  # 2 -> 1 -> 3 -> (2)
+        self.assertEqual(c.first.data, 3)
+        self.assertIs(c.first.next, c.head)
+        self.assertEqual(c.size, 3)
+
+        self.assertEqual(c.remove_after(c.first).data, 2)  # Removes the head
+        self.assertEqual(c.head.data, 1)
+        self.assertIs(c.first.next, c.head)
+        self.assertEqual(c.remove_after(c.head).data, 3)  # Removes the last node
+        self.assertIs(c.first, c.head)
+        self.assertIs(c.head.next, c.head)
+        self.assertEqual(c.remove_after(c.head).data, 1)
+        self.assertIsNone(c.head)
+        self.assertEqual(c.size, 0)
      
 
 if __name__ == "__main__":
@@ -3,6 +3,8 @@ import unittest
 from math import floor
 from typing import Tuple
 
+from stacks import StackArr
+
 
 # Note: We can solve this in O(N) time and O(1) space using the Sliding Window Technique.
 # This is mainly for divide & conquer practice.
@@ -35,6 +37,42 @@ def find_maximum_subarray(A: list, low: int, high: int) -> Tuple[int, int, int]:
             return cross_low, cross_high, cross_sum
 
 
+# Same divide & conquer, driven by an explicit work stack (StackArr) instead of the call-stack.
+# Frames are (low, high, combine?). A subarray is first split (its halves are pushed on top), and when it comes back up
+# marked "combine", the results of its two halves are on top of the results stack (right half on top).
+# Time Complexity: O(nlogn) | Space Complexity: O(logn) frames, no recursion limit
+def find_maximum_subarray_iterative(A: list, low: int, high: int) -> Tuple[int, int, int]:
+    work = StackArr()
+    results = StackArr()
+    work.push((low, high, False))
+
+    while not work.is_empty():
+        low, high, combine = work.pop()
+        if low == high:
+            results.push((low, high, A[low]))
+            continue
+
+        mid = (low + high) // 2
+        if not combine:
+            work.push((low, high, True))
+            work.push((mid + 1, high, False))
+            work.push((low, mid, False))
+            continue
+
+        right_low, right_high, right_sum = results.pop()
+        left_low, left_high, left_sum = results.pop()
+        cross_low, cross_high, cross_sum = find_max_crossing_subarray(A, low, mid, high)
+
+        if left_sum >= right_sum and left_sum >= cross_sum:
+            results.push((left_low, left_high, left_sum))
+        elif right_sum >= left_sum and right_sum >= cross_sum:
+            results.push((right_low, right_high, right_sum))
+        else:
+            results.push((cross_low, cross_high, cross_sum))
+
+    return results.pop()
+
+
 def find_max_crossing_subarray(A: int, low: int, mid: int, high: int) -> Tuple[int, int, int]:
     max_left_idx, max_right_idx = None, None
 
@@ -42,8 +80,8 @@ def find_max_crossing_subarray(A: int, low: int, mid: int, high: int) -> Tuple[i
     sum_ = 0
 
     # Find max subarray of the left subarray A[low...mid]
-    # Go from mid-low (right to left), it's low +1 because python has a inclusive-exclusive range
-    for i in range(mid, low + 1, -1):
+    # Go from mid-low (right to left), it's low - 1 because python has a inclusive-exclusive range
+    for i in range(mid, low - 1, -1):
         sum_ += A[i]
         if sum_ > left_sum:
             left_sum = sum_
@@ -86,6 +124,14 @@ class Test(unittest.TestCase):
         self.assertEqual(find_maximum_subarray(A=t1, low=0, high=len(t1) - 1), (2, 4, 6))
         self.assertEqual(find_max_subarray_sliding_window(A=[-1, -1, 2, 3, 1, -2, -5]), 6)
 
+    def test_find_max_subarray_iterative(self):
+        t1 = [-1, -1, 2, 3, 1, -2, -5]
+        self.assertEqual(find_maximum_subarray_iterative(A=t1, low=0, high=len(t1) - 1), (2, 4, 6))
+
+        t2 = [13, -3, -25, 20, -3, -16, -23, 18, 20, -7, 12, -5, -22, 15, -4, 7]  # CLRS example
+        self.assertEqual(find_maximum_subarray_iterative(A=t2, low=0, high=len(t2) - 1), (7, 10, 43))
+        self.assertEqual(find_maximum_subarray(A=t2, low=0, high=len(t2) - 1), (7, 10, 43))
+
 
 if __name__ == "__main__":
     unittest.main()
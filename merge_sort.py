@@ -1,4 +1,11 @@
+import random
+import time
 import unittest
+from bisect import bisect_left, bisect_right
+from typing import Callable, Optional
+
+from insertion_sort import binary_insertion_sort
+from stacks import StackArr
 
 
 # Merge sort steps:
@@ -18,6 +25,28 @@ def merge_sort(A: list, p: int, r: int) -> None:
         merge(A, p, q, r)
 
 
+# Same algorithm as merge_sort, driven by an explicit work stack (StackArr) instead of the call-stack.
+# Each frame is (p, r, merged?): the first time we pop a frame we push it back marked as "merge pending", then push
+# the right and left halves on top. The halves are sorted before the frame comes back up and gets merged.
+# The stack holds at most O(logn) frames, with no Python function call per subarray and no recursion limit.
+# Time complexity: O(nlogn) - Space: O(N)
+def merge_sort_iterative(A: list, p: int, r: int) -> None:
+    stack = StackArr()
+    stack.push((p, r, False))
+
+    while not stack.is_empty():
+        p, r, merge_pending = stack.pop()
+        if p >= r:
+            continue
+        q = (p + r) // 2
+        if merge_pending:
+            merge(A, p, q, r)
+        else:
+            stack.push((p, r, True))
+            stack.push((q + 1, r, False))  # Right subarray
+            stack.push((p, q, False))  # Left subarray (popped first)
+
+
 # Time Complexity: O(N) - Space: O(N)
 def merge(A: list, p: int, q: int, r: int) -> None:
     # Use two auxillary arrays for the left and right subarrays
@@ -55,6 +84,268 @@ def merge(A: list, p: int, q: int, r: int) -> None:
             j += 1
 
 
+# === Adaptive merge sort (Timsort style) ===
+# merge_sort always splits down to single elements and never notices that the input is already (mostly) sorted.
+# Real data often is: sorted data with some new records appended, or a concatenation of sorted batches.
+# The adaptive version:
+# 1. Scans the array for natural runs: maximal ascending stretches, or strictly descending ones (reversed in place)
+# 2. Extends runs shorter than min_run to min_run elements with binary insertion sort, which is fast on short arrays
+# 3. Pushes runs on a stack and merges neighbours while keeping run lengths balanced (the Timsort invariants
+#    |Z| > |Y| + |X| and |Y| > |X| on the top three runs), so merges stay O(nlogn) in total
+# 4. Merges use one reusable buffer sized to the SMALLER of the two runs, instead of two new lists per merge
+# 5. Galloping: when one run keeps winning, switch from one-at-a-time comparisons to a binary search for how many
+#    elements in a row come from that run and move them with one slice copy
+# Only "<" is used to compare, no float("inf") sentinels, so strings, tuples etc. sort fine.
+# Best case (already sorted): O(N) | Worst case: O(nlogn) | Space: O(N/2) for the merge buffer
+MIN_GALLOP = 7
+
+
+def compute_min_run(n: int) -> int:
+    """ Timsort's choice: a value in [32, 64] such that n / min_run is (close to) a power of 2, for balanced merges """
+    r = 0
+    while n >= 64:
+        r |= n & 1
+        n >>= 1
+    return n + r
+
+
+def _count_run(A: list, lo: int, hi: int) -> int:
+    """ Length of the run starting at lo. A strictly descending run is reversed so every run is ascending """
+    run_hi = lo + 1
+    if run_hi == hi:
+        return 1
+
+    if A[run_hi] < A[lo]:
+        # Strictly descending (strict so that reversing it keeps the sort stable)
+        while run_hi < hi and A[run_hi] < A[run_hi - 1]:
+            run_hi += 1
+        A[lo:run_hi] = A[lo:run_hi][::-1]
+    else:
+        while run_hi < hi and not A[run_hi] < A[run_hi - 1]:
+            run_hi += 1
+    return run_hi - lo
+
+
+class _MergeState:
+    """ The run stack, the reusable merge buffer and the adaptive gallop threshold for one sort """
+
+    def __init__(self, A: list):
+        self.A = A
+        self.runs = []  # (base, length) of each pending run
+        self.buffer = []
+        self.min_gallop = MIN_GALLOP
+
+    def _load_buffer(self, lo: int, hi: int) -> list:
+        """ Copy A[lo:hi] into the front of the merge buffer (only grows, never shrinks) """
+        n = hi - lo
+        if len(self.buffer) < n:
+            self.buffer.extend([None] * (n - len(self.buffer)))
+        self.buffer[:n] = self.A[lo:hi]
+        return self.buffer
+
+    def merge_collapse(self) -> None:
+        runs = self.runs
+        while len(runs) > 1:
+            n = len(runs) - 2
+            if (n > 0 and runs[n - 1][1] <= runs[n][1] + runs[n + 1][1]) or \
+                    (n > 1 and runs[n - 2][1] <= runs[n - 1][1] + runs[n][1]):
+                if runs[n - 1][1] < runs[n + 1][1]:
+                    n -= 1
+            elif runs[n][1] > runs[n + 1][1]:
+                break
+            self.merge_at(n)
+
+    def merge_force_collapse(self) -> None:
+        runs = self.runs
+        while len(runs) > 1:
+            n = len(runs) - 2
+            if n > 0 and runs[n - 1][1] < runs[n + 1][1]:
+                n -= 1
+            self.merge_at(n)
+
+    def merge_at(self, i: int) -> None:
+        A = self.A
+        base1, len1 = self.runs[i]
+        base2, len2 = self.runs[i + 1]
+        self.runs[i] = (base1, len1 + len2)
+        del self.runs[i + 1]
+
+        # Elements of run 1 that are <= run2[0] are already in their final place, skip them
+        start = bisect_right(A, A[base2], base1, base2)
+        if start == base2:
+            return
+        # Same for elements of run 2 that are >= the last element of run 1
+        end = bisect_left(A, A[base2 - 1], base2, base2 + len2)
+        if end == base2:
+            return
+
+        if base2 - start <= end - base2:
+            self.merge_lo(start, base2, end)
+        else:
+            self.merge_hi(start, base2, end)
+
+    def merge_lo(self, lo: int, mid: int, hi: int) -> None:
+        """ Merge A[lo:mid] and A[mid:hi] front to back, with the (smaller) left run in the buffer """
+        A = self.A
+        n1 = mid - lo
+        left = self._load_buffer(lo, mid)
+        i, j, k = 0, mid, lo
+        min_gallop = self.min_gallop
+
+        while i < n1 and j < hi:
+            left_wins = right_wins = 0
+            # One element at a time, until one run wins min_gallop times in a row
+            while i < n1 and j < hi:
+                if A[j] < left[i]:
+                    A[k] = A[j]
+                    j += 1
+                    right_wins += 1
+                    left_wins = 0
+                else:
+                    A[k] = left[i]
+                    i += 1
+                    left_wins += 1
+                    right_wins = 0
+                k += 1
+                if left_wins >= min_gallop or right_wins >= min_gallop:
+                    break
+
+            # Galloping: binary search how many elements come from each run in a row, move them with a slice
+            while i < n1 and j < hi:
+                end = bisect_right(left, A[j], i, n1)
+                left_count = end - i
+                A[k:k + left_count] = left[i:end]
+                i, k = end, k + left_count
+                if i == n1:
+                    break
+
+                end = bisect_left(A, left[i], j, hi)
+                right_count = end - j
+                A[k:k + right_count] = A[j:end]
+                j, k = end, k + right_count
+
+                if left_count < MIN_GALLOP and right_count < MIN_GALLOP:
+                    min_gallop += 1  # Galloping didn't pay off, make it harder to enter
+                    break
+                min_gallop = max(1, min_gallop - 1)  # It paid off, make it easier to enter next time
+
+        if i < n1:
+            A[k:hi] = left[i:n1]
+        self.min_gallop = min_gallop
+
+    def merge_hi(self, lo: int, mid: int, hi: int) -> None:
+        """ Merge A[lo:mid] and A[mid:hi] back to front, with the (smaller) right run in the buffer """
+        A = self.A
+        n2 = hi - mid
+        right = self._load_buffer(mid, hi)
+        i, j, k = n2 - 1, mid - 1, hi - 1
+        min_gallop = self.min_gallop
+
+        while i >= 0 and j >= lo:
+            left_wins = right_wins = 0
+            while i >= 0 and j >= lo:
+                # Equal elements: the right run's element goes last, that keeps the sort stable
+                if right[i] < A[j]:
+                    A[k] = A[j]
+                    j -= 1
+                    left_wins += 1
+                    right_wins = 0
+                else:
+                    A[k] = right[i]
+                    i -= 1
+                    right_wins += 1
+                    left_wins = 0
+                k -= 1
+                if left_wins >= min_gallop or right_wins >= min_gallop:
+                    break
+
+            while i >= 0 and j >= lo:
+                # Elements of the left run greater than right[i] go next (from the back)
+                start = bisect_right(A, right[i], lo, j + 1)
+                left_count = j + 1 - start
+                A[k - left_count + 1:k + 1] = A[start:j + 1]
+                j, k = start - 1, k - left_count
+                if j < lo:
+                    break
+
+                # Elements of the right run >= A[j]
+                start = bisect_left(right, A[j], 0, i + 1)
+                right_count = i + 1 - start
+                A[k - right_count + 1:k + 1] = right[start:i + 1]
+                i, k = start - 1, k - right_count
+
+                if left_count < MIN_GALLOP and right_count < MIN_GALLOP:
+                    min_gallop += 1
+                    break
+                min_gallop = max(1, min_gallop - 1)
+
+        if i >= 0:
+            A[lo:lo + i + 1] = right[:i + 1]
+        self.min_gallop = min_gallop
+
+
+def merge_sort_adaptive(A: list, key: Optional[Callable] = None, min_run: Optional[int] = None) -> None:
+    """
+    Stable, in-place adaptive merge sort (Timsort style).
+
+    :param A: Array to sort
+    :param key: Sort by key(element). Keys are computed once per element, like sorted(key=...)
+    :param min_run: Runs shorter than this are extended with binary insertion sort (default: compute_min_run(n))
+    """
+    n = len(A)
+    if n < 2:
+        return
+
+    if key is not None:
+        # Decorate-sort-undecorate. The original index breaks ties between equal keys, so the elements themselves
+        # are never compared and equal keys keep their original order.
+        decorated = [(key(item), i) for i, item in enumerate(A)]
+        merge_sort_adaptive(decorated, min_run=min_run)
+        A[:] = [A[i] for _, i in decorated]
+        return
+
+    if min_run is None:
+        min_run = compute_min_run(n)
+
+    state = _MergeState(A)
+    lo = 0
+    while lo < n:
+        run_length = _count_run(A, lo, n)
+        if run_length < min_run:
+            forced = min(min_run, n - lo)
+            binary_insertion_sort(A, lo, lo + forced, lo + run_length)
+            run_length = forced
+
+        state.runs.append((lo, run_length))
+        state.merge_collapse()
+        lo += run_length
+
+    state.merge_force_collapse()
+
+
+def benchmark(n: int = 100_000, tail: int = 1_000, seed: int = 0) -> dict:
+    """ Seconds to sort with merge_sort, merge_sort_adaptive and sorted() on random / sorted+tail / reversed inputs """
+    rng = random.Random(seed)
+    inputs = {
+        "random": [rng.random() for _ in range(n)],
+        "sorted + random tail": sorted(rng.random() for _ in range(n - tail)) + [rng.random() for _ in range(tail)],
+        "reversed": list(range(n, 0, -1)),
+    }
+
+    results = {}
+    for name, data in inputs.items():
+        timings = {}
+        for sort_name, sort in (("merge_sort", lambda A: merge_sort(A, 0, len(A) - 1)),
+                                ("merge_sort_adaptive", merge_sort_adaptive),
+                                ("sorted", lambda A: A.sort())):
+            A = list(data)
+            start = time.perf_counter()
+            sort(A)
+            timings[sort_name] = time.perf_counter() - start
+        results[name] = timings
+    return results
+
+
 class Test(unittest.TestCase):
     def test_merge_sort(self):
         t1, t2 = [8, 7, 1, 5], [10, 9, 8, 7, 6, 5, 4, 3, 2, 1]
@@ -65,6 +356,52 @@ class Test(unittest.TestCase):
         self.assertEqual(t1, [1, 5, 7, 8])
         self.assertEqual(t2, [1, 2, 3, 4, 5, 6, 7, 8, 9, 10])
 
+    def test_merge_sort_iterative(self):
+        t1, t2 = [8, 7, 1, 5], [10, 9, 8, 7, 6, 5, 4, 3, 2, 1]
+
+        merge_sort_iterative(A=t1, p=0, r=len(t1) - 1)
+        merge_sort_iterative(A=t2, p=0, r=len(t2) - 1)
+
+        self.assertEqual(t1, [1, 5, 7, 8])
+        self.assertEqual(t2, [1, 2, 3, 4, 5, 6, 7, 8, 9, 10])
+
+    def test_merge_sort_adaptive(self):
+        t1, t2 = [8, 7, 1, 5], [10, 9, 8, 7, 6, 5, 4, 3, 2, 1]
+        merge_sort_adaptive(t1)
+        merge_sort_adaptive(t2)
+        self.assertEqual(t1, [1, 5, 7, 8])
+        self.assertEqual(t2, [1, 2, 3, 4, 5, 6, 7, 8, 9, 10])
+
+        words = ["pear", "apple", "fig", "banana"]
+        merge_sort_adaptive(words)
+        self.assertEqual(words, ["apple", "banana", "fig", "pear"])
+
+    def test_merge_sort_adaptive_against_sorted(self):
+        rng = random.Random(1)
+        inputs = [
+            [rng.randint(0, 50) for _ in range(3000)],
+            sorted(rng.random() for _ in range(2000)) + [rng.random() for _ in range(100)],
+            list(range(1000)) + list(range(1000, 0, -1)) + list(range(500)),
+            [(rng.randint(0, 3), rng.choice("abc")) for _ in range(1500)],
+        ]
+        for data in inputs:
+            for min_run in (None, 2, 8):
+                A = list(data)
+                merge_sort_adaptive(A, min_run=min_run)
+                self.assertEqual(A, sorted(data))
+
+    def test_merge_sort_adaptive_key_is_stable(self):
+        rng = random.Random(2)
+        records = [(rng.randint(0, 10), i) for i in range(2000)]
+        A = list(records)
+        merge_sort_adaptive(A, key=lambda record: record[0])
+        self.assertEqual(A, sorted(records, key=lambda record: record[0]))
+
+        # Elements that can't be compared to each other, only their keys
+        items = [{"id": i % 7} for i in range(100)]
+        merge_sort_adaptive(items, key=lambda item: -item["id"])
+        self.assertEqual([item["id"] for item in items], sorted((i % 7 for i in range(100)), reverse=True))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,241 @@
+import time
+import tracemalloc
+import unittest
+from typing import Any, Callable
+
+
+# Every push/enqueue/insert allocates a node and every pop/dequeue/delete throws one away. In hot loops the allocator
+# and the garbage collector end up with a large share of the runtime. Two fixes:
+# 1. __slots__ on the node classes: attributes live in fixed slots instead of a per-instance __dict__, which makes each
+#    node a lot smaller and attribute access a bit faster.
+# 2. A free-list pool: removed nodes are kept on a list and handed back out on the next insert instead of allocating.
+#    The pool is bounded, so a burst of inserts followed by deletes doesn't pin that memory forever.
+# The pool is opt-in, pass one to the structure's constructor (e.g. StackLL(pool=NodePool(_Node))).
+# Measure before turning it on (see benchmark()): CPython's small object allocator already recycles memory quickly, so
+# the pool mainly pays off by keeping GC generation counts down in allocation heavy loops, not in raw ops/sec.
+class NodePool:
+    """ Bounded free-list of node objects """
+
+    def __init__(self, node_cls: type, maxsize: int = 1024):
+        self.node_cls = node_cls
+        self.maxsize = maxsize
+        self._free = []
+        self._slots = tuple(getattr(node_cls, "__slots__", ()))
+
+    def __len__(self) -> int:
+        return len(self._free)
+
+    # O(1)
+    def acquire(self, *args, **kwargs) -> Any:
+        """ Return a recycled node re-initialized with the given args, or a new node if the pool is empty """
+        if self._free:
+            node = self._free.pop()
+            node.__init__(*args, **kwargs)
+            return node
+        return self.node_cls(*args, **kwargs)
+
+    # O(1)
+    def release(self, node: Any) -> None:
+        """ Return a node to the pool. Its fields are cleared so the pool doesn't keep old data alive """
+        if len(self._free) < self.maxsize:
+            for slot in self._slots:
+                setattr(node, slot, None)
+            self._free.append(node)
+
+    def clear(self) -> None:
+        self._free.clear()
+
+
+def _dict_backed(node_cls: type) -> type:
+    """ A copy of node_cls without __slots__, what the nodes looked like before """
+    return type(node_cls.__name__, (), {"__init__": node_cls.__init__})
+
+
+def _measure(build: Callable[[], Any], churn: Callable[[Any], None], n: int) -> dict:
+    """ bytes per element from tracemalloc for building n elements, and ops/sec for a push/pop style churn """
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before, _ = tracemalloc.get_traced_memory()
+    structure = build()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    churn(structure)
+    elapsed = time.perf_counter() - start
+    return {"bytes/element": (after - before) / n, "ops/sec": 2 * n / elapsed}
+
+
+def benchmark(n: int = 100_000) -> dict:
+    """
+    For each node-based structure, report bytes/element and ops/sec for:
+    - before: dict-backed nodes (no __slots__)
+    - slots: the current __slots__ nodes
+    - slots+pool: __slots__ nodes recycled through a NodePool
+    The CTCI Node isn't importable from here (the chapter folders aren't packages), it gets the same __slots__ change.
+    """
+    import hash_table
+    import linked_lists
+    import queues
+    import stacks
+
+    def stack_ll(pool=None):
+        def build():
+            s = stacks.StackLL(pool=pool)
+            for i in range(n):
+                s.push(i)
+            return s
+
+        def churn(s):
+            for i in range(n):
+                s.pop()
+            for i in range(n):
+                s.push(i)
+
+        return build, churn
+
+    def queue_ll(pool=None):
+        def build():
+            q = queues.QueueLL(pool=pool)
+            for i in range(n):
+                q.enqueue(i)
+            return q
+
+        def churn(q):
+            for i in range(n):
+                q.dequeue()
+                q.enqueue(i)
+
+        return build, churn
+
+    def chaining_list(pool=None):
+        def build():
+            ll = hash_table.LinkedList(pool=pool)
+            for i in range(n):
+                ll.insert(key=i, value=i)
+            return ll
+
+        def churn(ll):
+            # Deleting the head key keeps this O(1) per op
+            for _ in range(n):
+                key = ll.head.key
+                ll.delete(key=key)
+                ll.insert(key=key, value=key)
+
+        return build, churn
+
+    def singly_linked_list(pool=None):
+        def build():
+            ll = linked_lists.SinglyLinkedList(pool=pool)
+            for i in range(n):
+                ll.insert(i)
+            return ll
+
+        def churn(ll):
+            for _ in range(n):
+                item = ll.head.data
+                ll.delete(item)
+                ll.insert(item)
+
+        return build, churn
+
+    def doubly_linked_list(pool=None):
+        def build():
+            ll = linked_lists.DoublyLinkedList(pool=pool)
+            for i in range(n):
+                ll.insert(i)
+            return ll
+
+        def churn(ll):
+            for _ in range(n):
+                item = ll.head.data
+                ll.delete(item)
+                ll.insert(item)
+
+        return build, churn
+
+    structures = {
+        "StackLL": (stacks, "_Node", stack_ll),
+        "QueueLL": (queues, "_Node", queue_ll),
+        "hash_table.LinkedList": (hash_table, "_Node", chaining_list),
+        "SinglyLinkedList": (linked_lists, "Node", singly_linked_list),
+        "DoublyLinkedList": (linked_lists, "Node", doubly_linked_list),
+    }
+
+    results = {}
+    for name, (module, attr, factory) in structures.items():
+        node_cls = getattr(module, attr)
+        setattr(module, attr, _dict_backed(node_cls))
+        try:
+            before = _measure(*factory(), n=n)
+        finally:
+            setattr(module, attr, node_cls)
+
+        results[name] = {
+            "before": before,
+            "slots": _measure(*factory(), n=n),
+            "slots+pool": _measure(*factory(pool=NodePool(node_cls, maxsize=n)), n=n),
+        }
+    return results
+
+
+class Test(unittest.TestCase):
+    class _Node:
+        __slots__ = ("data", "next")
+
+        def __init__(self, data: Any):
+            self.data = data
+            self.next = None
+
+    def test_acquire_release(self):
+        pool = NodePool(self._Node, maxsize=2)
+        a = pool.acquire(1)
+        b = pool.acquire(2)
+        c = pool.acquire(3)
+        a.next = b
+
+        pool.release(a)
+        pool.release(b)
+        pool.release(c)  # Pool is full, c is dropped
+        self.assertEqual(len(pool), 2)
+        self.assertIsNone(a.data)
+        self.assertIsNone(a.next)
+
+        d = pool.acquire(4)
+        self.assertIs(d, b)
+        self.assertEqual(d.data, 4)
+        self.assertEqual(len(pool), 1)
+
+    def test_structures_recycle_nodes(self):
+        from stacks import StackLL, _Node as StackNode
+        from queues import QueueLL, _Node as QueueNode
+
+        pool = NodePool(StackNode)
+        s = StackLL(pool=pool)
+        s.push(1)
+        s.push(2)
+        self.assertEqual(s.pop(), 2)
+        self.assertEqual(len(pool), 1)
+        s.push(3)
+        self.assertEqual(len(pool), 0)
+        self.assertEqual([s.pop(), s.pop()], [3, 1])
+
+        pool = NodePool(QueueNode)
+        q = QueueLL(pool=pool)
+        for i in range(3):
+            q.enqueue(i)
+        self.assertEqual([q.dequeue() for _ in range(3)], [0, 1, 2])
+        self.assertEqual(len(pool), 3)
+
+    def test_slots(self):
+        import hash_table
+        import linked_lists
+        import queues
+        import stacks
+
+        for node in (stacks._Node(1), queues._Node(1), hash_table._Node(1, 1), linked_lists.Node(1)):
+            self.assertFalse(hasattr(node, "__dict__"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,277 @@
+import heapq
+import os
+import random
+import subprocess
+import sys
+import time
+import unittest
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+from typing import List, Optional, Sequence, Tuple
+
+
+# Every sort in merge_sort.py, quick_sort.py and heaps.py runs on one core. Threads don't help, a CPU bound sort
+# holds the GIL, so the work has to be spread over processes:
+# 1. Split the input into one chunk per worker and sort the chunks in a ProcessPoolExecutor
+# 2. k-way merge the sorted chunks
+# Shipping the data to the workers and back is the cost of parallelism. A list argument gets pickled, copied through
+# a pipe and unpickled on both trips, that alone costs about as much as sorting it.
+# Numeric data (ints or floats) is copied once into a typed array in shared memory instead. Workers attach to the
+# block by name and sort their chunk in place, nothing is pickled except (name, lo, hi).
+# The merge is split by key range instead of done in the parent: splitter keys sampled from the sorted chunks cut
+# every chunk at the same keys, and each worker k-way merges one key range straight into its slice of the output.
+# Time Complexity: O((n/w)log(n/w) + (n/w)logw) per worker for w workers | Space: O(N) shared memory
+
+MIN_CHUNK = 50_000  # Below this many elements per worker, process startup + copying costs more than it saves
+_SAMPLES_PER_CHUNK = 32
+
+
+def _numeric_typecode(data: Sequence) -> Optional[str]:
+    """ Typecode of a shared memory array that can hold the data exactly, None if it isn't all ints or all floats """
+    if isinstance(data, array):
+        return data.typecode
+    if all(type(x) is int for x in data):
+        return "q" if all(-2 ** 63 <= x < 2 ** 63 for x in data) else None
+    if all(type(x) is float for x in data):
+        return "d"
+    return None
+
+
+def _chunk_bounds(n: int, workers: int) -> List[Tuple[int, int]]:
+    size, extra = divmod(n, workers)
+    bounds, lo = [], 0
+    for i in range(workers):
+        hi = lo + size + (1 if i < extra else 0)
+        bounds.append((lo, hi))
+        lo = hi
+    return bounds
+
+
+# === Worker side (module level so the pool can pickle them) ===
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """
+    Attach to the parent's shared memory block without registering it with a resource tracker.
+    Before Python 3.13 attaching registers the block like creating it does. A worker forked before the parent's tracker
+    was running then starts a tracker of its own, which warns the block leaked and unlinks it (a second time) when the
+    worker exits. The parent created the blocks and unlinks them, so only the parent's tracker should know about them
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None  # A worker runs one task at a time, nothing else registers
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+def _sort_shared(name: str, typecode: str, lo: int, hi: int) -> None:
+    """ Sort shared[lo:hi] in place """
+    shm = _attach(name)
+    view = shm.buf.cast("B").cast(typecode)
+    try:
+        view[lo:hi] = array(typecode, sorted(view[lo:hi].tolist()))
+    finally:
+        view.release()
+        shm.close()
+
+
+def _merge_shared(in_name: str, out_name: str, typecode: str, ranges: List[Tuple[int, int]], out_lo: int) -> None:
+    """ k-way merge the sorted slices in_shared[lo:hi] for (lo, hi) in ranges into out_shared[out_lo:] """
+    shm_in = _attach(in_name)
+    shm_out = _attach(out_name)
+    view_in = shm_in.buf.cast("B").cast(typecode)
+    view_out = shm_out.buf.cast("B").cast(typecode)
+    try:
+        runs = [view_in[lo:hi].tolist() for lo, hi in ranges if lo < hi]
+        merged = array(typecode, heapq.merge(*runs))
+        view_out[out_lo:out_lo + len(merged)] = merged
+    finally:
+        view_in.release()
+        view_out.release()
+        shm_in.close()
+        shm_out.close()
+
+
+# === Parent side ===
+
+
+def _choose_splitters(view, bounds: List[Tuple[int, int]], workers: int) -> list:
+    """ workers - 1 keys that cut the sorted chunks into key ranges of about n / workers elements """
+    samples = []
+    for lo, hi in bounds:
+        step = max(1, (hi - lo) // _SAMPLES_PER_CHUNK)
+        samples.extend(view[i] for i in range(lo, hi, step))
+    samples.sort()
+    return [samples[len(samples) * i // workers] for i in range(1, workers)]
+
+
+def _parallel_sort_shared(data: Sequence, typecode: str, bounds: List[Tuple[int, int]],
+                          executor: ProcessPoolExecutor) -> array:
+    n = bounds[-1][1]
+    itemsize = array(typecode).itemsize
+    shm_in = shared_memory.SharedMemory(create=True, size=max(1, n * itemsize))
+    shm_out = shared_memory.SharedMemory(create=True, size=max(1, n * itemsize))
+    view_in = shm_in.buf.cast("B").cast(typecode)
+    view_out = shm_out.buf.cast("B").cast(typecode)
+    try:
+        view_in[:n] = data if isinstance(data, array) else array(typecode, data)
+
+        for future in [executor.submit(_sort_shared, shm_in.name, typecode, lo, hi) for lo, hi in bounds]:
+            future.result()
+
+        # Cut every sorted chunk at the same splitter keys, key range j goes to output offset sum of range sizes < j
+        splitters = _choose_splitters(view_in, bounds, len(bounds))
+        cuts = [[lo] + [bisect_left(view_in, s, lo, hi) for s in splitters] + [hi] for lo, hi in bounds]
+        futures, out_lo = [], 0
+        for j in range(len(bounds)):
+            ranges = [(chunk_cuts[j], chunk_cuts[j + 1]) for chunk_cuts in cuts]
+            futures.append(executor.submit(_merge_shared, shm_in.name, shm_out.name, typecode, ranges, out_lo))
+            out_lo += sum(hi - lo for lo, hi in ranges)
+        for future in futures:
+            future.result()
+
+        result = array(typecode)
+        result.frombytes(shm_out.buf[:n * itemsize])
+        return result
+    finally:
+        view_in.release()
+        view_out.release()
+        for shm in (shm_in, shm_out):
+            shm.close()
+            shm.unlink()
+
+
+def parallel_sort(data: Sequence, workers: Optional[int] = None, executor: Optional[ProcessPoolExecutor] = None,
+                  min_chunk: int = MIN_CHUNK) -> Sequence:
+    """
+    Return a sorted copy of data, sorted on up to `workers` processes (default: one per core).
+    Lists of ints/floats and array.arrays go through shared memory, anything else is pickled to the workers and
+    k-way merged in this process. Returns an array for array input, a list otherwise.
+
+    :param executor: Pool to run on, by default one is started (and shut down) for this call
+    :param min_chunk: Fewest elements worth handing to a worker, small inputs are sorted in this process
+    """
+    # Start the resource tracker (the process that unlinks leaked shared memory at exit) before any worker is forked,
+    # so the workers share it instead of starting their own
+    resource_tracker.ensure_running()
+    n = len(data)
+    workers = workers or os.cpu_count() or 1
+    workers = max(1, min(workers, n // max(1, min_chunk)))
+
+    if workers == 1:
+        result = sorted(data)
+        return array(data.typecode, result) if isinstance(data, array) else result
+
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        return _sort_on_pool(data, workers, executor)
+    finally:
+        if own_executor:
+            executor.shutdown()
+
+
+def _sort_on_pool(data: Sequence, workers: int, executor: ProcessPoolExecutor) -> Sequence:
+    """ parallel_sort on `workers` chunks, even a single one: always ships the data to the pool and back """
+    bounds = _chunk_bounds(len(data), workers)
+    typecode = _numeric_typecode(data)
+    if typecode is not None:
+        result = _parallel_sort_shared(data, typecode, bounds, executor)
+        return result if isinstance(data, array) else result.tolist()
+
+    runs = executor.map(sorted, [data[lo:hi] for lo, hi in bounds])
+    return list(heapq.merge(*runs))
+
+
+def benchmark(sizes: Sequence[int] = (10 ** 6, 10 ** 7), max_workers: Optional[int] = None, seed: int = 0) -> dict:
+    """
+    Speedup curve: seconds for sorted() vs parallel_sort with 1..max_workers workers on random floats, for each size.
+    The pool is started (and warmed up) before the clock starts, the timings include the copies into and out of
+    shared memory. 1 worker goes through the pool as well (parallel_sort would sort in this process), so its point is
+    sorted() plus the transfer cost. "best workers" is where adding workers stops paying for the extra copying and
+    merging. Sizes up to 10^8 work, but need ~4x the data size in RAM (input list, 2 shared blocks, output list).
+    """
+    resource_tracker.ensure_running()  # Before the pools below fork their workers
+    max_workers = max_workers or os.cpu_count() or 1
+    rng = random.Random(seed)
+    results = {}
+    for n in sizes:
+        data = [rng.random() for _ in range(n)]
+        start = time.perf_counter()
+        sorted(data)
+        serial = time.perf_counter() - start
+
+        curve = {}
+        for workers in range(1, max_workers + 1):
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(abs, range(workers)))  # Start the worker processes
+                start = time.perf_counter()
+                _sort_on_pool(data, workers, executor)
+                elapsed = time.perf_counter() - start
+            curve[workers] = {"secs": elapsed, "speedup": serial / elapsed}
+
+        best = max(curve, key=lambda w: curve[w]["speedup"])
+        results[n] = {"sorted secs": serial, "workers": curve, "best workers": best}
+    return results
+
+
+class Test(unittest.TestCase):
+    def test_numeric_shared_memory(self):
+        rng = random.Random(1)
+        ints = [rng.randint(-10 ** 12, 10 ** 12) for _ in range(5000)]
+        floats = [rng.random() for _ in range(5000)]
+        with ProcessPoolExecutor(max_workers=3) as executor:
+            self.assertEqual(parallel_sort(ints, workers=3, executor=executor, min_chunk=1), sorted(ints))
+            self.assertEqual(parallel_sort(floats, workers=3, executor=executor, min_chunk=1), sorted(floats))
+
+            typed = array("i", (rng.randrange(100) for _ in range(1001)))  # Lots of duplicates across splitters
+            result = parallel_sort(typed, workers=3, executor=executor, min_chunk=1)
+            self.assertEqual(result, array("i", sorted(typed)))
+
+    def test_generic_data_is_pickled(self):
+        rng = random.Random(2)
+        words = ["".join(rng.choice("abc") for _ in range(4)) for _ in range(500)]
+        self.assertIsNone(_numeric_typecode(words))
+        self.assertEqual(parallel_sort(words, workers=2, min_chunk=1), sorted(words))
+
+    def test_pool_started_before_the_resource_tracker(self):
+        # A fresh interpreter, so no resource tracker is running yet when the pool forks its workers. The workers'
+        # own trackers used to warn the blocks leaked, and unlink them a second time, when the pool shut down
+        script = (
+            "from concurrent.futures import ProcessPoolExecutor\n"
+            "import parallel_sort\n"
+            "with ProcessPoolExecutor(max_workers=2) as executor:\n"
+            "    list(executor.map(abs, range(2)))\n"
+            "    data = [float(i) for i in range(2000, 0, -1)]\n"
+            "    assert parallel_sort.parallel_sort(data, workers=2, executor=executor, min_chunk=1) == sorted(data)\n"
+        )
+        # stderr is read until every process holding it exits, the workers' trackers included
+        process = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, timeout=60,
+                                 cwd=os.path.dirname(os.path.abspath(__file__)))
+        self.assertEqual(process.returncode, 0, process.stderr)
+        self.assertNotIn("resource_tracker", process.stderr)
+
+    def test_one_worker_on_the_pool(self):
+        # benchmark()'s 1 worker point: a single chunk, still shipped to the pool (and through shared memory)
+        rng = random.Random(3)
+        floats = [rng.random() for _ in range(1000)]
+        words = [str(x) for x in floats]
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            self.assertEqual(_sort_on_pool(floats, 1, executor), sorted(floats))
+            self.assertEqual(_sort_on_pool(words, 1, executor), sorted(words))
+        self.assertEqual(set(benchmark(sizes=(2000,), max_workers=2)[2000]["workers"]), {1, 2})
+
+    def test_small_input_sorts_in_process(self):
+        self.assertEqual(parallel_sort([3, 1, 2]), [1, 2, 3])
+        self.assertEqual(parallel_sort([]), [])
+        self.assertEqual(_numeric_typecode([1, 2.0]), None)
+        self.assertEqual(_numeric_typecode([2 ** 70]), None)
+
+
+if __name__ == "__main__":
+    unittest.main()
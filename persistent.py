@@ -0,0 +1,245 @@
+import unittest
+from typing import Any, Callable, Iterator, Optional
+
+from stacks import _Node
+
+
+# Persistent (immutable) data structures: every update returns a new version and leaves the old one valid.
+# The versions share structure instead of copying it, so:
+# - Taking a snapshot is free, just keep a reference to the current version (undo/redo, session checkpoints)
+# - Memory only grows with the changes made, unchanged parts are shared by every version that contains them
+# The trick is to never mutate a node after it's created. A node can then safely be part of many versions.
+
+
+# Cons-list stack, same layout as StackLL: the head node is the top of the stack.
+# push() creates one node whose next pointer is the old head, pop() just points at the old head's next node.
+class PersistentStack:
+    __slots__ = ("_head", "_size")
+
+    def __init__(self, _head: Optional[_Node] = None, _size: int = 0):
+        self._head = _head
+        self._size = _size
+
+    def __repr__(self) -> str:
+        return f"PersistentStack({list(self)})"
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[Any]:
+        """ Iterate from the top of the stack down """
+        curr = self._head
+        while curr is not None:
+            yield curr.data
+            curr = curr.next
+
+    # O(1)
+    @property
+    def peek(self) -> Any:
+        if self._head is None:
+            raise Exception("Stack Underflow")
+        return self._head.data
+
+    # O(1)
+    def push(self, item: Any) -> "PersistentStack":
+        new_node = _Node(item)
+        new_node.next = self._head
+        return PersistentStack(new_node, self._size + 1)
+
+    # O(1)
+    def pop(self) -> "PersistentStack":
+        """ Return the stack without its top item (read it with peek first) """
+        if self._head is None:
+            raise Exception("Stack Underflow")
+        return PersistentStack(self._head.next, self._size - 1)
+
+    def is_empty(self) -> bool:
+        return self._head is None
+
+
+EMPTY_STACK = PersistentStack()
+
+
+# A lazy, memoized stream cell. force() evaluates the thunk once and caches (head, tail) or None for the empty stream.
+class _Stream:
+    __slots__ = ("_thunk", "_value")
+
+    def __init__(self, thunk: Optional[Callable] = None, value=None):
+        self._thunk = thunk
+        self._value = value
+
+    @staticmethod
+    def cons(head: Any, tail: "_Stream") -> "_Stream":
+        return _Stream(value=(head, tail))
+
+    def force(self):
+        if self._thunk is not None:
+            self._value = self._thunk()
+            self._thunk = None
+        return self._value
+
+
+_EMPTY_STREAM = _Stream()
+
+
+def _rotate(f: _Stream, r: Optional[_Node], a: _Stream) -> _Stream:
+    """
+    Lazily compute f ++ reverse(r) ++ a, one cell per force. Invariant: len(r) == len(f) + 1.
+    Each force does O(1) work because the schedule has already forced the cells of f it touches.
+    """
+
+    def step():
+        forced = f.force()
+        if forced is None:
+            return r.data, a
+        head, tail = forced
+        return head, _rotate(tail, r.next, _Stream.cons(r.data, a))
+
+    return _Stream(step)
+
+
+# QueueTwoStacks keeps an enqueue stack and a dequeue stack and reverses one into the other when the dequeue side runs
+# out. That reversal is O(n), and with persistence it's worse: dequeue the same old version twice and you pay for the
+# reversal twice, so the amortized O(1) argument no longer holds.
+
+# Okasaki's real-time queue fixes this with laziness:
+# - front (f) is a lazy stream, rear (r) is a cons-list stack of enqueued items (newest first)
+# - When len(r) grows past len(f), we start a lazy rotation f ++ reverse(r) instead of reversing right away
+# - A schedule (s) points at the first un-forced cell of f. Every enqueue/dequeue forces one more cell of it, so the
+#   rotation is paid off one O(1) step at a time, before anyone needs it.
+# Forced cells are memoized, so every version sharing them shares the work. All operations are O(1) worst case.
+class PersistentQueue:
+    __slots__ = ("_front", "_front_size", "_rear", "_rear_size", "_schedule")
+
+    def __init__(self, _front: _Stream = _EMPTY_STREAM, _front_size: int = 0, _rear: Optional[_Node] = None,
+                 _rear_size: int = 0, _schedule: _Stream = _EMPTY_STREAM):
+        self._front = _front
+        self._front_size = _front_size
+        self._rear = _rear
+        self._rear_size = _rear_size
+        self._schedule = _schedule
+
+    def __repr__(self) -> str:
+        return f"PersistentQueue({list(self)})"
+
+    def __len__(self) -> int:
+        return self._front_size + self._rear_size
+
+    def __iter__(self) -> Iterator[Any]:
+        """ Iterate from the front of the queue to the back """
+        cell = self._front.force()
+        while cell is not None:
+            yield cell[0]
+            cell = cell[1].force()
+        yield from reversed(list(PersistentStack(self._rear, self._rear_size)))
+
+    @staticmethod
+    def _exec(front: _Stream, front_size: int, rear: Optional[_Node], rear_size: int,
+              schedule: _Stream) -> "PersistentQueue":
+        forced = schedule.force()
+        if forced is not None:
+            # Pay for one more step of the pending rotation
+            return PersistentQueue(front, front_size, rear, rear_size, forced[1])
+
+        # The schedule is exhausted (len(r) == len(f) + 1), start a new rotation
+        rotated = _rotate(front, rear, _EMPTY_STREAM)
+        return PersistentQueue(rotated, front_size + rear_size, None, 0, rotated)
+
+    # O(1)
+    @property
+    def first(self) -> Any:
+        forced = self._front.force()
+        if forced is None:
+            raise Exception("Queue Underflows")
+        return forced[0]
+
+    # O(1)
+    def enqueue(self, item: Any) -> "PersistentQueue":
+        new_node = _Node(item)
+        new_node.next = self._rear
+        return self._exec(self._front, self._front_size, new_node, self._rear_size + 1, self._schedule)
+
+    # O(1)
+    def dequeue(self) -> "PersistentQueue":
+        """ Return the queue without its first item (read it with first beforehand) """
+        forced = self._front.force()
+        if forced is None:
+            raise Exception("Queue Underflows")
+        return self._exec(forced[1], self._front_size - 1, self._rear, self._rear_size, self._schedule)
+
+    def is_empty(self) -> bool:
+        return len(self) == 0
+
+
+EMPTY_QUEUE = PersistentQueue()
+
+
+class Test(unittest.TestCase):
+    def test_persistent_stack(self):
+        s0 = EMPTY_STACK
+        s1 = s0.push(1)
+        s2 = s1.push(2)
+        s3 = s2.push(3)
+        self.assertEqual(list(s3), [3, 2, 1])
+
+        # Popping returns a new version, older versions are untouched
+        s2b = s3.pop()
+        self.assertEqual(list(s2b), [2, 1])
+        self.assertEqual(list(s3), [3, 2, 1])
+
+        # Branching off an old version shares the common tail
+        branch = s1.push(10)
+        self.assertEqual(list(branch), [10, 1])
+        self.assertIs(branch._head.next, s1._head)
+        self.assertEqual(s3.peek, 3)
+        self.assertEqual(len(s3), 3)
+
+        self.assertTrue(s0.is_empty())
+        with self.assertRaises(Exception):
+            s0.pop()
+
+    def test_persistent_queue(self):
+        q = EMPTY_QUEUE
+        versions = [q]
+        for i in range(10):
+            q = q.enqueue(i)
+            versions.append(q)
+
+        for i, version in enumerate(versions):
+            self.assertEqual(list(version), list(range(i)))
+
+        out = []
+        while not q.is_empty():
+            out.append(q.first)
+            q = q.dequeue()
+        self.assertEqual(out, list(range(10)))
+
+        # Old versions still hold everything they held before
+        self.assertEqual(versions[5].first, 0)
+        self.assertEqual(len(versions[5]), 5)
+        with self.assertRaises(Exception):
+            EMPTY_QUEUE.dequeue()
+
+    def test_persistent_queue_matches_fifo(self):
+        # Interleave enqueues/dequeues and replay dequeues on old versions
+        q = EMPTY_QUEUE
+        expected = []
+        checkpoints = []
+        for i in range(200):
+            q = q.enqueue(i)
+            expected.append(i)
+            if i % 3 == 0:
+                self.assertEqual(q.first, expected[0])
+                q = q.dequeue()
+                expected.pop(0)
+            checkpoints.append((q, list(expected)))
+
+        for version, contents in checkpoints:
+            self.assertEqual(list(version), contents)
+            if contents:
+                self.assertEqual(version.first, contents[0])
+                self.assertEqual(list(version.dequeue()), contents[1:])
+
+
+if __name__ == "__main__":
+    unittest.main()
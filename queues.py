@@ -1,9 +1,12 @@
 import unittest
-from typing import Any
+from typing import Any, Optional
 from stacks import StackLL
+from node_pool import NodePool
 
 
 class _Node:
+    __slots__ = ("data", "next")
+
     def __init__(self, data: Any):
         self.data = data
         self.next = None
@@ -51,10 +54,11 @@ class QueueArr:
 
 # Using Singly-Linked List
 class QueueLL:
-    def __init__(self, size=None):
+    def __init__(self, size=None, pool: Optional[NodePool] = None):
         self._head = None
         self._tail = None
         self._size = 0
+        self._pool = pool  # Optional free-list, dequeued nodes are recycled on the next enqueue
 
     @property
     def size(self):
@@ -66,7 +70,7 @@ class QueueLL:
 
     def enqueue(self, item: Any) -> None:
         self._size += 1
-        new_node = _Node(data=item)
+        new_node = self._pool.acquire(item) if self._pool is not None else _Node(data=item)
 
         if self._size == 1:
             self._head = self._tail = new_node
@@ -79,9 +83,12 @@ class QueueLL:
             raise Exception("Queue Underflows")
 
         self._size -= 1
-        item = self._head
+        node = self._head
         self._head = self._head.next
-        return item.data
+        item = node.data
+        if self._pool is not None:
+            self._pool.release(node)
+        return item
 
     def is_empty(self) -> bool:
         return self._head is None
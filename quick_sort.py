@@ -1,8 +1,16 @@
+import random
+import time
 import unittest
 
+from heaps import heap_sort
+from insertion_sort import binary_insertion_sort
+from stacks import StackArr
+
 
 # Quick sort steps:
 # 1. Shuffle array - Randomize array to avoid worst-case where time is o(n^2)
+#    (quick_sort below doesn't shuffle, it always uses A[r] as the pivot: sorted/reversed input is O(n^2).
+#     See introsort for a version that guards against that)
 # 2. Partition the array so that for some 'j'
 #       - larger keys are to the right of j
 #       - smaller keys are to the left of j
@@ -17,6 +25,28 @@ def quick_sort(A: list, p: int, r: int) -> None:
         quick_sort(A, q + 1, r)
 
 
+# Same algorithm as quick_sort, driven by an explicit work stack (StackArr) instead of the call-stack.
+# After each partition we push the LARGER side onto the stack and keep looping on the smaller side.
+# The smaller side is at most half the size, so at most O(logn) ranges are ever waiting on the stack, even on
+# already sorted/reversed input where the recursive version goes n levels deep (and hits Python's recursion limit).
+# Note: that only bounds the space. A bad pivot still makes the running time O(n^2).
+# Time Complexity: O(nlogn) average | Space O(logn) worst case
+def quick_sort_iterative(A: list, p: int, r: int) -> None:
+    stack = StackArr()
+    stack.push((p, r))
+
+    while not stack.is_empty():
+        p, r = stack.pop()
+        while p < r:
+            q = partition(A, p, r)
+            if q - p < r - q:
+                stack.push((q + 1, r))
+                r = q - 1
+            else:
+                stack.push((p, q - 1))
+                p = q + 1
+
+
 # O(N) Time
 def partition(A: list, p: int, r: int) -> int:
     pivot = A[r]
@@ -30,6 +60,131 @@ def partition(A: list, p: int, r: int) -> int:
     return i + 1
 
 
+# === Introsort ===
+# quick_sort with the worst cases taken out:
+# - Pivot: median of three (A[p], A[mid], A[r]) instead of A[r], for big ranges the "ninther" (median of three medians
+#   of three). Sorted and reversed input get a pivot from the middle instead of the largest/smallest key.
+# - 3-way partitioning (Dutch national flag): A[p..lt-1] < pivot, A[lt..gt] == pivot, A[gt+1..r] > pivot.
+#   Keys equal to the pivot are done and never looked at again, so all-equal/few-unique input is O(N), not O(n^2).
+# - Depth limit of 2*log2(n): a pivot sequence that still goes bad (e.g. adversarial "median-of-3 killer" input)
+#   hands the range over to heap_sort, which is O(nlogn) worst case.
+# - Ranges of INSERTION_CUTOFF keys or fewer are finished with binary insertion sort, which beats partitioning there.
+# The smaller side is sorted with a recursive call and the loop continues on the bigger side, so the call-stack
+# stays O(logn) deep.
+# Time Complexity: O(nlogn) worst case | Space: O(logn)
+INSERTION_CUTOFF = 16
+NINTHER_CUTOFF = 128
+
+
+def introsort(A: list, p: int = 0, r: int = None) -> None:
+    if r is None:
+        r = len(A) - 1
+    if p < r:
+        _introsort(A, p, r, 2 * (r - p + 1).bit_length())
+
+
+def _introsort(A: list, p: int, r: int, depth_limit: int) -> None:
+    while r - p + 1 > INSERTION_CUTOFF:
+        if depth_limit == 0:
+            _heap_sort_range(A, p, r)
+            return
+        depth_limit -= 1
+
+        lt, gt = partition3(A, p, r, choose_pivot(A, p, r))
+        if lt - p < r - gt:
+            _introsort(A, p, lt - 1, depth_limit)
+            p = gt + 1
+        else:
+            _introsort(A, gt + 1, r, depth_limit)
+            r = lt - 1
+
+    if p < r:
+        binary_insertion_sort(A, p, r + 1)
+
+
+def _heap_sort_range(A: list, p: int, r: int) -> None:
+    """ heap_sort works on a whole array (root at index 0), so sort a copy of A[p..r] and write it back """
+    sub = A[p:r + 1]
+    heap_sort(sub, len(sub) - 1)
+    A[p:r + 1] = sub
+
+
+def _median_of_three(A: list, i: int, j: int, k: int) -> int:
+    """ Index of the median of A[i], A[j], A[k] """
+    a, b, c = A[i], A[j], A[k]
+    if a < b:
+        if b < c:
+            return j
+        return k if a < c else i
+    if a < c:
+        return i
+    return k if b < c else j
+
+
+def choose_pivot(A: list, p: int, r: int):
+    """ Median of three for small ranges, ninther (Tukey's median of medians of three) for big ones """
+    mid = (p + r) // 2
+    if r - p + 1 < NINTHER_CUTOFF:
+        return A[_median_of_three(A, p, mid, r)]
+
+    step = (r - p + 1) // 8
+    return A[_median_of_three(A,
+                              _median_of_three(A, p, p + step, p + 2 * step),
+                              _median_of_three(A, mid - step, mid, mid + step),
+                              _median_of_three(A, r - 2 * step, r - step, r))]
+
+
+# O(N) Time
+def partition3(A: list, p: int, r: int, pivot) -> tuple:
+    """
+    Dutch national flag partition of A[p..r] around pivot (a value, not an index).
+    Returns (lt, gt) with A[p..lt-1] < pivot, A[lt..gt] == pivot and A[gt+1..r] > pivot.
+    """
+    lt, i, gt = p, p, r
+    while i <= gt:
+        x = A[i]
+        if x < pivot:
+            A[lt], A[i] = x, A[lt]
+            lt += 1
+            i += 1
+        elif pivot < x:
+            A[gt], A[i] = x, A[gt]
+            gt -= 1
+        else:
+            i += 1
+    return lt, gt
+
+
+def benchmark(n: int = 5_000, seed: int = 0) -> dict:
+    """
+    Seconds to sort n keys with quick_sort_iterative (A[r] pivot, same partitioning as quick_sort but no recursion
+    limit) vs introsort vs sorted(), over sorted, reversed, all-equal, few-unique and random input.
+    """
+    rng = random.Random(seed)
+    inputs = {
+        "sorted": list(range(n)),
+        "reversed": list(range(n, 0, -1)),
+        "all equal": [7] * n,
+        "few unique": [rng.randrange(4) for _ in range(n)],
+        "random": [rng.random() for _ in range(n)],
+    }
+    sorts = {
+        "quick_sort": lambda A: quick_sort_iterative(A, 0, len(A) - 1),
+        "introsort": introsort,
+        "sorted": lambda A: A.sort(),
+    }
+
+    results = {}
+    for input_name, data in inputs.items():
+        results[input_name] = {}
+        for sort_name, sort in sorts.items():
+            A = list(data)
+            start = time.perf_counter()
+            sort(A)
+            results[input_name][sort_name] = time.perf_counter() - start
+    return results
+
+
 def exchange(A: list, i: int, j: int) -> None:
     """ Exchange A[i] with A[j] """
     tmp = A[i]
@@ -47,6 +202,47 @@ class Test(unittest.TestCase):
         self.assertEqual(t1, [1, 5, 7, 8])
         self.assertEqual(t2, [1, 2, 3, 4, 5, 6, 7, 8, 9, 10])
 
+    def test_quick_sort_iterative(self):
+        t1, t2 = [8, 7, 1, 5], [10, 9, 8, 7, 6, 5, 4, 3, 2, 1]
+
+        quick_sort_iterative(A=t1, p=0, r=len(t1) - 1)
+        quick_sort_iterative(A=t2, p=0, r=len(t2) - 1)
+
+        self.assertEqual(t1, [1, 5, 7, 8])
+        self.assertEqual(t2, [1, 2, 3, 4, 5, 6, 7, 8, 9, 10])
+
+        # Deeper than the default recursion limit
+        t3 = list(range(3000, 0, -1))
+        quick_sort_iterative(A=t3, p=0, r=len(t3) - 1)
+        self.assertEqual(t3, list(range(1, 3001)))
+
+    def test_introsort(self):
+        rng = random.Random(0)
+        cases = [[], [1], [2, 1], list(range(1000)), list(range(1000, 0, -1)), [5] * 1000,
+                 [rng.randrange(3) for _ in range(1000)], [rng.random() for _ in range(1000)]]
+        for A in cases:
+            expected = sorted(A)
+            introsort(A)
+            self.assertEqual(A, expected)
+
+        # Sub-range only
+        A = [9, 8, 7, 6, 5, 4, 3, 2, 1]
+        introsort(A, 2, 6)
+        self.assertEqual(A, [9, 8, 3, 4, 5, 6, 7, 2, 1])
+
+    def test_introsort_heap_sort_fallback(self):
+        # A depth limit of 0 sends the whole range straight to heap_sort
+        A = list(range(200, 0, -1))
+        _introsort(A, 0, len(A) - 1, 0)
+        self.assertEqual(A, list(range(1, 201)))
+
+    def test_partition3(self):
+        A = [3, 1, 3, 5, 3, 0, 9, 3]
+        lt, gt = partition3(A, 0, len(A) - 1, 3)
+        self.assertTrue(all(x < 3 for x in A[:lt]))
+        self.assertEqual(A[lt:gt + 1], [3, 3, 3, 3])
+        self.assertTrue(all(x > 3 for x in A[gt + 1:]))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,281 @@
+import random
+import sys
+import time
+import unittest
+from itertools import chain
+from typing import Any, Callable, Optional
+
+from insertion_sort import binary_insertion_sort
+from merge_sort import merge_sort, merge_sort_adaptive
+from quick_sort import quick_sort
+from stacks import StackArr
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, only lsd_radix_sort_numpy needs it
+    np = None
+
+
+# Every other sort in the repo compares keys, and a comparison sort needs Omega(nlogn) comparisons.
+# The sorts here never compare two keys. They look at the keys' digits instead:
+# - Counting sort: count how often each key occurs, then the prefix sums of the counts are where each key goes.
+#   O(n + k) for keys in a range of size k. Only worth it when k is small (around n or less).
+# - LSD radix sort: stable-sort by the least significant digit, then the next one, ... up to the most significant.
+#   Each pass is a bucket pass over 2^bits buckets. O(d * (n + 2^bits)) for d = key bits / digit bits passes.
+#   8 bit digits: 4 passes for 32-bit keys, 8 for 64-bit. 11 bit digits: 3 passes for 32-bit, 6 for 64-bit.
+# - MSD radix sort: bucket by the first character, then sort each bucket by the next character, and so on.
+#   Suited to strings/bytes: it stops as soon as a bucket is down to one key, it never looks at the rest of the
+#   characters of keys that already differ.
+# All of them are stable.
+
+
+# Time Complexity: O(n + k) where k = max key - min key + 1 | Space: O(n + k)
+def counting_sort(A: list, key: Optional[Callable[[Any], int]] = None) -> None:
+    """ Stable, in-place sort of A by integer keys (the elements themselves by default) """
+    n = len(A)
+    if n < 2:
+        return
+
+    keys = A if key is None else [key(item) for item in A]
+    lo = min(keys)
+    count = [0] * (max(keys) - lo + 1)
+    for k in keys:
+        count[k - lo] += 1
+
+    if key is None:
+        # Equal ints are interchangeable, so write each value out count times
+        A[:] = list(chain.from_iterable([lo + i] * c for i, c in enumerate(count) if c))
+        return
+
+    # CLRS COUNTING-SORT: after the prefix sums, count[k] is the number of keys <= k. Walking the input backwards
+    # places the last of equal keys last, which keeps the sort stable.
+    for i in range(1, len(count)):
+        count[i] += count[i - 1]
+    out = [None] * n
+    for i in range(n - 1, -1, -1):
+        k = keys[i] - lo
+        count[k] -= 1
+        out[count[k]] = A[i]
+    A[:] = out
+
+
+# Time Complexity: O(d * (n + 2^bits)), d = ceil(bits of (max - min) / bits) | Space: O(n + 2^bits)
+def lsd_radix_sort(A: list, bits: int = 8, key: Optional[Callable[[Any], int]] = None) -> None:
+    """
+    Stable, in-place LSD radix sort of A by integer keys, `bits` bits per digit (8 = bytes, 11 = 2048 buckets).
+    Keys are shifted by the minimum first, so negative keys work and narrow ranges take fewer passes.
+    """
+    n = len(A)
+    if n < 2:
+        return
+
+    keys = A if key is None else [key(item) for item in A]
+    lo = min(keys)
+    passes = max(1, -(-(max(keys) - lo).bit_length() // bits))
+    radix = 1 << bits
+    mask = radix - 1
+
+    if key is None:
+        items = [x - lo for x in A]
+        for p in range(passes):
+            shift = p * bits
+            buckets = [[] for _ in range(radix)]
+            appends = [bucket.append for bucket in buckets]
+            for x in items:
+                appends[(x >> shift) & mask](x)
+            items = list(chain.from_iterable(buckets))
+        A[:] = [x + lo for x in items]
+        return
+
+    # With a key function, sort the indices by keys[i] and reorder the elements at the end
+    keys = [k - lo for k in keys]
+    order = range(n)
+    for p in range(passes):
+        shift = p * bits
+        buckets = [[] for _ in range(radix)]
+        appends = [bucket.append for bucket in buckets]
+        for i in order:
+            appends[(keys[i] >> shift) & mask](i)
+        order = list(chain.from_iterable(buckets))
+    A[:] = [A[i] for i in order]
+
+
+MSD_CUTOFF = 16  # Buckets this small are finished with binary insertion sort
+
+
+# Time Complexity: O(total characters examined), at most O(n * key length) | Space: O(n)
+def msd_radix_sort(A: list, key: Optional[Callable[[Any], Any]] = None, cutoff: int = MSD_CUTOFF) -> None:
+    """
+    Stable, in-place MSD radix sort of A by str or bytes keys (the elements themselves by default).
+    Driven by an explicit work stack (StackArr) so long common prefixes can't hit the recursion limit.
+    """
+    n = len(A)
+    if n < 2:
+        return
+
+    keys = A if key is None else [key(item) for item in A]
+    result = []
+    stack = StackArr()
+    stack.push((list(range(n)), 0))  # (indices of a bucket, character position the bucket is split on)
+
+    # Buckets come off the stack in sorted order, so finished buckets are appended to result as they're popped
+    while not stack.is_empty():
+        bucket, d = stack.pop()
+        if len(bucket) <= cutoff:
+            # (key, index) pairs: equal keys are ordered by index, which keeps the sort stable
+            pairs = binary_insertion_sort([(keys[i], i) for i in bucket])
+            result.extend(i for _, i in pairs)
+            continue
+
+        done, buckets = [], {}
+        for i in bucket:
+            k = keys[i]
+            if len(k) == d:
+                done.append(i)  # Key ends here, it sorts before every longer key with the same prefix
+            else:
+                buckets.setdefault(k[d], []).append(i)
+
+        result.extend(done)
+        for c in sorted(buckets, reverse=True):  # Push the biggest character first, so the smallest pops first
+            stack.push((buckets[c], d + 1))
+
+    A[:] = [A[i] for i in result]
+
+
+# NumPy version of the LSD digit passes. Each pass extracts one digit of every key at once, then reorders by it with
+# a stable argsort. For uint8/uint16 digit arrays NumPy's stable sort is itself a counting/radix pass, so every pass
+# is O(n) and runs in C. Signed keys are shifted by the minimum: the subtraction wraps around in int64, but viewed as
+# uint64 it is exactly key - min.
+# Time Complexity: O(d * n) | Space: O(n)
+def lsd_radix_sort_numpy(a, bits: int = 8):
+    """ Return a sorted copy of a 1-D NumPy integer array (or anything np.asarray turns into one) """
+    if np is None:
+        raise ImportError("lsd_radix_sort_numpy needs NumPy")
+    if not 1 <= bits <= 16:
+        raise ValueError("bits must be between 1 and 16")
+
+    a = np.asarray(a)
+    if a.dtype.kind not in "iu":
+        raise TypeError("lsd_radix_sort_numpy sorts integer arrays")
+    if a.size < 2:
+        return a.copy()
+
+    if a.dtype.kind == "u":
+        keys = a.astype(np.uint64) - np.uint64(a.min())
+    else:
+        keys = (a.astype(np.int64) - np.int64(a.min())).view(np.uint64)
+
+    passes = max(1, -(-int(keys.max()).bit_length() // bits))
+    mask = np.uint64((1 << bits) - 1)
+    digit_type = np.uint8 if bits <= 8 else np.uint16
+    order = np.arange(a.size)
+    for p in range(passes):
+        digits = ((keys[order] >> np.uint64(p * bits)) & mask).astype(digit_type)
+        order = order[np.argsort(digits, kind="stable")]
+    return a[order]
+
+
+def benchmark(n: int = 100_000, seed: int = 0) -> dict:
+    """
+    Seconds per sort on n random 32-bit ints, n ints in [0, 256) and n 12 character hex IDs, against quick_sort,
+    merge_sort and sorted(). merge_sort's inf sentinels only compare with numbers, strings use merge_sort_adaptive.
+    """
+    rng = random.Random(seed)
+    inputs = {
+        "32-bit ints": [rng.randrange(-2 ** 31, 2 ** 31) for _ in range(n)],
+        "ints in [0, 256)": [rng.randrange(256) for _ in range(n)],
+        "12 char hex IDs": [rng.randbytes(6).hex() for _ in range(n)],
+    }
+    comparison_sorts = {
+        "quick_sort": lambda A: quick_sort(A, 0, len(A) - 1),
+        "merge_sort": lambda A: merge_sort(A, 0, len(A) - 1) if isinstance(A[0], int) else merge_sort_adaptive(A),
+        "sorted": lambda A: A.sort(),
+    }
+    radix_sorts = {
+        "32-bit ints": {"lsd_radix_sort (8 bit)": lsd_radix_sort,
+                        "lsd_radix_sort (11 bit)": lambda A: lsd_radix_sort(A, bits=11)},
+        "ints in [0, 256)": {"counting_sort": counting_sort, "lsd_radix_sort (8 bit)": lsd_radix_sort},
+        "12 char hex IDs": {"msd_radix_sort": msd_radix_sort},
+    }
+    if np is not None:
+        for name in ("32-bit ints", "ints in [0, 256)"):
+            radix_sorts[name]["lsd_radix_sort_numpy (8 bit)"] = lambda A: lsd_radix_sort_numpy(A)
+            radix_sorts[name]["lsd_radix_sort_numpy (11 bit)"] = lambda A: lsd_radix_sort_numpy(A, bits=11)
+
+    results = {}
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(limit, 10_000))  # quick_sort on 256 distinct values recurses deep
+    try:
+        for input_name, data in inputs.items():
+            results[input_name] = {}
+            for sort_name, sort in {**comparison_sorts, **radix_sorts[input_name]}.items():
+                A = list(data)
+                start = time.perf_counter()
+                sort(A)
+                results[input_name][sort_name] = time.perf_counter() - start
+    finally:
+        sys.setrecursionlimit(limit)
+    return results
+
+
+class Test(unittest.TestCase):
+    def test_counting_sort(self):
+        rng = random.Random(1)
+        A = [rng.randrange(-5, 20) for _ in range(500)]
+        expected = sorted(A)
+        counting_sort(A)
+        self.assertEqual(A, expected)
+
+        # Stable with a key
+        pairs = [(rng.randrange(4), i) for i in range(200)]
+        expected = sorted(pairs, key=lambda p: p[0])
+        counting_sort(pairs, key=lambda p: p[0])
+        self.assertEqual(pairs, expected)
+
+    def test_lsd_radix_sort(self):
+        rng = random.Random(2)
+        for bits in (8, 11):
+            A = [rng.randrange(-2 ** 63, 2 ** 63) for _ in range(1000)]
+            expected = sorted(A)
+            lsd_radix_sort(A, bits=bits)
+            self.assertEqual(A, expected)
+
+        pairs = [(rng.randrange(2 ** 32), i) for i in range(500)] + [(7, -1), (7, -2)]
+        expected = sorted(pairs, key=lambda p: p[0])
+        lsd_radix_sort(pairs, bits=11, key=lambda p: p[0])
+        self.assertEqual(pairs, expected)
+
+        A = [3, 3, 3]
+        lsd_radix_sort(A)
+        self.assertEqual(A, [3, 3, 3])
+
+    def test_msd_radix_sort(self):
+        rng = random.Random(3)
+        words = ["".join(rng.choice("abc") for _ in range(rng.randrange(0, 8))) for _ in range(1000)]
+        expected = sorted(words)
+        msd_radix_sort(words)
+        self.assertEqual(words, expected)
+
+        blobs = [rng.randbytes(rng.randrange(0, 4)) for _ in range(300)]
+        expected = sorted(blobs)
+        msd_radix_sort(blobs, cutoff=2)
+        self.assertEqual(blobs, expected)
+
+        # Stable with a key, and a prefix far longer than the recursion limit
+        records = [("x" * 3000 + "ba"[i % 2], i) for i in range(100)]
+        expected = sorted(records, key=lambda r: r[0])
+        msd_radix_sort(records, key=lambda r: r[0])
+        self.assertEqual(records, expected)
+
+    @unittest.skipIf(np is None, "NumPy not installed")
+    def test_lsd_radix_sort_numpy(self):
+        rng = np.random.default_rng(4)
+        for dtype in (np.int32, np.int64, np.uint64):
+            info = np.iinfo(dtype)
+            a = rng.integers(info.min, info.max, size=2000, dtype=dtype, endpoint=True)
+            for bits in (8, 11):
+                self.assertTrue(np.array_equal(lsd_radix_sort_numpy(a, bits=bits), np.sort(a)))
+
+
+if __name__ == "__main__":
+    unittest.main()
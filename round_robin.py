@@ -0,0 +1,229 @@
+import time
+import unittest
+from typing import Any, Callable, Optional
+
+from linked_lists import CircularLinkedList, Node
+
+
+# Round-robin scheduling on a CircularLinkedList.
+# The cursor is the node BEFORE the current task: a singly linked circle can only unlink a node in O(1) through its
+# predecessor, so keeping the predecessor makes "task finished, remove it" O(1) as well as "advance to the next task".
+
+# Modes:
+# - "rr": Plain round robin, every task gets one turn per round
+# - "weighted": Weighted round robin, a task with weight w gets w consecutive turns per round
+# - "deficit": Deficit round robin (Shreedhar & Varghese). Jobs have different costs (e.g. bytes of a packet, or
+#   estimated run time). Each round a task's deficit counter grows by quantum * weight and the task is served while
+#   its next job's cost fits in the deficit. Unused deficit carries over to the next round, so tasks with big jobs
+#   aren't starved and every task gets its share of the total cost, not just of the turns.
+MODES = ("rr", "weighted", "deficit")
+
+
+class _Entry:
+    __slots__ = ("task", "weight", "turns", "deficit")
+
+    def __init__(self, task: Any, weight: int):
+        self.task = task
+        self.weight = weight
+        self.turns = 0  # Turns left in the current round (rr/weighted)
+        self.deficit = 0.0  # Deficit counter (deficit)
+
+
+class RoundRobinScheduler:
+    def __init__(self, mode: str = "rr", quantum: float = 1.0, cost: Optional[Callable[[Any], float]] = None):
+        """
+        :param mode: "rr", "weighted" or "deficit"
+        :param quantum: Deficit added per round per unit of weight (deficit mode)
+        :param cost: cost(task) -> cost of the task's next job, 0/None if it has nothing to run (deficit mode).
+            Defaults to 1 per job, which makes deficit round robin behave like weighted round robin.
+        """
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}")
+        if quantum <= 0:
+            raise ValueError("quantum must be > 0")
+
+        self.mode = mode
+        self.quantum = quantum
+        self._cost = cost if cost is not None else (lambda task: 1)
+        self._tasks = CircularLinkedList()
+        self._prev = None  # Node before the current task
+        self._fresh = True  # The current task hasn't been served since the cursor moved onto it
+
+    def __len__(self) -> int:
+        return self._tasks.size
+
+    def is_empty(self) -> bool:
+        return self._tasks.size == 0
+
+    @property
+    def current(self) -> Any:
+        """ The task at the cursor (the one the last next() returned, unless it was removed since) """
+        if self._prev is None:
+            raise Exception("Scheduler Underflow")
+        return self._prev.next.data.task
+
+    # O(1)
+    def add(self, task: Any, weight: int = 1, run_next: bool = False) -> Node:
+        """
+        Insert a task at the cursor. By default it goes at the end of the current round (just before the current
+        task), with run_next=True it's scheduled right after the current task.
+        """
+        if weight < 1:
+            raise ValueError("weight must be >= 1")
+
+        entry = _Entry(task, weight)
+        if self._prev is None:
+            self._tasks.insert(entry)
+            self._prev = self._tasks.head
+            self._fresh = True
+            return self._tasks.head
+
+        if run_next:
+            return self._tasks.insert_after(self._prev.next, entry)
+        # Insert between the predecessor and the current task, and make the new node the predecessor
+        node = self._tasks.insert_after(self._prev, entry)
+        self._prev = node
+        return node
+
+    # O(1)
+    def remove_current(self) -> Any:
+        """ Remove the task at the cursor, the cursor moves on to the following task """
+        if self._prev is None:
+            raise Exception("Scheduler Underflow")
+        removed = self._tasks.remove_after(self._prev)
+        if self._tasks.size == 0:
+            self._prev = None
+        self._fresh = True
+        return removed.data.task
+
+    def _advance(self) -> None:
+        self._prev = self._prev.next
+        self._fresh = True
+
+    # O(1) for rr/weighted, O(1) amortized for deficit (when the quantum is at least the typical job cost)
+    def next(self) -> Any:
+        """ Pick the task that runs next. In deficit mode returns None if no task has anything to run """
+        if self._prev is None:
+            raise Exception("Scheduler Underflow")
+        if self.mode == "deficit":
+            return self._next_deficit()
+
+        entry = self._prev.next.data
+        if not self._fresh and entry.turns == 0:
+            self._advance()
+            entry = self._prev.next.data
+        if self._fresh:
+            self._fresh = False
+            entry.turns = entry.weight if self.mode == "weighted" else 1
+        entry.turns -= 1
+        return entry.task
+
+    def _next_deficit(self) -> Any:
+        idle = 0
+        while True:
+            entry = self._prev.next.data
+            if self._fresh:
+                # Start of this task's turn in the round
+                self._fresh = False
+                entry.deficit += self.quantum * entry.weight
+
+            cost = self._cost(entry.task)
+            if not cost:
+                # Nothing queued: an idle task doesn't bank deficit
+                entry.deficit = 0.0
+                idle += 1
+                if idle > self._tasks.size:
+                    return None
+                self._advance()
+                continue
+
+            idle = 0
+            if entry.deficit >= cost:
+                entry.deficit -= cost
+                return entry.task
+            self._advance()
+
+
+def benchmark(n: int = 100_000, decisions: int = 1_000_000) -> dict:
+    """ Scheduling decisions/sec with n active tasks in each mode, plus remove_current + add churn """
+    results = {}
+    for mode in MODES:
+        scheduler = RoundRobinScheduler(mode=mode, quantum=2.0, cost=(lambda task: 1 + task % 3))
+        for i in range(n):
+            scheduler.add(i, weight=1 + i % 4)
+
+        start = time.perf_counter()
+        for _ in range(decisions):
+            scheduler.next()
+        results[f"{mode} decisions/sec"] = decisions / (time.perf_counter() - start)
+
+    scheduler = RoundRobinScheduler()
+    for i in range(n):
+        scheduler.add(i)
+    start = time.perf_counter()
+    for i in range(decisions):
+        scheduler.next()
+        if i % 2:
+            scheduler.add(scheduler.remove_current())
+    results["rr decisions/sec with remove/add churn"] = decisions / (time.perf_counter() - start)
+    return results
+
+
+class Test(unittest.TestCase):
+    def test_round_robin(self):
+        s = RoundRobinScheduler()
+        for task in "abc":
+            s.add(task)
+        self.assertEqual([s.next() for _ in range(7)], list("abcabca"))
+
+        # Remove the task that just ran (a), the cursor moves on to b
+        self.assertEqual(s.remove_current(), "a")
+        self.assertEqual([s.next() for _ in range(4)], list("bcbc"))
+
+        s.add("d")  # End of the round, just before the current task (c)
+        self.assertEqual([s.next() for _ in range(4)], list("bdcb"))
+        s.add("e", run_next=True)
+        self.assertEqual([s.next() for _ in range(4)], list("edcb"))
+
+        while not s.is_empty():
+            s.remove_current()
+        with self.assertRaises(Exception):
+            s.next()
+
+    def test_weighted(self):
+        s = RoundRobinScheduler(mode="weighted")
+        s.add("a", weight=3)
+        s.add("b", weight=1)
+        s.add("c", weight=2)
+        self.assertEqual("".join(s.next() for _ in range(12)), "aaabccaaabcc")
+
+    def test_deficit(self):
+        # a sends jobs of cost 3, b of cost 1. With a quantum of 2 both get the same total cost over time.
+        costs = {"a": 3, "b": 1}
+        s = RoundRobinScheduler(mode="deficit", quantum=2, cost=costs.get)
+        s.add("a")
+        s.add("b")
+        served = {"a": 0, "b": 0}
+        for _ in range(400):
+            task = s.next()
+            served[task] += costs[task]
+        self.assertLessEqual(abs(served["a"] - served["b"]), 4)
+
+    def test_deficit_idle_tasks(self):
+        backlog = {"a": 0, "b": 2}
+
+        def cost(task):
+            return 1 if backlog[task] else 0
+
+        s = RoundRobinScheduler(mode="deficit", cost=cost)
+        s.add("a")
+        s.add("b")
+        for _ in range(2):
+            task = s.next()
+            self.assertEqual(task, "b")
+            backlog[task] -= 1
+        self.assertIsNone(s.next())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,268 @@
+import random
+import time
+import unittest
+from bisect import bisect_left, bisect_right
+from typing import Any, Iterable, Optional
+
+from insertion_sort import binary_insertion_sort
+from quick_sort import exchange, introsort, partition, partition3, quick_sort
+from stacks import StackArr
+
+
+# Selection: find the k'th smallest key without sorting everything.
+# After partition(A, p, r) the pivot is at its final sorted position q. If k == q we're done, otherwise the k'th key
+# is on one side and the other side can be ignored. Unlike quick_sort we only follow ONE side, so with random
+# pivots the expected work is n + n/2 + n/4 + ... = O(N).
+# Bad pivots can still make it O(n^2). Introselect: if the partitions have already touched more than
+# _WORK_FACTOR * n elements, switch to median-of-medians pivots, which are guaranteed to leave at most ~7n/10 keys
+# on either side, so the rest of the search is O(N) worst case.
+# Median-of-medians pivots are partitioned with partition3 (3-way): with partition, a run of keys equal to the pivot
+# all land on one side and a range of equal keys only shrinks by one per pass.
+
+SELECT_CUTOFF = 16  # Ranges this small are finished with binary insertion sort
+_WORK_FACTOR = 8
+
+
+def _check_rank(k: int, p: int, r: int) -> None:
+    if not p <= k <= r:
+        raise IndexError("rank out of range")
+
+
+def _median_of_medians(A: list, p: int, r: int) -> Any:
+    """ Median of the medians of groups of 5 from A[p..r] (A is left unchanged). Guaranteed O(N) """
+    medians = []
+    for i in range(p, r + 1, 5):
+        group = binary_insertion_sort(A[i:min(i + 5, r + 1)])
+        medians.append(group[(len(group) - 1) // 2])
+    return _select(medians, (len(medians) - 1) // 2, 0, len(medians) - 1, None, guaranteed=True)
+
+
+def _select(A: list, k: int, p: int, r: int, rng: Optional[random.Random], guaranteed: bool = False) -> Any:
+    work_limit = _WORK_FACTOR * (r - p + 1)
+    work = 0
+    randint = (rng or random).randint
+
+    while r - p + 1 > SELECT_CUTOFF:
+        if not guaranteed and work > work_limit:
+            guaranteed = True
+        work += r - p + 1
+
+        if not guaranteed:
+            exchange(A, randint(p, r), r)  # Random pivot, partition uses A[r]
+            q = partition(A, p, r)
+            if k == q:
+                return A[k]
+            if k < q:
+                r = q - 1
+            else:
+                p = q + 1
+            continue
+
+        lt, gt = partition3(A, p, r, _median_of_medians(A, p, r))
+        if k < lt:
+            r = lt - 1
+        elif k > gt:
+            p = gt + 1
+        else:
+            return A[k]
+
+    binary_insertion_sort(A, p, r + 1)
+    return A[k]
+
+
+# Time Complexity: O(N) expected and worst case | Space: O(N/5) for the median-of-medians fallback
+def quickselect(A: list, k: int, p: int = 0, r: Optional[int] = None, rng: Optional[random.Random] = None) -> Any:
+    """
+    Return the k'th smallest key of A[p..r] (k is an index into A, 0 based, p <= k <= r).
+    A[p..r] is rearranged like nth_element: A[k] holds that key, keys before it are <= it and keys after it >= it.
+    """
+    if r is None:
+        r = len(A) - 1
+    _check_rank(k, p, r)
+    return _select(A, k, p, r, rng)
+
+
+def nth_element(A: list, k: int, p: int = 0, r: Optional[int] = None, rng: Optional[random.Random] = None) -> None:
+    """ Like C++ std::nth_element: rearrange A[p..r] so A[k] is what it would be if A[p..r] were sorted """
+    quickselect(A, k, p, r, rng)
+
+
+# Time Complexity: O(n + klogk) | Space: O(logk)
+def partial_sort(A: list, k: int, p: int = 0, r: Optional[int] = None, rng: Optional[random.Random] = None) -> None:
+    """ Put the k smallest keys of A[p..r] in sorted order in A[p..p+k-1], the rest in A[p+k..r] in any order """
+    if r is None:
+        r = len(A) - 1
+    if k <= 0:
+        return
+    k = min(k, r - p + 1)
+    quickselect(A, p + k - 1, p, r, rng)
+    introsort(A, p, p + k - 2)  # A[p + k - 1] is already in place
+
+
+def top_k(data: Iterable, k: int, largest: bool = True, rng: Optional[random.Random] = None) -> list:
+    """ The k largest (or smallest) keys, largest (smallest) first. data is left unchanged. O(n + klogk) """
+    A = list(data)
+    k = min(k, len(A))
+    if k <= 0:
+        return []
+    if not largest:
+        partial_sort(A, k, rng=rng)
+        return A[:k]
+
+    n = len(A)
+    quickselect(A, n - k, rng=rng)
+    introsort(A, n - k + 1, n - 1)
+    return A[n - k:][::-1]
+
+
+# Multi-select: several ranks with one partitioning pass per level, instead of one quickselect per rank.
+# Each work item is a range A[p..r] plus the sorted ranks that fall inside it. After a 3-way partition, ranks inside
+# the pivot's block [lt..gt] are done, and a side is only partitioned further if some rank falls in it.
+# With m ranks that's O(nlogm) expected (O(N) for a handful of quantiles), vs O(nlogn) for a full sort.
+# Time Complexity: O(nlogm) expected, O(nlogm) worst case with the median-of-medians fallback | Space: O(N/5 + logn)
+def select_many(A: list, ranks: Iterable[int], p: int = 0, r: Optional[int] = None,
+                rng: Optional[random.Random] = None) -> list:
+    """ Rearrange A[p..r] so every rank in ranks is at its sorted position, return [A[k] for k in ranks] """
+    if r is None:
+        r = len(A) - 1
+    ranks = list(ranks)
+    targets = sorted(set(ranks))
+    for k in targets:
+        _check_rank(k, p, r)
+
+    randint = (rng or random).randint
+    stack = StackArr()
+    # (p, r, targets[i:j] are the ranks in A[p..r], partitions left before switching to median-of-medians pivots)
+    stack.push((p, r, 0, len(targets), 2 * (r - p + 1).bit_length()))
+    while not stack.is_empty():
+        p, r, i, j, depth = stack.pop()
+        if i == j:
+            continue
+        if r - p + 1 <= SELECT_CUTOFF:
+            binary_insertion_sort(A, p, r + 1)
+            continue
+
+        pivot = A[randint(p, r)] if depth > 0 else _median_of_medians(A, p, r)
+        lt, gt = partition3(A, p, r, pivot)
+        stack.push((p, lt - 1, i, bisect_left(targets, lt, i, j), depth - 1))
+        stack.push((gt + 1, r, bisect_right(targets, gt, i, j), j, depth - 1))
+
+    return [A[k] for k in ranks]
+
+
+def quantiles(data: Iterable, qs: Iterable[float], rng: Optional[random.Random] = None) -> list:
+    """
+    Values at fractions qs (0 <= q <= 1) of numeric data, interpolating linearly between the two nearest ranks
+    (the same definition as numpy.quantile's default). data is left unchanged.
+    """
+    A = list(data)
+    if not A:
+        raise ValueError("quantiles of empty data")
+    qs = list(qs)
+    positions = []
+    for q in qs:
+        if not 0 <= q <= 1:
+            raise ValueError("quantile must be between 0 and 1")
+        positions.append(q * (len(A) - 1))
+
+    # Only the lower ranks need selecting. Afterwards A is partitioned around every one of them, so the key at lo + 1
+    # is the smallest key between lo and the next selected rank: one min() over that slice.
+    lower = [int(pos) for pos in positions]
+    values = dict(zip(lower, select_many(A, lower, rng=rng)))
+    selected = sorted(values) + [len(A) - 1]
+    result = []
+    for pos, lo in zip(positions, lower):
+        if pos == lo:
+            result.append(values[lo])
+            continue
+        next_rank = selected[bisect_right(selected, lo)]
+        result.append(values[lo] + (min(A[lo + 1:next_rank + 1]) - values[lo]) * (pos - lo))
+    return result
+
+
+def median(data: Iterable, rng: Optional[random.Random] = None) -> Any:
+    """ Median of numeric data (mean of the two middle keys for an even count), O(N) """
+    return quantiles(data, [0.5], rng)[0]
+
+
+def benchmark(n: int = 200_000, seed: int = 0) -> dict:
+    """ Seconds for the median and for 5 percentiles of n random floats: full quick_sort vs selection vs sorted() """
+    rng = random.Random(seed)
+    data = [rng.random() for _ in range(n)]
+    percentiles = [0.01, 0.25, 0.5, 0.75, 0.99]
+
+    def timed(fn) -> float:
+        A = list(data)
+        start = time.perf_counter()
+        fn(A)
+        return time.perf_counter() - start
+
+    return {
+        "quick_sort (full sort)": timed(lambda A: quick_sort(A, 0, len(A) - 1)),
+        "sorted() (full sort)": timed(lambda A: A.sort()),
+        "quickselect median": timed(lambda A: quickselect(A, len(A) // 2, rng=rng)),
+        "select_many 5 percentiles": timed(lambda A: quantiles(A, percentiles, rng=rng)),
+        "5 x quickselect percentiles": timed(lambda A: [quickselect(A, int(q * (len(A) - 1)), rng=rng)
+                                                         for q in percentiles]),
+        "partial_sort k=100": timed(lambda A: partial_sort(A, 100, rng=rng)),
+    }
+
+
+class Test(unittest.TestCase):
+    def test_quickselect(self):
+        rng = random.Random(1)
+        for data in ([rng.random() for _ in range(500)], [rng.randrange(5) for _ in range(500)], [7] * 500,
+                     list(range(500)), list(range(500, 0, -1)), [3]):
+            expected = sorted(data)
+            for k in (0, len(data) // 3, len(data) - 1):
+                A = list(data)
+                self.assertEqual(quickselect(A, k, rng=rng), expected[k])
+                self.assertTrue(all(x <= A[k] for x in A[:k]))
+                self.assertTrue(all(x >= A[k] for x in A[k + 1:]))
+                self.assertEqual(sorted(A), expected)
+
+        with self.assertRaises(IndexError):
+            quickselect([1, 2], 2)
+
+    def test_guaranteed_fallback(self):
+        # Start straight on median-of-medians pivots
+        rng = random.Random(2)
+        data = [rng.randrange(100) for _ in range(2000)]
+        expected = sorted(data)
+        for k in (0, 999, 1999):
+            A = list(data)
+            self.assertEqual(_select(A, k, 0, len(A) - 1, rng, guaranteed=True), expected[k])
+
+    def test_partial_sort_and_top_k(self):
+        rng = random.Random(3)
+        data = [rng.randrange(1000) for _ in range(300)]
+        A = list(data)
+        partial_sort(A, 20, rng=rng)
+        self.assertEqual(A[:20], sorted(data)[:20])
+        self.assertEqual(sorted(A), sorted(data))
+
+        self.assertEqual(top_k(data, 5, rng=rng), sorted(data, reverse=True)[:5])
+        self.assertEqual(top_k(data, 5, largest=False, rng=rng), sorted(data)[:5])
+        self.assertEqual(top_k(data, 1000), sorted(data, reverse=True))
+        self.assertEqual(top_k([], 3), [])
+
+    def test_select_many_and_quantiles(self):
+        rng = random.Random(4)
+        data = [rng.randrange(50) for _ in range(1000)]
+        expected = sorted(data)
+        ranks = [999, 0, 500, 500, 250, 17]
+        A = list(data)
+        self.assertEqual(select_many(A, ranks, rng=rng), [expected[k] for k in ranks])
+        for k in ranks:
+            self.assertEqual(A[k], expected[k])
+
+        self.assertEqual(median([5, 1, 3]), 3)
+        self.assertEqual(median([4, 1, 3, 2]), 2.5)
+        self.assertEqual(quantiles(range(101), [0, 0.1, 0.5, 1]), [0, 10, 50, 100])
+        self.assertEqual(quantiles([1, 2], [0.25]), [1.25])
+        with self.assertRaises(ValueError):
+            quantiles([], [0.5])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,320 @@
+import bisect
+import random
+import time
+import unittest
+from typing import Any, Iterator, List, Optional, Tuple
+
+
+# SinglyLinkedList.search is an O(N) scan: each node only knows the next node.
+# A skip list adds "express lanes" on top of a sorted linked list:
+# - Level 0 is a sorted linked list of every key
+# - Each node is promoted to the next level up with probability p (1/2 here), so level i holds ~n/2^i nodes
+# - A search starts at the top level of the head, moves right while the next key is smaller, then drops down a level
+# This gives O(logn) expected search/insert/delete, the same bounds as a balanced BST, without any rebalancing.
+
+# Each forward pointer also stores its "width" (number of level-0 nodes it skips over). Summing widths along the
+# search path gives the rank of a key, and walking by width finds the node at a given rank (select), both O(logn).
+
+_MAX_LEVEL = 32
+
+
+class _SkipNode:
+    __slots__ = ("key", "value", "next", "width")
+
+    def __init__(self, key: Any, value: Any, level: int):
+        self.key = key
+        self.value = value
+        self.next = [None] * level  # next[i] is the successor at level i
+        self.width = [1] * level  # width[i] is how many level-0 steps next[i] covers
+
+
+class SkipList:
+    """ Ordered map backed by a skip list """
+
+    def __init__(self, p: float = 0.5, seed: Optional[int] = None, max_level: int = _MAX_LEVEL):
+        """
+        :param p: Probability of promoting a node one level up
+        :param seed: Seed for the level generator, the same seed and operations always build the same skip list
+        """
+        self._p = p
+        self._max_level = max_level
+        self._random = random.Random(seed)
+        self._head = _SkipNode(None, None, max_level)
+        self._level = 1
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, key: Any) -> bool:
+        return self._find(key) is not None
+
+    def __iter__(self) -> Iterator[Any]:
+        for key, _ in self.items():
+            yield key
+
+    def __getitem__(self, key: Any) -> Any:
+        node = self._find(key)
+        if node is None:
+            raise KeyError(key)
+        return node.value
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        self.insert(key, value)
+
+    def __delitem__(self, key: Any) -> None:
+        if not self.delete(key):
+            raise KeyError(key)
+
+    def _random_level(self) -> int:
+        level = 1
+        while level < self._max_level and self._random.random() < self._p:
+            level += 1
+        return level
+
+    def _search_path(self, key: Any) -> Tuple[List[_SkipNode], List[int]]:
+        """
+        For each level, the last node whose key is < key, and the rank (1-based level-0 position) of that node.
+        The head has rank 0.
+        """
+        update = [self._head] * self._max_level
+        ranks = [0] * self._max_level
+        node, rank = self._head, 0
+        for level in range(self._level - 1, -1, -1):
+            while node.next[level] is not None and node.next[level].key < key:
+                rank += node.width[level]
+                node = node.next[level]
+            update[level] = node
+            ranks[level] = rank
+        return update, ranks
+
+    def _find(self, key: Any) -> Optional[_SkipNode]:
+        node = self._head
+        for level in range(self._level - 1, -1, -1):
+            while node.next[level] is not None and node.next[level].key < key:
+                node = node.next[level]
+        node = node.next[0]
+        if node is not None and node.key == key:
+            return node
+        return None
+
+    # O(logn) expected
+    def search(self, key: Any, default: Any = None) -> Any:
+        node = self._find(key)
+        return default if node is None else node.value
+
+    # O(logn) expected
+    def insert(self, key: Any, value: Any = None) -> None:
+        """ Insert the key, or overwrite its value if it already exists """
+        update, ranks = self._search_path(key)
+        existing = update[0].next[0]
+        if existing is not None and existing.key == key:
+            existing.value = value
+            return
+
+        level = self._random_level()
+        if level > self._level:
+            for i in range(self._level, level):
+                update[i] = self._head
+                ranks[i] = 0
+                self._head.width[i] = self._size + 1  # Head pointer at a new level spans the whole list (to None)
+            self._level = level
+
+        node = _SkipNode(key, value, level)
+        rank = ranks[0] + 1  # Rank of the new node
+        for i in range(level):
+            prev = update[i]
+            node.next[i] = prev.next[i]
+            prev.next[i] = node
+            # prev -> node covers (rank - ranks[i]) steps, node -> old successor covers the rest (+1 for the new node)
+            node.width[i] = prev.width[i] - (rank - ranks[i]) + 1
+            prev.width[i] = rank - ranks[i]
+
+        # Levels above the new node's height now skip over one more node
+        for i in range(level, self._level):
+            update[i].width[i] += 1
+        self._size += 1
+
+    # O(logn) expected
+    def delete(self, key: Any) -> bool:
+        """ Remove the key, return False if it wasn't there """
+        update, _ = self._search_path(key)
+        node = update[0].next[0]
+        if node is None or node.key != key:
+            return False
+
+        for i in range(self._level):
+            if update[i].next[i] is node:
+                update[i].width[i] += node.width[i] - 1
+                update[i].next[i] = node.next[i]
+            else:
+                update[i].width[i] -= 1
+
+        while self._level > 1 and self._head.next[self._level - 1] is None:
+            self._level -= 1
+        self._size -= 1
+        return True
+
+    # O(logn) expected
+    def rank(self, key: Any) -> int:
+        """ Number of keys strictly smaller than key (the 0-based index key has, or would have, in sorted order) """
+        _, ranks = self._search_path(key)
+        return ranks[0]
+
+    # O(logn) expected
+    def select(self, index: int) -> Tuple[Any, Any]:
+        """ Return the (key, value) pair at 0-based index in sorted order """
+        if not 0 <= index < self._size:
+            raise IndexError("skip list index out of range")
+
+        target = index + 1  # Ranks are 1-based, the head is rank 0
+        node, rank = self._head, 0
+        for level in range(self._level - 1, -1, -1):
+            while node.next[level] is not None and rank + node.width[level] <= target:
+                rank += node.width[level]
+                node = node.next[level]
+            if rank == target:
+                break
+        return node.key, node.value
+
+    # O(logn) expected
+    def floor(self, key: Any) -> Optional[Tuple[Any, Any]]:
+        """ Largest (key, value) with key <= the given key, None if there isn't one """
+        update, _ = self._search_path(key)
+        successor = update[0].next[0]
+        if successor is not None and successor.key == key:
+            return successor.key, successor.value
+        if update[0] is self._head:
+            return None
+        return update[0].key, update[0].value
+
+    # O(logn) expected
+    def ceiling(self, key: Any) -> Optional[Tuple[Any, Any]]:
+        """ Smallest (key, value) with key >= the given key, None if there isn't one """
+        update, _ = self._search_path(key)
+        successor = update[0].next[0]
+        if successor is None:
+            return None
+        return successor.key, successor.value
+
+    # O(logn + k) expected - Where k is the number of items in the range
+    def items(self, lo: Any = None, hi: Any = None) -> Iterator[Tuple[Any, Any]]:
+        """ Iterate over (key, value) pairs with lo <= key < hi in sorted order (None means unbounded) """
+        if lo is None:
+            node = self._head.next[0]
+        else:
+            update, _ = self._search_path(lo)
+            node = update[0].next[0]
+
+        while node is not None and (hi is None or node.key < hi):
+            yield node.key, node.value
+            node = node.next[0]
+
+
+def benchmark(n: int = 50_000, query_ratio: float = 0.8, seed: int = 0) -> dict:
+    """
+    Mixed insert/query workload (query_ratio of the operations are lookups), ops/sec for SkipList vs bisect.insort on
+    a sorted list. bisect finds positions in O(logn) but each insort shifts the list, O(n) per insert.
+    """
+    rng = random.Random(seed)
+    ops = [(rng.random() < query_ratio, rng.randrange(n * 10)) for _ in range(n)]
+
+    start = time.perf_counter()
+    skip_list = SkipList(seed=seed)
+    for is_query, key in ops:
+        if is_query:
+            skip_list.search(key)
+        else:
+            skip_list.insert(key, key)
+    skip_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    keys = []
+    values = {}
+    for is_query, key in ops:
+        if is_query:
+            i = bisect.bisect_left(keys, key)
+            if i < len(keys) and keys[i] == key:
+                values[key]
+        else:
+            i = bisect.bisect_left(keys, key)
+            if i == len(keys) or keys[i] != key:
+                keys.insert(i, key)
+            values[key] = key
+    bisect_elapsed = time.perf_counter() - start
+
+    return {"SkipList ops/sec": n / skip_elapsed, "bisect sorted list ops/sec": n / bisect_elapsed}
+
+
+class Test(unittest.TestCase):
+    def test_insert_search_delete(self):
+        s = SkipList(seed=1)
+        for key in [5, 1, 9, 3, 7]:
+            s.insert(key, str(key))
+        self.assertEqual(len(s), 5)
+        self.assertEqual(list(s), [1, 3, 5, 7, 9])
+        self.assertEqual(s.search(7), "7")
+        self.assertIsNone(s.search(4))
+
+        s[7] = "seven"
+        self.assertEqual(s[7], "seven")
+        self.assertEqual(len(s), 5)
+
+        self.assertTrue(s.delete(5))
+        self.assertFalse(s.delete(5))
+        self.assertNotIn(5, s)
+        with self.assertRaises(KeyError):
+            del s[5]
+        self.assertEqual(list(s), [1, 3, 7, 9])
+
+    def test_range_floor_ceiling(self):
+        s = SkipList(seed=2)
+        for key in range(0, 100, 10):
+            s.insert(key, key)
+
+        self.assertEqual([k for k, _ in s.items(25, 60)], [30, 40, 50])
+        self.assertEqual([k for k, _ in s.items(hi=20)], [0, 10])
+        self.assertEqual(s.floor(35), (30, 30))
+        self.assertEqual(s.floor(30), (30, 30))
+        self.assertIsNone(s.floor(-1))
+        self.assertEqual(s.ceiling(35), (40, 40))
+        self.assertIsNone(s.ceiling(91))
+
+    def test_rank_select_against_sorted_list(self):
+        rng = random.Random(3)
+        s = SkipList(seed=3)
+        reference = set()
+        for _ in range(2000):
+            key = rng.randrange(500)
+            if rng.random() < 0.3:
+                s.delete(key)
+                reference.discard(key)
+            else:
+                s.insert(key, key)
+                reference.add(key)
+
+        expected = sorted(reference)
+        self.assertEqual(list(s), expected)
+        for i, key in enumerate(expected):
+            self.assertEqual(s.select(i), (key, key))
+            self.assertEqual(s.rank(key), i)
+        self.assertEqual(s.rank(1000), len(expected))
+        with self.assertRaises(IndexError):
+            s.select(len(expected))
+
+    def test_seed_is_reproducible(self):
+        def levels(seed):
+            s = SkipList(seed=seed)
+            for key in range(200):
+                s.insert(key)
+            node, out = s._head.next[0], []
+            while node is not None:
+                out.append(len(node.next))
+                node = node.next[0]
+            return out
+
+        self.assertEqual(levels(42), levels(42))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,426 @@
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import unittest
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from insertion_sort import binary_insertion_sort
+from merge_sort import merge_sort_adaptive
+from quick_sort import introsort
+from radix_sort import counting_sort, lsd_radix_sort, msd_radix_sort
+
+
+# One front end for the repo's sorts: sort(data, key=None, stable=False) looks at the input and hands it to the
+# engine that's fastest for that kind of input.
+# Profile (a sample, so it costs far less than the sort):
+# - n
+# - Key type: ints can use counting/radix sort, str/bytes MSD radix sort, anything else needs a comparison sort
+# - For ints, the key range (min/max run in C, so it's cheap to get exactly)
+# - Presortedness: fraction of adjacent pairs that break the ascending (or descending) order in sampled windows
+# - Duplicate ratio: fraction of sampled keys that repeat a key already in the sample
+# Engines, in the order the rules try them:
+#   n <= insertion_max               -> binary_insertion_sort
+#   presorted (few breaks)           -> merge_sort_adaptive (finds the runs, O(N) on sorted input)
+#   int keys, range <= factor * n    -> counting_sort
+#   few unique keys, not stable      -> introsort (3-way partitioning: O(Nlogk) for k distinct keys)
+#   int keys, n >= radix_min_n       -> lsd_radix_sort
+#   str/bytes keys, n >= msd_min_n   -> msd_radix_sort
+#   stable                           -> merge_sort_adaptive
+#   otherwise                        -> introsort, or merge_sort_adaptive if that calibrated faster
+# heap_sort and the CLRS merge_sort/quick_sort are never picked: on this interpreter they lose to the engines above
+# on every input (merge_sort's inf sentinels also restrict it to numbers).
+# The crossover points depend on the machine and interpreter. `python sorting.py calibrate` measures them and stores
+# them in sort_thresholds.json (or $SORT_THRESHOLDS), which sort() loads on first use.
+
+# Defaults: calibrate() on a CPython 3.11 x86-64 box
+DEFAULT_THRESHOLDS = {
+    "insertion_max": 256,
+    "presorted_max_breaks": 0.25,
+    "counting_range_factor": 1.0,
+    "duplicates_min_ratio": 0.5,  # None: 3-way partitioning never wins on duplicates alone
+    "radix_min_n": 257,
+    "msd_min_n": 1024,  # None: MSD radix sort never beats the comparison engine
+    "prefer_introsort": True,
+}
+THRESHOLDS_PATH = os.environ.get("SORT_THRESHOLDS",
+                                 os.path.join(os.path.dirname(os.path.abspath(__file__)), "sort_thresholds.json"))
+
+_WINDOWS = 32  # Presortedness is sampled in this many windows
+_WINDOW = 32  # of this many adjacent elements
+_thresholds = None
+
+
+def load_thresholds(path: Optional[str] = None) -> dict:
+    """ Calibrated thresholds from path (default THRESHOLDS_PATH), the defaults for anything not calibrated """
+    thresholds = dict(DEFAULT_THRESHOLDS)
+    try:
+        with open(path or THRESHOLDS_PATH) as f:
+            stored = json.load(f)
+    except FileNotFoundError:
+        return thresholds
+    thresholds.update((name, value) for name, value in stored.get("thresholds", {}).items()
+                      if name in DEFAULT_THRESHOLDS)
+    return thresholds
+
+
+def _get_thresholds() -> dict:
+    global _thresholds
+    if _thresholds is None:
+        _thresholds = load_thresholds()
+    return _thresholds
+
+
+# === Profile ===
+
+def _key_type(keys: list, n: int) -> str:
+    """ "int", "str", "bytes" or "other", from a sample of the keys """
+    step = max(1, n // 64)
+    types = {type(keys[i]) for i in range(0, n, step)}
+    if len(types) != 1:
+        return "other"
+    t = types.pop()
+    return {int: "int", str: "str", bytes: "bytes"}.get(t, "other")
+
+
+def presortedness(keys: list) -> float:
+    """
+    Fraction of sampled adjacent pairs out of order: ~0.5 for random input, 0 for sorted OR reversed input
+    (merge_sort_adaptive reverses descending runs, so both are cheap for it).
+    """
+    n = len(keys)
+    if n < 2:
+        return 0.0
+    if n <= _WINDOWS * _WINDOW:
+        starts, width = [0], n
+    else:
+        stride = (n - _WINDOW) // (_WINDOWS - 1)
+        starts, width = [i * stride for i in range(_WINDOWS)], _WINDOW
+
+    ascending_breaks = descending_breaks = pairs = 0
+    for start in starts:
+        for i in range(start, start + width - 1):
+            a, b = keys[i], keys[i + 1]
+            if b < a:
+                ascending_breaks += 1
+            elif a < b:
+                descending_breaks += 1
+        pairs += width - 1
+    return min(ascending_breaks, descending_breaks) / pairs
+
+
+def duplicate_ratio(keys: list) -> float:
+    """ Fraction of an evenly spaced sample of the keys that repeat an earlier key in the sample: 0 if all distinct """
+    n = len(keys)
+    if n < 2:
+        return 0.0
+    step = max(1, n // (_WINDOWS * _WINDOW))
+    sample = keys[::step]
+    try:
+        return 1 - len(set(sample)) / len(sample)
+    except TypeError:  # Unhashable keys
+        return 0.0
+
+
+def _plan(data: list, key: Optional[Callable], stable: bool, thresholds: Optional[dict]) -> Tuple[str, list]:
+    """ (engine name, keys). keys is [key(item) for item in data], computed here once, or data itself without a key """
+    t = thresholds or _get_thresholds()
+    n = len(data)
+    keys = data if key is None else [key(item) for item in data]
+    return _engine_for(keys, n, stable, t), keys
+
+
+def _engine_for(keys: list, n: int, stable: bool, t: dict) -> str:
+    if n <= t["insertion_max"]:
+        return "binary_insertion_sort"
+
+    if presortedness(keys) <= t["presorted_max_breaks"]:
+        return "merge_sort_adaptive"
+
+    key_type = _key_type(keys, n)
+    ints = key_type == "int" and all(type(k) is int for k in keys)
+    if ints and max(keys) - min(keys) + 1 <= t["counting_range_factor"] * n:
+        return "counting_sort"
+
+    if not stable and t["duplicates_min_ratio"] is not None and duplicate_ratio(keys) >= t["duplicates_min_ratio"]:
+        return "introsort"
+
+    if ints:
+        if n >= t["radix_min_n"]:
+            return "lsd_radix_sort"
+    elif key_type in ("str", "bytes") and t["msd_min_n"] is not None and n >= t["msd_min_n"]:
+        if all(type(k) is type(keys[0]) for k in keys):
+            return "msd_radix_sort"
+
+    if stable or not t["prefer_introsort"]:
+        return "merge_sort_adaptive"
+    return "introsort"
+
+
+def choose_engine(data: list, key: Optional[Callable] = None, stable: bool = False,
+                  thresholds: Optional[dict] = None) -> str:
+    """ Name of the engine sort() would use for this input (a key of ENGINES) """
+    return _plan(data, key, stable, thresholds)[0]
+
+
+# The engines get the keys computed while profiling, not the key function, so key() runs once per element in total.
+def _decorated(engine: Callable[[list], Any]) -> Callable[[list, Optional[list]], None]:
+    """ Sort by precomputed keys with an engine that has no key=: sort (key, index) pairs (also stable) """
+    def run(A: list, keys: Optional[list] = None) -> None:
+        if keys is None:
+            engine(A)
+            return
+        decorated = list(zip(keys, range(len(A))))
+        engine(decorated)
+        A[:] = [A[i] for _, i in decorated]
+    return run
+
+
+def _by_index(engine: Callable[..., Any]) -> Callable[[list, Optional[list]], None]:
+    """ Sort by precomputed keys with an engine that has key=: sort the indices, looking their keys up in keys """
+    def run(A: list, keys: Optional[list] = None) -> None:
+        if keys is None:
+            engine(A)
+            return
+        order = list(range(len(A)))
+        engine(order, key=keys.__getitem__)
+        A[:] = [A[i] for i in order]
+    return run
+
+
+# Every engine as run(A, keys) -> None, sorting A in place. keys: key(item) for every item of A, None to sort the items
+ENGINES: Dict[str, Callable[[list, Optional[list]], None]] = {
+    "binary_insertion_sort": _decorated(binary_insertion_sort),
+    "introsort": _decorated(introsort),
+    "merge_sort_adaptive": _decorated(merge_sort_adaptive),
+    "counting_sort": _by_index(counting_sort),
+    "lsd_radix_sort": _by_index(lsd_radix_sort),
+    "msd_radix_sort": _by_index(msd_radix_sort),
+}
+
+
+def sort(data: list, key: Optional[Callable] = None, stable: bool = False) -> None:
+    """
+    Sort the list in place with whichever engine suits the input best.
+
+    :param key: Sort by key(element), like list.sort(key=...). Called once per element
+    :param stable: Equal keys must keep their order. Every engine except introsort is stable anyway
+    """
+    engine, keys = _plan(data, key, stable, None)
+    ENGINES[engine](data, None if key is None else keys)
+
+
+# === Calibration ===
+
+def _best_time(engine: str, data: list, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        A = list(data)
+        start = time.perf_counter()
+        ENGINES[engine](A)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _best_batch_time(engine: str, batch: List[list], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        copies = [list(data) for data in batch]
+        start = time.perf_counter()
+        for A in copies:
+            ENGINES[engine](A)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _swapped(n: int, swaps: int, rng: random.Random) -> List[int]:
+    """ Sorted 0..n-1 with `swaps` random pairs exchanged """
+    A = list(range(n))
+    for _ in range(swaps):
+        i, j = rng.randrange(n), rng.randrange(n)
+        A[i], A[j] = A[j], A[i]
+    return A
+
+
+def _last_win(candidates: list, wins: Callable[[Any], bool]) -> Any:
+    """
+    Largest candidate (in increasing order) that wins, scanning until two losses in a row.
+    One noisy timing can't end the scan early. Returns None if nothing wins.
+    """
+    last, losses = None, 0
+    for candidate in candidates:
+        if wins(candidate):
+            last, losses = candidate, 0
+        else:
+            losses += 1
+            if losses == 2:
+                break
+    return last
+
+
+def calibrate(path: Optional[str] = None, n: int = 20_000, repeat: int = 5, seed: int = 0) -> dict:
+    """
+    Measure the crossover points on this machine, store them in path (default THRESHOLDS_PATH) and make sort()
+    use them. Takes a few seconds with the defaults.
+    """
+    global _thresholds
+    rng = random.Random(seed)
+    t = dict(DEFAULT_THRESHOLDS)
+
+    # Unstable comparison engine: introsort vs merge_sort_adaptive on random input
+    floats = [rng.random() for _ in range(n)]
+    t["prefer_introsort"] = _best_time("introsort", floats, repeat) < _best_time("merge_sort_adaptive", floats,
+                                                                                 repeat)
+    general = "introsort" if t["prefer_introsort"] else "merge_sort_adaptive"
+
+    # Largest size where binary insertion sort still wins. Small sorts take microseconds, so each timing sorts a
+    # batch of ~n elements worth of small inputs to get above the timer noise
+    def insertion_wins(size: int) -> bool:
+        batch = [[rng.random() for _ in range(size)] for _ in range(max(1, n // size))]
+        return _best_batch_time("binary_insertion_sort", batch, repeat) < _best_batch_time(general, batch, repeat)
+
+    t["insertion_max"] = _last_win([4, 8, 12, 16, 24, 32, 48, 64, 96, 128, 192, 256], insertion_wins) or 1
+
+    # Most disorder (as presortedness) at which finding runs still pays off
+    breaks = {}
+
+    def runs_win(swaps: int) -> bool:
+        A = _swapped(n, swaps, rng)
+        breaks[swaps] = presortedness(A)
+        return _best_time("merge_sort_adaptive", A, repeat) < _best_time(general, A, repeat)
+
+    swaps = _last_win([n // 1000, n // 200, n // 100, n // 50, n // 20, n // 10, n // 5], runs_win)
+    t["presorted_max_breaks"] = breaks[swaps] if swaps is not None else 0.0
+
+    # Smallest size where LSD radix sort beats the comparison engine on full-range 32-bit ints (for every larger
+    # size too: the last losing size + 1)
+    def radix_loses(size: int) -> bool:
+        ints = [rng.randrange(2 ** 32) for _ in range(size)]
+        return _best_time("lsd_radix_sort", ints, repeat) > _best_time(general, ints, repeat)
+
+    sizes = [64, 128, 256, 512, 1024, 2048, 4096, 8192]
+    last_loss = _last_win(sizes, radix_loses)
+    t["radix_min_n"] = sizes[0] if last_loss is None else last_loss + 1
+
+    # Largest key range (as a multiple of n) where counting sort beats LSD radix sort and the comparison engine
+    def counting_wins(factor: float) -> bool:
+        ints = [rng.randrange(max(1, int(factor * n))) for _ in range(n)]
+        others = min(_best_time("lsd_radix_sort", ints, repeat), _best_time(general, ints, repeat))
+        return _best_time("counting_sort", ints, repeat) < others
+
+    t["counting_range_factor"] = _last_win([0.01, 0.1, 0.5, 1, 2, 4, 8, 16, 32], counting_wins) or 0.0
+
+    # Lowest duplicate ratio at which introsort's 3-way partitioning beats the other engines on few unique keys:
+    # 12 character IDs (MSD radix sort's input) drawn from `unique` * n distinct values
+    ratios = {}
+
+    def three_way_wins(unique: float) -> bool:
+        values = [rng.randbytes(6).hex() for _ in range(max(1, int(unique * n)))]
+        ids = [rng.choice(values) for _ in range(n)]
+        ratios[unique] = duplicate_ratio(ids)
+        others = min(_best_time("merge_sort_adaptive", ids, repeat), _best_time("msd_radix_sort", ids, repeat))
+        return _best_time("introsort", ids, repeat) < others
+
+    unique = _last_win([0.0005, 0.002, 0.01, 0.05, 0.1, 0.25, 0.5], three_way_wins)
+    t["duplicates_min_ratio"] = ratios[unique] if unique is not None else None
+
+    # Smallest size where MSD radix sort beats the comparison engine on 12 character IDs (None: it never does)
+    def msd_wins(size: int) -> bool:
+        ids = [rng.randbytes(6).hex() for _ in range(size)]
+        return _best_time("msd_radix_sort", ids, repeat) < _best_time(general, ids, repeat)
+
+    t["msd_min_n"] = next((size for size in (256, 1024, 4096, n) if msd_wins(size)), None)
+
+    stored = {"host": platform.node(), "python": platform.python_version(), "thresholds": t}
+    with open(path or THRESHOLDS_PATH, "w") as f:
+        json.dump(stored, f, indent=2)
+    _thresholds = t
+    return t
+
+
+class Test(unittest.TestCase):
+    def test_sort_matches_sorted(self):
+        rng = random.Random(1)
+        cases = [
+            [],
+            [rng.random() for _ in range(10)],
+            [rng.random() for _ in range(1000)],
+            list(range(1000)) + [5],
+            list(range(1000, 0, -1)),
+            [rng.randrange(50) for _ in range(1000)],
+            [rng.randrange(-2 ** 40, 2 ** 40) for _ in range(1000)],
+            [rng.randbytes(4).hex() for _ in range(1000)],
+            [(rng.randrange(9), "x") for _ in range(1000)],
+        ]
+        for data in cases:
+            for stable in (False, True):
+                A = list(data)
+                sort(A, stable=stable)
+                self.assertEqual(A, sorted(data))
+
+    def test_key_and_stable(self):
+        rng = random.Random(2)
+        records = [(rng.randrange(-1000, 1000), i) for i in range(2000)]
+        for key in (lambda r: r[0], lambda r: str(r[0]), lambda r: float(r[0])):
+            A = list(records)
+            sort(A, key=key, stable=True)
+            self.assertEqual(A, sorted(records, key=key))
+
+        # key() runs once per element, profiling included
+        calls = []
+        for data in (records, [(i % 7, i) for i in range(2000)], [str(i) for i in range(2000)], records[:10]):
+            calls.clear()
+            A = list(data)
+            sort(A, key=lambda r: calls.append(r) or r[0])
+            self.assertEqual(len(calls), len(data))
+            self.assertEqual(A, sorted(data, key=lambda r: r[0]))
+
+    def test_choose_engine(self):
+        t = dict(DEFAULT_THRESHOLDS, msd_min_n=100)
+        rng = random.Random(3)
+        self.assertEqual(choose_engine([3, 1, 2], thresholds=t), "binary_insertion_sort")
+        self.assertEqual(choose_engine(list(range(5000, 0, -1)), thresholds=t), "merge_sort_adaptive")
+        self.assertEqual(choose_engine([rng.randrange(100) for _ in range(5000)], thresholds=t), "counting_sort")
+        self.assertEqual(choose_engine([rng.randrange(2 ** 60) for _ in range(5000)], thresholds=t),
+                         "lsd_radix_sort")
+        self.assertEqual(choose_engine([rng.randbytes(4).hex() for _ in range(5000)], thresholds=t),
+                         "msd_radix_sort")
+        floats = [rng.random() for _ in range(5000)]
+        self.assertEqual(choose_engine(floats, thresholds=t), "introsort")
+        self.assertEqual(choose_engine(floats, stable=True, thresholds=t), "merge_sort_adaptive")
+        # Few unique str/float keys: 3-way partitioning, even where distinct keys would go elsewhere
+        words = [rng.choice(["apple", "banana", "cherry"]) for _ in range(5000)]
+        few_floats = [rng.choice([0.5, 1.5, 2.5, 3.5]) for _ in range(5000)]
+        self.assertGreater(duplicate_ratio(words), 0.99)
+        self.assertEqual(duplicate_ratio(floats), 0.0)
+        for data in (words, few_floats):
+            self.assertEqual(choose_engine(data, thresholds=dict(t, prefer_introsort=False)), "introsort")
+            self.assertNotEqual(choose_engine(data, stable=True, thresholds=t), "introsort")  # Not stable
+        self.assertEqual(choose_engine([rng.randbytes(4).hex() for _ in range(5000)], thresholds=t),
+                         "msd_radix_sort")
+        self.assertEqual(choose_engine(few_floats, key=lambda x: str(x), thresholds=t), "introsort")
+        # One float among ints rules out the integer engines
+        self.assertEqual(choose_engine([rng.randrange(100) for _ in range(5000)] + [0.5], thresholds=t),
+                         "introsort")
+
+    def test_calibrate_round_trip(self):
+        global _thresholds
+        saved = _thresholds
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "sort_thresholds.json")
+            try:
+                t = calibrate(path, n=2000, repeat=1)
+                self.assertEqual(load_thresholds(path), t)
+                self.assertEqual(set(t), set(DEFAULT_THRESHOLDS))
+            finally:
+                _thresholds = saved
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["calibrate"]:
+        print(json.dumps(calibrate(sys.argv[2] if len(sys.argv) > 2 else None), indent=2))
+    else:
+        unittest.main()
@@ -1,8 +1,14 @@
+import time
+import tracemalloc
 import unittest
-from typing import Any
+from typing import Any, Optional
+
+from node_pool import NodePool
 
 
 class _Node:
+    __slots__ = ("data", "next")
+
     def __init__(self, data: Any):
         self.data = data
         self.next = None
@@ -41,12 +47,13 @@ class StackArr:
 
 # Singly LinkedList Stack Impl.
 class StackLL:
-    def __init__(self):
+    def __init__(self, pool: Optional[NodePool] = None):
         self._head = None
+        self._pool = pool  # Optional free-list, popped nodes are recycled on the next push
 
     def push(self, item: Any) -> None:
         """ Push the node to the head of the linked list, this will be the top of the stack """
-        new_node = _Node(item)
+        new_node = self._pool.acquire(item) if self._pool is not None else _Node(item)
         new_node.next = self._head
         self._head = new_node
 
@@ -59,12 +66,16 @@ class StackLL:
             raise Exception("Stack Underflow")
         top = self._head
         self._head = self._head.next
-        return top.data
+        item = top.data
+        if self._pool is not None:
+            self._pool.release(top)
+        return item
 
     def is_empty(self) -> bool:
         return self._head is None
 
 
+from array import array
 from collections import deque
 
 
@@ -91,6 +102,111 @@ class StackQ:
         return self._queue.popleft()  # Use popleft to simulate a standard dequeue operation from a queue
 
 
+# Typed array-backed stack
+# StackArr stores a list of pointers to boxed objects: an 8 byte pointer + a 28+ byte int/float object per element.
+# array.array stores the raw machine values back-to-back (8 bytes per element for typecode 'q' or 'd'), which is a lot
+# smaller for big numeric stacks (e.g. the explicit stack of an iterative traversal holding millions of indices).
+# Bulk operations work on slices, so a push_many/pop_many of k items is a single C-level copy instead of k calls.
+class StackTyped:
+    def __init__(self, typecode: str = "q", items=()):
+        """
+        :param typecode: array module typecode of the elements, e.g. 'q' (int64), 'l' (long), 'd' (float64)
+        :param items: Initial items, pushed in order
+        """
+        self._data = array(typecode, items)
+
+    def __repr__(self) -> str:
+        return str(self._data.tolist())
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def typecode(self) -> str:
+        return self._data.typecode
+
+    # O(1)
+    @property
+    def peek(self) -> Any:
+        return self._data[-1]
+
+    # O(1) amortized
+    def push(self, item: Any) -> None:
+        self._data.append(item)
+
+    # O(1)
+    def pop(self) -> Any:
+        if self.is_empty():
+            raise Exception("Stack Underflow")
+        return self._data.pop()
+
+    # O(k)
+    def push_many(self, items) -> None:
+        """ Push the items in order (the last item ends up on top) """
+        if isinstance(items, array) and items.typecode == self._data.typecode:
+            self._data.extend(items)
+        else:
+            self._data.fromlist(list(items))
+
+    # O(k)
+    def peek_many(self, k: int) -> array:
+        """ The top k items in pop order (top of the stack first), without removing them """
+        if k > len(self._data):
+            raise Exception("Stack Underflow")
+        items = self._data[len(self._data) - k:]
+        items.reverse()
+        return items
+
+    # O(k)
+    def pop_many(self, k: int) -> array:
+        """ Pop the top k items, returned in pop order (top of the stack first) """
+        items = self.peek_many(k)
+        del self._data[len(self._data) - k:]
+        return items
+
+    def memoryview(self) -> memoryview:
+        """
+        Zero-copy view of the live region, bottom of the stack first.
+        The array can't be resized while a view exists, release() it before pushing or popping again.
+        """
+        return memoryview(self._data)
+
+    # O(1)
+    def is_empty(self) -> bool:
+        return len(self._data) == 0
+
+
+def benchmark(n: int = 1_000_000) -> dict:
+    """ Bytes per element (tracemalloc) and push+pop ops/sec for StackTyped vs StackArr vs StackLL """
+    # Values outside the small int cache, so StackArr/StackLL pay for a real int object per element
+    values = range(10 ** 9, 10 ** 9 + n)
+    results = {}
+    for name, factory in (("StackTyped('q')", lambda: StackTyped("q")), ("StackArr", StackArr), ("StackLL", StackLL)):
+        tracemalloc.start()
+        before, _ = tracemalloc.get_traced_memory()
+        s = factory()
+        for v in values:
+            s.push(v)
+        after, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        start = time.perf_counter()
+        while not s.is_empty():
+            s.pop()
+        for v in values:
+            s.push(v)
+        elapsed = time.perf_counter() - start
+        results[name] = {"bytes/element": (after - before) / n, "ops/sec": 2 * n / elapsed}
+
+    s = StackTyped("q")
+    start = time.perf_counter()
+    s.push_many(values)
+    while not s.is_empty():
+        s.pop_many(min(1024, len(s)))
+    results["StackTyped('q') push_many/pop_many(1024)"] = {"ops/sec": 2 * n / (time.perf_counter() - start)}
+    return results
+
+
 class Test(unittest.TestCase):
     def _stack_test(self, stack_impl):
         s = stack_impl()
@@ -109,6 +225,27 @@ class Test(unittest.TestCase):
         self._stack_test(stack_impl=StackArr)
         self._stack_test(stack_impl=StackLL)
         self._stack_test(stack_impl=StackQ)
+        self._stack_test(stack_impl=StackTyped)
+
+    def test_stack_typed_bulk(self):
+        s = StackTyped("d")
+        s.push_many([1.5, 2.5, 3.5, 4.5])
+        self.assertEqual(s.peek, 4.5)
+        self.assertEqual(s.peek_many(2).tolist(), [4.5, 3.5])
+        self.assertEqual(s.pop_many(3).tolist(), [4.5, 3.5, 2.5])
+        self.assertEqual(len(s), 1)
+
+        with self.assertRaises(Exception):
+            s.pop_many(2)
+
+        s.push_many(array("d", [7.0, 8.0]))
+        view = s.memoryview()
+        self.assertEqual(view.tolist(), [1.5, 7.0, 8.0])
+        with self.assertRaises(BufferError):
+            s.push(9.0)
+        view.release()
+        s.push(9.0)
+        self.assertEqual(s.pop(), 9.0)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,353 @@
+import random
+import time
+import tracemalloc
+import unittest
+from typing import Any, Iterator, List, Optional
+
+from linked_lists import Node, SinglyLinkedList
+
+
+# In linked_lists.py every element is its own Node: one object (plus its pointers) per element, and every step of a
+# traversal is a pointer chase to a node that could be anywhere in memory.
+# An unrolled linked list stores a fixed-capacity chunk (a small array) of elements per node instead:
+# - Far fewer node objects and pointers per element (~1/capacity of them)
+# - Traversal walks whole chunks, iterating a chunk is a tight loop over a contiguous array
+# - Positional insert/delete walk O(n/capacity) chunks, then shift at most `capacity` elements inside one chunk
+# Chunks are kept at least half full: a full chunk splits in two on insert, a chunk that drops below half borrows
+# from or merges with its neighbour on delete. That keeps both the memory overhead and the walk length bounded.
+class _Chunk:
+    __slots__ = ("items", "next", "prev")
+
+    def __init__(self, items: Optional[List[Any]] = None):
+        self.items = items if items is not None else []
+        self.next = None
+        self.prev = None
+
+
+class UnrolledLinkedList:
+    def __init__(self, iterable=(), capacity: int = 64):
+        if capacity < 2:
+            raise ValueError("capacity must be >= 2")
+        self.capacity = capacity
+        self.head = None
+        self.tail = None
+        self._size = 0
+        for item in iterable:
+            self.append(item)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __str__(self) -> str:
+        return "".join(f"{item}->" for item in self) + "None"
+
+    def __iter__(self) -> Iterator[Any]:
+        for chunk in self.chunks():
+            yield from chunk
+
+    def __contains__(self, item: Any) -> bool:
+        return self.search(item) is not None
+
+    def __getitem__(self, index: int) -> Any:
+        chunk, offset = self._locate(index)
+        return chunk.items[offset]
+
+    def chunks(self) -> Iterator[List[Any]]:
+        """ Yield each chunk's list of elements, front to back. Don't mutate the list while iterating """
+        chunk = self.head
+        while chunk is not None:
+            yield chunk.items
+            chunk = chunk.next
+
+    def _locate(self, index: int):
+        """ Return (chunk, offset in chunk) of the element at index. Walks from whichever end is closer """
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("list index out of range")
+
+        if index < self._size // 2:
+            chunk = self.head
+            while index >= len(chunk.items):
+                index -= len(chunk.items)
+                chunk = chunk.next
+            return chunk, index
+
+        index = self._size - 1 - index  # Distance from the back
+        chunk = self.tail
+        while index >= len(chunk.items):
+            index -= len(chunk.items)
+            chunk = chunk.prev
+        return chunk, len(chunk.items) - 1 - index
+
+    def _link_after(self, chunk: Optional[_Chunk], new_chunk: _Chunk) -> None:
+        """ Link new_chunk after chunk (None means at the front) """
+        if chunk is None:
+            new_chunk.next = self.head
+            if self.head is not None:
+                self.head.prev = new_chunk
+            self.head = new_chunk
+            if self.tail is None:
+                self.tail = new_chunk
+            return
+
+        new_chunk.prev = chunk
+        new_chunk.next = chunk.next
+        if chunk.next is not None:
+            chunk.next.prev = new_chunk
+        else:
+            self.tail = new_chunk
+        chunk.next = new_chunk
+
+    def _unlink(self, chunk: _Chunk) -> None:
+        if chunk.prev is not None:
+            chunk.prev.next = chunk.next
+        else:
+            self.head = chunk.next
+        if chunk.next is not None:
+            chunk.next.prev = chunk.prev
+        else:
+            self.tail = chunk.prev
+
+    def _split(self, chunk: _Chunk) -> _Chunk:
+        """ Move the back half of a full chunk into a new chunk after it, return the new chunk """
+        half = len(chunk.items) // 2
+        new_chunk = _Chunk(chunk.items[half:])
+        del chunk.items[half:]
+        self._link_after(chunk, new_chunk)
+        return new_chunk
+
+    def _rebalance(self, chunk: _Chunk) -> None:
+        """ Restore the half-full invariant after a delete from chunk """
+        if not chunk.items:
+            self._unlink(chunk)
+            return
+
+        neighbour = chunk.next
+        if len(chunk.items) >= self.capacity // 2 or neighbour is None:
+            return
+
+        if len(chunk.items) + len(neighbour.items) <= self.capacity:
+            # Merge the neighbour into this chunk
+            chunk.items.extend(neighbour.items)
+            self._unlink(neighbour)
+        else:
+            # Borrow from the neighbour, it has more than enough to stay half full
+            chunk.items.append(neighbour.items.pop(0))
+
+    # O(1) amortized
+    def append(self, item: Any) -> None:
+        if self.tail is None or len(self.tail.items) == self.capacity:
+            self._link_after(self.tail, _Chunk())
+        self.tail.items.append(item)
+        self._size += 1
+
+    # O(1) amortized - The shift is bounded by the chunk capacity
+    def appendleft(self, item: Any) -> None:
+        self.insert(0, item)
+
+    # O(n / capacity + capacity)
+    def insert(self, index: int, item: Any) -> None:
+        """ Insert item before position index (like list.insert, index == len appends) """
+        if index < 0:
+            index = max(0, index + self._size)
+        if index >= self._size:
+            self.append(item)
+            return
+
+        chunk, offset = self._locate(index)
+        if len(chunk.items) == self.capacity:
+            new_chunk = self._split(chunk)
+            if offset > len(chunk.items):
+                offset -= len(chunk.items)
+                chunk = new_chunk
+        chunk.items.insert(offset, item)
+        self._size += 1
+
+    # O(1) amortized
+    def pop(self) -> Any:
+        if self.tail is None:
+            raise IndexError("pop from empty list")
+        item = self.tail.items.pop()
+        self._size -= 1
+        if not self.tail.items:
+            self._unlink(self.tail)
+        return item
+
+    # O(1) amortized
+    def popleft(self) -> Any:
+        if self.head is None:
+            raise IndexError("pop from empty list")
+        item = self.head.items.pop(0)
+        self._size -= 1
+        self._rebalance(self.head)
+        return item
+
+    # O(n / capacity + capacity)
+    def delete_at(self, index: int) -> Any:
+        chunk, offset = self._locate(index)
+        item = chunk.items.pop(offset)
+        self._size -= 1
+        self._rebalance(chunk)
+        return item
+
+    # O(N)
+    def search(self, item: Any) -> Optional[int]:
+        """ Index of the first occurrence of item, None if it isn't in the list """
+        base = 0
+        for items in self.chunks():
+            if item in items:  # Scans the chunk in C
+                return base + items.index(item)
+            base += len(items)
+        return None
+
+    # O(N)
+    def delete(self, item: Any) -> None:
+        """ Delete the first occurrence of item """
+        chunk = self.head
+        while chunk is not None:
+            if item in chunk.items:
+                chunk.items.remove(item)
+                self._size -= 1
+                self._rebalance(chunk)
+                return
+            chunk = chunk.next
+
+
+def _singly_insert_at(ll: SinglyLinkedList, index: int, item: Any) -> None:
+    """ Positional insert for the benchmark, SinglyLinkedList only inserts at the head """
+    if index == 0 or ll.head is None:
+        ll.insert(item)
+        return
+    prev = ll.head
+    for _ in range(index - 1):
+        prev = prev.next
+    node = Node(item)
+    node.next = prev.next
+    prev.next = node
+
+
+def benchmark(n: int = 100_000, inserts: int = 1_000, capacity: int = 64, seed: int = 0) -> dict:
+    """ Iteration time, positional insert time and bytes/element (tracemalloc) vs SinglyLinkedList and list """
+    rng = random.Random(seed)
+    positions = [rng.randrange(n) for _ in range(inserts)]
+    results = {}
+
+    def build_unrolled():
+        return UnrolledLinkedList(range(n), capacity=capacity)
+
+    def build_singly():
+        ll = SinglyLinkedList()
+        for i in range(n - 1, -1, -1):
+            ll.insert(i)
+        return ll
+
+    def iterate_singly(ll):
+        total = 0
+        node = ll.head
+        while node is not None:
+            total += node.data
+            node = node.next
+        return total
+
+    structures = {
+        f"UnrolledLinkedList({capacity})": (build_unrolled, lambda ul: sum(ul),
+                                            lambda ul, i, item: ul.insert(i, item)),
+        "SinglyLinkedList": (build_singly, iterate_singly, _singly_insert_at),
+        "list": (lambda: list(range(n)), lambda l: sum(l), lambda l, i, item: l.insert(i, item)),
+    }
+
+    for name, (build, iterate, insert_at) in structures.items():
+        tracemalloc.start()
+        before, _ = tracemalloc.get_traced_memory()
+        structure = build()
+        after, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        start = time.perf_counter()
+        iterate(structure)
+        iterate_secs = time.perf_counter() - start
+
+        # The singly linked list walks O(n) per insert, give it a smaller slice of the workload
+        sample = positions if name != "SinglyLinkedList" else positions[:max(1, inserts // 20)]
+        start = time.perf_counter()
+        for i in sample:
+            insert_at(structure, i, -1)
+        insert_secs = (time.perf_counter() - start) / len(sample)
+
+        results[name] = {"bytes/element": (after - before) / n, "iterate secs": iterate_secs,
+                         "insert secs/op": insert_secs}
+    return results
+
+
+class Test(unittest.TestCase):
+    def _assert_half_full(self, ul: UnrolledLinkedList) -> None:
+        """ Every chunk except possibly the last is at least half full, and none is over capacity """
+        chunks = list(ul.chunks())
+        self.assertTrue(all(len(chunk) <= ul.capacity for chunk in chunks))
+        self.assertTrue(all(len(chunk) >= ul.capacity // 2 for chunk in chunks[:-1]))
+
+    def test_append_both_ends(self):
+        ul = UnrolledLinkedList(capacity=4)
+        for i in range(10):
+            ul.append(i)
+        for i in range(1, 6):
+            ul.appendleft(-i)
+        self.assertEqual(list(ul), list(range(-5, 10)))
+        self.assertEqual(len(ul), 15)
+        self.assertTrue(all(len(chunk) <= 4 for chunk in ul.chunks()))
+
+        self.assertEqual(ul.pop(), 9)
+        self.assertEqual(ul.popleft(), -5)
+        self.assertEqual(ul[0], -4)
+        self.assertEqual(ul[-1], 8)
+        self._assert_half_full(ul)
+        self.assertEqual(str(UnrolledLinkedList([1, 2])), "1->2->None")
+
+    def test_deque_ends_keep_chunks_half_full(self):
+        ul = UnrolledLinkedList(range(40), capacity=8)
+        reference = list(range(40))
+        for i in range(30):
+            self.assertEqual(ul.popleft(), reference.pop(0))
+            self._assert_half_full(ul)
+        for i in range(50):
+            ul.appendleft(i)
+            reference.insert(0, i)
+            self._assert_half_full(ul)
+        self.assertEqual(list(ul), reference)
+        while reference:
+            self.assertEqual(ul.popleft(), reference.pop(0))
+            self._assert_half_full(ul)
+        self.assertIsNone(ul.head)
+        self.assertIsNone(ul.tail)
+
+    def test_insert_delete_against_list(self):
+        rng = random.Random(7)
+        ul = UnrolledLinkedList(capacity=8)
+        reference = []
+        for step in range(3000):
+            if reference and rng.random() < 0.4:
+                index = rng.randrange(len(reference))
+                self.assertEqual(ul.delete_at(index), reference.pop(index))
+            else:
+                index = rng.randrange(len(reference) + 1)
+                ul.insert(index, step)
+                reference.insert(index, step)
+
+        self.assertEqual(list(ul), reference)
+        self.assertEqual(len(ul), len(reference))
+        self._assert_half_full(ul)
+
+    def test_search_delete(self):
+        ul = UnrolledLinkedList(range(20), capacity=4)
+        self.assertEqual(ul.search(13), 13)
+        self.assertIsNone(ul.search(100))
+        ul.delete(13)
+        self.assertNotIn(13, ul)
+        self.assertEqual(len(ul), 19)
+        with self.assertRaises(IndexError):
+            UnrolledLinkedList().pop()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,351 @@
+import random
+import threading
+import time
+import unittest
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Iterator, List, Optional
+
+from quick_sort import partition, quick_sort
+
+
+# With one shared queue, every worker contends on the same lock for every task. Work stealing gives each worker its own
+# deque instead:
+# - The owner pushes and pops at the bottom (LIFO), so it works on the freshest, cache-hot task it just spawned
+# - Idle workers (thieves) steal from the top (FIFO), which holds the oldest tasks. For recursive divide & conquer
+#   those are the biggest subproblems, so one steal hands over a lot of work
+# - Owner and thieves work on opposite ends, so they rarely touch the same task
+# Like StackQ in stacks.py, we build on collections.deque: append/pop/popleft are atomic under the GIL,
+# so a steal can't observe a half-finished push or pop.
+class WorkStealingDeque:
+    def __init__(self):
+        self._deque = deque()
+
+    def __len__(self) -> int:
+        return len(self._deque)
+
+    # O(1) - Owner only
+    def push(self, item: Any) -> None:
+        self._deque.append(item)
+
+    # O(1) - Owner only, returns None if empty
+    def pop(self) -> Optional[Any]:
+        try:
+            return self._deque.pop()
+        except IndexError:
+            return None
+
+    # O(1) - Any thread, returns None if empty
+    def steal(self) -> Optional[Any]:
+        try:
+            return self._deque.popleft()
+        except IndexError:
+            return None
+
+    def is_empty(self) -> bool:
+        return len(self._deque) == 0
+
+
+class WorkStealingExecutor:
+    """
+    Thread pool with a work-stealing deque per worker.
+
+    Tasks submitted from a worker go onto that worker's own deque, tasks submitted from outside the pool go onto a
+    shared injection queue. A worker looks for work in its own deque first, then the injection queue, then steals
+    from the other workers.
+
+    A task that needs the result of a child task should use join(future) instead of future.result(): the waiting
+    worker keeps running other tasks until the child is done, instead of blocking a pool thread (which can deadlock
+    a fixed size pool on deep recursion).
+    """
+
+    def __init__(self, max_workers: int = 4):
+        if max_workers < 1:
+            raise ValueError("max_workers must be >= 1")
+
+        self._deques = [WorkStealingDeque() for _ in range(max_workers)]
+        self._injection = WorkStealingDeque()
+        self._local = threading.local()
+        self._work_available = threading.Condition()
+        self._idle = 0
+        self._shutdown = False
+
+        self._threads = [threading.Thread(target=self._worker, args=(i,), daemon=True) for i in range(max_workers)]
+        for t in self._threads:
+            t.start()
+
+    def __enter__(self) -> "WorkStealingExecutor":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.shutdown(wait=True)
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        if self._shutdown:
+            raise RuntimeError("cannot schedule new futures after shutdown")
+
+        future = Future()
+        task = (future, fn, args, kwargs)
+        index = getattr(self._local, "index", None)
+        if index is not None:
+            self._deques[index].push(task)
+        else:
+            self._injection.push(task)
+
+        if self._idle:
+            with self._work_available:
+                self._work_available.notify()
+        return future
+
+    def map(self, fn: Callable, *iterables, timeout: Optional[float] = None) -> Iterator:
+        """ Same contract as Executor.map: results are yielded in input order """
+        futures = [self.submit(fn, *args) for args in zip(*iterables)]
+
+        def results():
+            for future in futures:
+                yield future.result(timeout=timeout)
+
+        return results()
+
+    def join(self, future: Future) -> Any:
+        """ Wait for the future. Called from a worker, it runs other tasks while it waits (helping) """
+        index = getattr(self._local, "index", None)
+        if index is None:
+            return future.result()
+
+        while not future.done():
+            task = self._find_task(index)
+            if task is not None:
+                self._run(task)
+            else:
+                # Nothing to help with, the future is being computed by another worker. Yield the GIL to it.
+                time.sleep(0)
+        return future.result()
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._shutdown = True
+        with self._work_available:
+            self._work_available.notify_all()
+        if wait:
+            for t in self._threads:
+                t.join()
+
+    def _find_task(self, index: int):
+        task = self._deques[index].pop()
+        if task is not None:
+            return task
+
+        task = self._injection.steal()
+        if task is not None:
+            return task
+
+        # Start at a random victim so thieves don't all pile onto worker 0
+        n = len(self._deques)
+        start = random.randrange(n)
+        for k in range(n):
+            victim = (start + k) % n
+            if victim != index:
+                task = self._deques[victim].steal()
+                if task is not None:
+                    return task
+        return None
+
+    @staticmethod
+    def _run(task) -> None:
+        future, fn, args, kwargs = task
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+
+    def _worker(self, index: int) -> None:
+        self._local.index = index
+        while True:
+            task = self._find_task(index)
+            if task is not None:
+                self._run(task)
+                continue
+
+            if self._shutdown:
+                # Drain anything that's left before exiting
+                if all(d.is_empty() for d in self._deques) and self._injection.is_empty():
+                    return
+                continue
+
+            with self._work_available:
+                self._idle += 1
+                # Timed wait: a submit may race with us going idle, re-check the deques periodically
+                self._work_available.wait(timeout=0.005)
+                self._idle -= 1
+
+
+# === Parallel quick sort ===
+
+def _parallel_quick_sort_task(executor, A: list, p: int, r: int, cutoff: int, pending: list, errors: list,
+                              lock: threading.Lock, done: threading.Event) -> None:
+    """
+    Partition A[p..r] and spawn a task for each side. Tasks don't wait on their children, a shared pending counter
+    tracks outstanding tasks and the last one to finish sets `done`. This runs the same on any Executor.
+    A task that raises still counts itself off (finally), its exception goes in `errors` for the caller to re-raise.
+    """
+    try:
+        if r - p + 1 <= cutoff:
+            quick_sort(A, p, r)
+        else:
+            q = partition(A, p, r)
+            for lo, hi in ((p, q - 1), (q + 1, r)):
+                if lo < hi:
+                    # Count the child before submitting it, our own count keeps pending above 0 meanwhile
+                    with lock:
+                        pending[0] += 1
+                    try:
+                        executor.submit(_parallel_quick_sort_task, executor, A, lo, hi, cutoff, pending, errors,
+                                        lock, done)
+                    except BaseException:
+                        with lock:
+                            pending[0] -= 1
+                        raise
+    except BaseException as error:
+        with lock:
+            errors.append(error)
+    finally:
+        with lock:
+            pending[0] -= 1
+            if pending[0] == 0:
+                done.set()
+
+
+def parallel_quick_sort(A: list, executor, cutoff: int = 1000) -> None:
+    """ Sort A in place by fanning quick_sort partitions out as tasks, subarrays below the cutoff are sorted inline """
+    if len(A) < 2:
+        return
+    pending = [1]
+    errors = []
+    lock = threading.Lock()
+    done = threading.Event()
+    executor.submit(_parallel_quick_sort_task, executor, A, 0, len(A) - 1, cutoff, pending, errors, lock, done)
+    done.wait()
+    if errors:
+        raise errors[0]
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def benchmark(max_workers: int = 4, depth: int = 14, n: int = 200_000, cutoff: int = 2000) -> dict:
+    """
+    Compare WorkStealingExecutor and ThreadPoolExecutor on:
+    - A binary tree of 2^depth fine-grained tasks, each spawning its children (tasks/sec, p50/p99 submit-to-start latency)
+    - parallel_quick_sort of n random ints (seconds)
+    """
+    results = {}
+    for name, factory in (("work-stealing", lambda: WorkStealingExecutor(max_workers=max_workers)),
+                          ("ThreadPoolExecutor", lambda: ThreadPoolExecutor(max_workers=max_workers))):
+        latencies = []
+        total = 2 ** (depth + 1) - 1
+        pending = [total]
+        errors = []
+        lock = threading.Lock()
+        done = threading.Event()
+
+        def task(executor, level: int, submitted_at: float) -> None:
+            try:
+                latencies.append(time.perf_counter() - submitted_at)  # list.append is atomic under the GIL
+                if level < depth:
+                    executor.submit(task, executor, level + 1, time.perf_counter())
+                    executor.submit(task, executor, level + 1, time.perf_counter())
+            except BaseException as error:
+                # The subtree that wasn't submitted will never count itself off, don't wait for it
+                errors.append(error)
+                done.set()
+            finally:
+                with lock:
+                    pending[0] -= 1
+                    if pending[0] == 0:
+                        done.set()
+
+        with factory() as executor:
+            start = time.perf_counter()
+            executor.submit(task, executor, 0, time.perf_counter())
+            done.wait()
+            elapsed = time.perf_counter() - start
+            if errors:
+                raise errors[0]
+
+            A = [random.randint(0, n) for _ in range(n)]
+            sort_start = time.perf_counter()
+            parallel_quick_sort(A, executor, cutoff=cutoff)
+            sort_elapsed = time.perf_counter() - sort_start
+
+        results[name] = {
+            "tasks/sec": total / elapsed,
+            "p50 latency": _percentile(latencies, 50),
+            "p99 latency": _percentile(latencies, 99),
+            "parallel_quick_sort secs": sort_elapsed,
+        }
+    return results
+
+
+class Test(unittest.TestCase):
+    def test_deque(self):
+        d = WorkStealingDeque()
+        for i in range(4):
+            d.push(i)
+        self.assertEqual(d.pop(), 3)  # Owner end is LIFO
+        self.assertEqual(d.steal(), 0)  # Thief end is FIFO
+        self.assertEqual(len(d), 2)
+        d.pop()
+        d.pop()
+        self.assertIsNone(d.pop())
+        self.assertIsNone(d.steal())
+
+    def test_submit_and_map(self):
+        with WorkStealingExecutor(max_workers=3) as executor:
+            self.assertEqual(executor.submit(pow, 2, 10).result(), 1024)
+            self.assertEqual(list(executor.map(lambda x, y: x * y, range(10), range(10))), [i * i for i in range(10)])
+
+            future = executor.submit(lambda: 1 / 0)
+            with self.assertRaises(ZeroDivisionError):
+                future.result()
+
+    def test_recursive_join(self):
+        with WorkStealingExecutor(max_workers=2) as executor:
+            def fib(n: int) -> int:
+                if n < 2:
+                    return n
+                left = executor.submit(fib, n - 1)
+                right = fib(n - 2)
+                return executor.join(left) + right
+
+            # Far more nested waits than workers, join() has to keep the workers busy instead of blocking
+            self.assertEqual(executor.submit(fib, 15).result(), 610)
+
+    def test_parallel_quick_sort(self):
+        A = [random.randint(0, 1000) for _ in range(5000)]
+        expected = sorted(A)
+        with WorkStealingExecutor(max_workers=4) as executor:
+            parallel_quick_sort(A, executor, cutoff=100)
+        self.assertEqual(A, expected)
+
+        B = list(range(3000, 0, -1))
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            parallel_quick_sort(B, executor, cutoff=500)
+        self.assertEqual(B, sorted(B))
+
+    def test_parallel_quick_sort_error(self):
+        # A task that raises mustn't leave the caller waiting forever, its exception is re-raised
+        for factory in (lambda: WorkStealingExecutor(max_workers=2), lambda: ThreadPoolExecutor(max_workers=2)):
+            A = [random.randint(0, 1000) for _ in range(2000)] + [None]
+            with factory() as executor:
+                with self.assertRaises(TypeError):
+                    parallel_quick_sort(A, executor, cutoff=50)
+
+
+if __name__ == "__main__":
+    unittest.main()